@@ -1,5 +1,5 @@
-from json import JSONDecodeError
 import logging
+import os
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,7 +10,12 @@ from starlette.responses import JSONResponse
 # from http_app.routes import init_routes
 from contextlib import asynccontextmanager
 from common import AppConfig
+from irgraph.Broadcaster import Broadcaster
+from irgraph.Flusher import Flusher
 from irgraph.Graphs import Graphs
+from irgraph.Loader import Loader
+from irgraph.PositionBuffer import PositionBuffer
+from irgraph.SqliteStorage import SqliteStorage
 # from common.di_container import Container
 # from common.errors import ApplicationError
 # from common.telemetry import instrument_third_party
@@ -20,17 +25,32 @@ from irgraph.Graphs import Graphs
 # instrument_third_party()
 
 graphs = Graphs()
+# Live change events of graphs, see GET /api/graphs/{graph_id}/events
+broadcaster = Broadcaster(graphs)
+graphs.on_reload(broadcaster.resync)
+# Node positions streamed while dragging, see POST /api/graphs/{graph_id}/positions
+position_buffer = PositionBuffer(graphs)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global graphs
-    try:
-        graphs.load_from_json()
-    except (JSONDecodeError,FileNotFoundError):
-        logging.error(f"Error loading graphs from {graphs.json_file_path}")
-        graphs = Graphs()
+    app_config = app.state.app_config
+    if app_config.GRAPH_STORAGE == "sqlite":
+        # Existing JSON data is migrated into the database on first load
+        graphs.storage = SqliteStorage(app_config.GRAPH_SQLITE_PATH or os.path.join(graphs.data_dir, "graphs.sqlite3"))
+    flusher = Flusher(graphs, window=app_config.GRAPH_FLUSH_WINDOW_SECONDS)
+    graphs.flusher = flusher
+    # Graphs load in the background; static pages and /mcp are served right away
+    loader = Loader(graphs, flusher=flusher)
+    app.state.loader = loader
+    loader.start()
+    position_buffer.window = app_config.GRAPH_POSITION_WINDOW_SECONDS
+    position_buffer.start()
     yield
-    graphs.save_to_json()
+    await position_buffer.stop()
+    await loader.stop()
+    await flusher.stop()
+    # Final synchronous flush now that the flusher is gone
+    graphs.save_to_json(compact=True)
 
 def create_app(
     test_config: AppConfig | None = None,
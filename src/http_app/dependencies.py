@@ -5,4 +5,10 @@ from http_app import context
 from fastapi import Request
 
 def get_app_config(request: Request) -> AppConfig:
-    return request.app.state.app_config
\ No newline at end of file
+    return request.app.state.app_config
+
+async def graphs_loaded(request: Request) -> None:
+    """Waits until the graph registry has been read at startup, see irgraph.Loader."""
+    loader = getattr(request.app.state, "loader", None)
+    if loader is not None:
+        await loader.wait_registry()
@@ -4,6 +4,7 @@ from fastapi.staticfiles import StaticFiles
 
 from http_app.routes import (
     api,
+    health,
     index
     # user_registered_hook,
 )
@@ -12,6 +13,7 @@ from http_app.routes import (
 def init_routes(app: FastAPI) -> None:
     app.include_router(api.router)
     app.include_router(index.router)
+    app.include_router(health.router)
     # app.mount("/static", StaticFiles(directory="http_app/static"), name="static")
     import os
     static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
@@ -1,10 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from http_app.dependencies import graphs_loaded
 
 from . import categories, config, graphs, utils
 
 router = APIRouter(prefix="/api")
 
-router.include_router(categories.router)
-router.include_router(graphs.router)
-router.include_router(utils.router)
-router.include_router(config.router)
\ No newline at end of file
+# Routes using the graph registry wait for it while it is read in the background
+router.include_router(categories.router, dependencies=[Depends(graphs_loaded)])
+router.include_router(graphs.router, dependencies=[Depends(graphs_loaded)])
+router.include_router(utils.router, dependencies=[Depends(graphs_loaded)])
+router.include_router(config.router)
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from pydantic import BaseModel
 
 from common import AppConfig
+from http_app import graphs
 from http_app.dependencies import get_app_config
 
 router = APIRouter()
@@ -48,6 +49,12 @@ async def list_categories(app_config: AppConfig = Depends(get_app_config)):
     return app_config.UI_CONFIG.node_categories
 
 
+@router.get("/categories/usage")
+async def category_usage():
+    """Return the number of nodes per category across all graphs."""
+    return graphs.category_usage()
+
+
 @router.post("/categories", status_code=status.HTTP_201_CREATED)
 async def create_category(
     body: CategoryCreateModel,
@@ -73,7 +80,7 @@ async def update_category(
     body: CategoryUpdateModel,
     app_config: AppConfig = Depends(get_app_config),
 ):
-    """Rename a category and/or update its icon path."""
+    """Rename a category and/or update its icon path. A rename also moves the nodes of every graph."""
     cat = _find_category(app_config, name)
     if cat is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found.")
@@ -91,6 +98,8 @@ async def update_category(
                 detail=f"Category '{body.name}' already exists.",
             )
         cat.name = body.name
+        if graphs.rename_category(name, body.name):
+            graphs.save_to_json()
 
     if body.icon is not None:
         cat.icon = body.icon
@@ -104,7 +113,7 @@ async def delete_category(
     name: str,
     app_config: AppConfig = Depends(get_app_config),
 ):
-    """Delete a category by name."""
+    """Delete a category by name. Nodes using it fall back to the Default category."""
     if name in PROTECTED_CATEGORIES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -118,6 +127,8 @@ async def delete_category(
     if len(app_config.UI_CONFIG.node_categories) == original_len:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found.")
 
+    if graphs.rename_category(name, "Default"):
+        graphs.save_to_json()
     app_config.save_ui_config()
 
 
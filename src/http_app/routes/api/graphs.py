@@ -1,14 +1,23 @@
-from typing import Iterable
-import json
-
-from fastapi import APIRouter, status, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, ConfigDict
-from http_app import graphs
-
-from irgraph.Graph import Graph
+from typing import Annotated, Literal, Union
+import asyncio
+import math
+import re
+
+import orjson
+
+from fastapi import APIRouter, Depends, Header, Query, Request, status, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_serializer
+from http_app import broadcaster, graphs, position_buffer
+
+from irgraph.Batch import BatchValidationError, apply_batch
+from irgraph.Graph import GRAPH_SETTINGS, Graph
+from irgraph.Graphs import SUMMARY_FIELDS
+from irgraph.Layout import DEFAULT_SPACING, compute_layout
+from irgraph.Ndjson import NdjsonGraphReader, iter_graph_ndjson
 from irgraph.Node import Node
 from irgraph.Edge import Edge
+from irgraph.PositionBuffer import POSITIONS_MEDIA_TYPE, decode_positions
 
 class GraphModel(BaseModel):
     # model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -39,34 +48,249 @@ class NodesModel(BaseModel):
     nodes: list[NodeModel]
 
 
+class NodeNamesModel(BaseModel):
+    names: list[str]
+
+class SubtreeMoveModel(BaseModel):
+    # "" ungroups the node, None keeps its parent
+    parent: str | None = None
+    dx: int = 0
+    dy: int = 0
+
+class LayoutModel(BaseModel):
+    mode: Literal["force", "layered"] = "force"
+    # Only place nodes without a position; the others keep theirs
+    incremental: bool = False
+    spacing: int = Field(default=DEFAULT_SPACING, gt=0)
+
+class PositionsModel(BaseModel):
+    # Version of the node order the indices refer to, see GET /graphs/{graph_id}/positions
+    order: int
+    index: list[int]
+    x: list[int]
+    y: list[int]
+
+
 class GraphImportModel(BaseModel):
     graph: dict
 
 
+# Batch operations use the same change records that Graph emits and replays
+class BatchEdgeModel(BaseModel):
+    start: str
+    end: str
+    directed: bool = True
+    description: str | None = None
+    style: str = "solid"
+
+class AddNodeOperation(BaseModel):
+    op: Literal["add_node"]
+    node: NodeModel
+
+class UpdateNodeOperation(BaseModel):
+    op: Literal["update_node"]
+    old_name: str
+    new_name: str
+    category: str | None = None
+    parent: str | None = None
+
+class NodeFieldsModel(BaseModel):
+    # Graph.NODE_FIELDS, typed as in NodeModel
+    model_config = ConfigDict(extra="forbid")
+    position_x: int | None = None
+    position_y: int | None = None
+    description: str | None = None
+
+class UpdateNodeFieldsOperation(BaseModel):
+    op: Literal["update_node_fields"]
+    name: str
+    fields: NodeFieldsModel
+
+    @field_serializer("fields")
+    def _given_fields(self, fields: NodeFieldsModel) -> dict:
+        # Only the fields in the request are changed
+        return fields.model_dump(exclude_unset=True)
+
+class DeleteNodeOperation(BaseModel):
+    op: Literal["delete_node"]
+    name: str
+
+class AddEdgeOperation(BaseModel):
+    op: Literal["add_edge"]
+    edge: BatchEdgeModel
+
+class UpdateEdgeOperation(BaseModel):
+    op: Literal["update_edge"]
+    start: str
+    end: str
+    description: str | None = None
+    style: str | None = None
+
+class DeleteEdgeOperation(BaseModel):
+    op: Literal["delete_edge"]
+    start: str
+    end: str
+
+BatchOperation = Annotated[
+    Union[AddNodeOperation, UpdateNodeOperation, UpdateNodeFieldsOperation, DeleteNodeOperation,
+          AddEdgeOperation, UpdateEdgeOperation, DeleteEdgeOperation],
+    Field(discriminator="op"),
+]
+
+class BatchModel(BaseModel):
+    operations: list[BatchOperation]
+
+
 router = APIRouter()
 
+
+async def graph_write_lock(graph_id: int):
+    """Dependency holding the graph's write lock for the whole request; readers never wait for it."""
+    async with graphs.lock(graph_id):
+        yield
+
+
+def _graph_payload(graph_id: int, graph: Graph) -> bytes:
+    """JSON bytes of a graph in the toJSON shape plus id and version, built from the graph's cached payload."""
+    return b'{"id":%d,"version":%d,' % (graph_id, graph.version) + graph.to_json_bytes()[1:]
+
+
+def _graph_etag(graph_id: int, graph: Graph) -> str:
+    return f'"{graph_id}-{graph.version}"'
+
+
+# One entity tag of an If-None-Match list, optionally weak, or the wildcard
+_ENTITY_TAG = re.compile(r'\s*(\*|(?:W/)?"[^"]*")\s*(?:,|$)')
+
+
+def _matches_etag(etag: str, if_none_match: str | None) -> bool:
+    """Whether If-None-Match lists `etag` or is `*`; weak tags match their strong form, as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    for match in _ENTITY_TAG.finditer(if_none_match):
+        tag = match.group(1)
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _graph_response(graph_id: int, graph: Graph | None) -> Response | None:
+    """Response with a graph's settings, nodes and edges (edges reference nodes by name)."""
+    if graph is None:
+        return None
+    return Response(
+        content=_graph_payload(graph_id, graph),
+        media_type="application/json",
+        headers={"ETag": _graph_etag(graph_id, graph)},
+    )
+
+
+@router.get("/graphs/summary")
+async def get_graph_summaries(
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+    fields: str | None = None,
+):
+    """One page of graph metadata without nodes and edges.
+
+    `fields` is a comma separated projection of the summary fields; graph settings
+    can be requested as well, which loads the graphs of the page.
+    """
+    selected = fields.split(",") if fields else list(SUMMARY_FIELDS)
+    invalid = [field for field in selected if field not in SUMMARY_FIELDS and field not in GRAPH_SETTINGS]
+    if invalid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(invalid)}")
+
+    total, page = graphs.summaries(offset=offset, limit=limit)
+    items = []
+    for summary in page:
+        item = {}
+        for field in selected:
+            if field in summary:
+                item[field] = summary[field]
+            else:
+                item[field] = getattr(graphs.get_graph_by_id(summary["id"]), field)
+        items.append(item)
+    return {"total": total, "offset": offset, "limit": limit, "graphs": items}
+
 @router.get("/graphs/{graph_id}")
-async def get_graphs(graph_id: int):
-    return graphs.get_graph_by_id(graph_id)
+async def get_graphs(graph_id: int, if_none_match: Annotated[str | None, Header()] = None):
+    graph = graphs.get_graph_by_id(graph_id)
+    if graph is not None and _matches_etag(_graph_etag(graph_id, graph), if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": _graph_etag(graph_id, graph)})
+    return _graph_response(graph_id, graph)
+
+@router.get("/graphs/{graph_id}/events")
+async def get_graph_events(
+    graph_id: int,
+    since: Annotated[int | None, Query(ge=0)] = None,
+    last_event_id: Annotated[str | None, Header()] = None,
+):
+    """Server-sent events with every change record of the graph as it happens.
+
+    Each `change` event has the version as its id, so a reconnecting EventSource resumes
+    through Last-Event-ID; `since` does the same explicitly. A `resync` event means the
+    client has to fetch the whole graph again.
+    """
+    if graphs.get_graph_by_id(graph_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    if since is None and last_event_id is not None and last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        broadcaster.stream(graph_id, since=since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/graphs/{graph_id}/changes")
+async def get_graph_changes(graph_id: int, since: int):
+    """Change records applied since version `since`; 410 if they are no longer in the change log."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    changes = graph.changes_since(since)
+    if changes is None:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Changes no longer available, reload the graph")
+    return {"version": graph.version, "changes": changes}
 
 @router.get("/graphs/")
 async def get_graphs():
-    return graphs.graphs
+    payloads = [_graph_payload(graph_id, graph) for graph_id, graph in graphs.graphs.items()]
+    return Response(content=b"[" + b",".join(payloads) + b"]", media_type="application/json")
 
 @router.post("/graphs/")
 async def create_graph(graph: GraphModel):
     new_graph = Graph(name=graph.name)
-    #TODO replace with proper append method
-    graphs.graphs.append(new_graph)
+    graph_id = graphs.add_graph(new_graph)
     graphs.save_to_json()
-    return new_graph.toJSON()
+    return {"id": graph_id, **new_graph.toJSON()}
 
 
 @router.get("/graphs/{graph_id}/nodes")
-async def get_edges(graph_id: int):
-    return graphs.get_graph_by_id(graph_id).nodes
-
-@router.post("/graphs/{graph_id}/nodes")
+async def get_nodes(
+    graph_id: int,
+    response: Response,
+    category: str | None = None,
+    parent: str | None = None,
+    prefix: str | None = None,
+    cursor: str | None = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+):
+    """Nodes ordered by name, optionally filtered.
+
+    With `limit`, the X-Next-Cursor header holds the cursor of the next page.
+    """
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    if category is None and parent is None and prefix is None and cursor is None and limit is None:
+        return graph.snapshot().nodes
+    nodes, next_cursor = graph.query_nodes(category=category, parent=parent, prefix=prefix, cursor=cursor, limit=limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return nodes
+
+@router.post("/graphs/{graph_id}/nodes", dependencies=[Depends(graph_write_lock)])
 async def create_node(graph_id: int, node_model: NodeModel):
     graph = graphs.get_graph_by_id(graph_id)
     new_node = Node(
@@ -79,24 +303,25 @@ async def create_node(graph_id: int, node_model: NodeModel):
     )
     graph.add_node(new_node)
     graphs.save_to_json()
-    return graph
+    return _graph_response(graph_id, graph)
 
-@router.patch("/graphs/{graph_id}/nodes")
+@router.patch("/graphs/{graph_id}/nodes", dependencies=[Depends(graph_write_lock)])
 async def update_all_nodes(graph_id: int, nodes_model: NodesModel):
     graph = graphs.get_graph_by_id(graph_id)
     for node_model in nodes_model.nodes:
-        node = graph.get_node_by_name(node_model.name)
-        if node:
-            if node_model.position_x is not None:
-                node.position_x = node_model.position_x
-            if node_model.position_y is not None:
-                node.position_y = node_model.position_y
-            if node_model.description is not None:
-                node.description = node_model.description
+        fields = {}
+        if node_model.position_x is not None:
+            fields["position_x"] = node_model.position_x
+        if node_model.position_y is not None:
+            fields["position_y"] = node_model.position_y
+        if node_model.description is not None:
+            fields["description"] = node_model.description
+        if fields:
+            graph.update_node_fields(node_model.name, **fields)
     graphs.save_to_json()
     return {"message": "Nodes updated"}
 
-@router.delete("/graphs/{graph_id}/nodes")
+@router.delete("/graphs/{graph_id}/nodes", dependencies=[Depends(graph_write_lock)])
 async def delete_node(graph_id: int, node_name: str):
     graph = graphs.get_graph_by_id(graph_id)
     if graph and graph.delete_node(node_name):
@@ -104,27 +329,203 @@ async def delete_node(graph_id: int, node_name: str):
         return {"message": "Node deleted"}
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node not found")
 
-@router.patch("/graphs/{graph_id}/nodes/{node_name}")
+@router.post("/graphs/{graph_id}/nodes/delete", dependencies=[Depends(graph_write_lock)])
+async def delete_nodes(graph_id: int, nodes_model: NodeNamesModel):
+    """Deletes many nodes and their edges with a single save; unknown names are skipped."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    deleted = graph.delete_nodes(nodes_model.names)
+    if deleted:
+        graphs.save_to_json()
+    return {"deleted": deleted}
+
+@router.patch("/graphs/{graph_id}/nodes/{node_name}", dependencies=[Depends(graph_write_lock)])
 async def update_node(graph_id: int, node_name: str, node_model: NodeModel):
     graph = graphs.get_graph_by_id(graph_id)
-    # Use update_node instead of rename_node
-    # Note: we might need to update the underlying graph.update_node signature if we want to pass description there too, 
-    # but for now we can set it directly if update_node doesn't support it, or assumes we just rename.
-    # Let's check if we can just set the description directly after update.
-    node = graph.get_node_by_name(node_name)
-    if node:
-        node.description = node_model.description
-    
-    if graph and graph.update_node(node_name, node_model.name, node_model.category, node_model.parent):
+    # Checked up front so a failing rename leaves the description untouched as well
+    renamed_onto_existing = node_model.name != node_name and graph and graph.get_node_by_name(node_model.name)
+    if not graph or not graph.get_node_by_name(node_name) or renamed_onto_existing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node or graph not found")
+
+    # update_node handles name, category and parent; the description is a plain node field
+    graph.update_node_fields(node_name, description=node_model.description)
+    graph.update_node(node_name, node_model.name, node_model.category, node_model.parent)
+    graphs.save_to_json()
+    return {"message": "Node updated"}
+
+@router.get("/graphs/{graph_id}/nodes/{node_name}/subtree")
+async def get_subtree(graph_id: int, node_name: str):
+    """A node followed by all nodes grouped below it."""
+    graph = graphs.get_graph_by_id(graph_id)
+    members = graph.subtree(node_name) if graph else []
+    if not members:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node or graph not found")
+    return members
+
+@router.post("/graphs/{graph_id}/nodes/{node_name}/move", dependencies=[Depends(graph_write_lock)])
+async def move_subtree(graph_id: int, node_name: str, move: SubtreeMoveModel):
+    """Re-parents a node and/or shifts the positions of its whole subtree by (dx, dy)."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    try:
+        moved = graph.move_subtree(node_name, new_parent=move.parent, dx=move.dx, dy=move.dy)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not moved:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node not found")
+    graphs.save_to_json()
+    return {"message": "Subtree moved"}
+
+@router.get("/graphs/{graph_id}/nodes/{node_name}/collapsed")
+async def get_collapsed_group(graph_id: int, node_name: str):
+    """The group as a single node: its members and its edges aggregated per neighbouring group."""
+    graph = graphs.get_graph_by_id(graph_id)
+    collapsed = graph.collapse_group(node_name) if graph else None
+    if collapsed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node or graph not found")
+    return collapsed
+
+@router.delete("/graphs/{graph_id}/nodes/{node_name}/subtree", dependencies=[Depends(graph_write_lock)])
+async def delete_subtree(graph_id: int, node_name: str):
+    """Deletes a node together with everything grouped below it."""
+    graph = graphs.get_graph_by_id(graph_id)
+    deleted = graph.delete_subtree(node_name) if graph else []
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node or graph not found")
+    graphs.save_to_json()
+    return {"deleted": deleted}
+
+@router.post("/graphs/{graph_id}/layout")
+async def layout_graph(graph_id: int, layout: LayoutModel):
+    """Computes node positions on the server and stores them like a bulk position update.
+
+    The layout is computed off the loop from a snapshot, without blocking writers; if the
+    graph changed meanwhile nothing is stored and the response is 409.
+    """
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    snapshot = graph.snapshot()
+    positions = await asyncio.to_thread(
+        compute_layout, snapshot, mode=layout.mode, incremental=layout.incremental, spacing=layout.spacing
+    )
+    async with graphs.lock(graph_id):
+        if graphs.get_graph_by_id(graph_id) is not graph or graph.version != snapshot.version:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="Graph changed during the layout, try again"
+            )
+        # One change record for the whole layout
+        xs, ys = zip(*positions.values()) if positions else ((), ())
+        graph.move_nodes(list(positions), list(xs), list(ys))
+    if positions:
         graphs.save_to_json()
-        return {"message": "Node updated"}
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node or graph not found")
+    return {"nodes": [{"name": name, "position_x": x, "position_y": y} for name, (x, y) in positions.items()]}
+
+@router.get("/graphs/{graph_id}/positions")
+async def get_positions(graph_id: int):
+    """Node names and positions as parallel arrays; `order` versions the indices of position updates."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    order, names = graph.node_order()
+    nodes = [graph.get_node_by_name(name) for name in names]
+    return {
+        "order": order,
+        "names": names,
+        "x": [node.position_x for node in nodes],
+        "y": [node.position_y for node in nodes],
+    }
+
+@router.post("/graphs/{graph_id}/positions", status_code=status.HTTP_202_ACCEPTED)
+async def update_positions(graph_id: int, request: Request):
+    """Moves nodes addressed by their index in the node order, e.g. continuously while dragging.
+
+    The body is a PositionsModel as JSON, or its binary form (see PositionBuffer) when sent
+    as application/octet-stream. Updates are coalesced and applied shortly after; a 409
+    means the node order changed and the client has to fetch it again.
+    """
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    body = await request.body()
+    try:
+        if request.headers.get("content-type") == POSITIONS_MEDIA_TYPE:
+            order, indices, xs, ys = decode_positions(body)
+        else:
+            positions = PositionsModel.model_validate_json(body)
+            order, indices, xs, ys = positions.order, positions.index, positions.x, positions.y
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if not len(indices) == len(xs) == len(ys):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="index, x and y differ in length")
+    if not indices:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No positions given")
+
+    current_order, names = graph.node_order()
+    if order != current_order:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail=f"Node order changed at version {current_order}"
+        )
+    if any(not 0 <= i < len(names) for i in indices):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Node index out of range")
+    position_buffer.add(graph_id, [names[i] for i in indices], xs, ys)
+    return {"accepted": len(indices)}
+
+@router.get("/graphs/{graph_id}/viewport")
+async def get_viewport(graph_id: int, x0: float, y0: float, x1: float, y1: float):
+    """Nodes positioned inside the box plus all edges touching them, in the graph's JSON shape."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    if not all(math.isfinite(value) for value in (x0, y0, x1, y1)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Viewport bounds must be finite")
+    nodes, edges = graph.viewport(x0, y0, x1, y1)
+    return {"nodes": [vars(node) for node in nodes], "edges": [edge.toJSON() for edge in edges]}
+
+@router.get("/graphs/{graph_id}/lod")
+async def get_level_of_detail(
+    graph_id: int,
+    by: Literal["parent", "category", "cell"] = "parent",
+    cell_size: Annotated[int | None, Query(gt=0)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """Clusters of nodes with aggregated edge counts between them, for zoomed-out rendering."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    etag = _graph_etag(graph_id, graph)
+    if _matches_etag(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    lod = graph.level_of_detail(by=by, cell_size=cell_size)
+    return Response(
+        content=orjson.dumps({"version": graph.version, **lod}), media_type="application/json", headers={"ETag": etag}
+    )
 
 @router.get("/graphs/{graph_id}/edges")
-async def get_edges(graph_id: int):
-    return graphs.get_graph_by_id(graph_id).edges
+async def get_edges(
+    graph_id: int,
+    response: Response,
+    style: str | None = None,
+    start_node: str | None = None,
+    end_node: str | None = None,
+    node: str | None = None,
+    cursor: Annotated[str | None, Query(pattern=r"^\d+$")] = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+):
+    """Edges in insertion order, optionally filtered by style or endpoint; paginated like get_nodes."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+    edges, next_cursor = graph.query_edges(
+        style=style, start=start_node, end=end_node, node=node, cursor=cursor, limit=limit
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return edges
 
-@router.post("/graphs/{graph_id}/edges")
+@router.post("/graphs/{graph_id}/edges", dependencies=[Depends(graph_write_lock)])
 async def create_edge(graph_id: int, edge_model: EdgeModel):
     graph = graphs.get_graph_by_id(graph_id)
     start_node = graph.get_node_by_name(edge_model.start_node)
@@ -135,16 +536,39 @@ async def create_edge(graph_id: int, edge_model: EdgeModel):
         new_edge = Edge(start=start_node, end=end_node, description=edge_model.description, style=edge_model.style)
         graph.add_edge(new_edge)
         graphs.save_to_json()
-    return graph
+    return _graph_response(graph_id, graph)
 
-@router.delete("/graphs/{graph_id}")
+@router.post("/graphs/{graph_id}/batch", dependencies=[Depends(graph_write_lock)])
+async def apply_graph_batch(graph_id: int, batch: BatchModel):
+    """Applies an ordered list of node/edge operations atomically with a single save."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if graph is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+
+    operations = [operation.model_dump() for operation in batch.operations]
+    try:
+        apply_batch(graph, operations)
+    except BatchValidationError as e:
+        results = [
+            {"index": i, "op": operation["op"], "status": "rejected" if error else "valid", "error": error}
+            for i, (operation, error) in enumerate(zip(operations, e.errors))
+        ]
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": str(e), "results": results})
+
+    graphs.save_to_json()
+    return {
+        "results": [{"index": i, "op": operation["op"], "status": "applied"} for i, operation in enumerate(operations)]
+    }
+
+@router.delete("/graphs/{graph_id}", dependencies=[Depends(graph_write_lock)])
 async def delete_graph(graph_id: int):
     if graphs.delete_graph(graph_id):
+        broadcaster.close(graph_id)
         graphs.save_to_json()
         return {"message": "Graph deleted"}
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
 
-@router.patch("/graphs/{graph_id}")
+@router.patch("/graphs/{graph_id}", dependencies=[Depends(graph_write_lock)])
 async def update_graph(graph_id: int, graph_model: GraphUpdateModel):
     updated = False
     
@@ -154,8 +578,17 @@ async def update_graph(graph_id: int, graph_model: GraphUpdateModel):
             updated = True
     
     # Settings updates handles optional kwargs natively
-    if graph_model.edge_mode is not None or graph_model.show_node_borders is not None or graph_model.show_edge_descriptions is not None:
-        if graphs.update_graph_settings(graph_id, edge_mode=graph_model.edge_mode, show_node_borders=graph_model.show_node_borders, show_edge_descriptions=graph_model.show_edge_descriptions):
+    if (
+        graph_model.edge_mode is not None
+        or graph_model.show_node_borders is not None
+        or graph_model.show_edge_descriptions is not None
+    ):
+        if graphs.update_graph_settings(
+            graph_id,
+            edge_mode=graph_model.edge_mode,
+            show_node_borders=graph_model.show_node_borders,
+            show_edge_descriptions=graph_model.show_edge_descriptions,
+        ):
             updated = True
             
     if updated:
@@ -179,7 +612,7 @@ async def export_graph(graph_id: int):
     if graph is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
 
-    export_data = {"graph": graph.toJSON()}
+    export_data = {"graph": graph.snapshot().toJSON()}
     filename = f"{graph.name.replace(' ', '_')}_graph.json"
     return JSONResponse(
         content=export_data,
@@ -189,33 +622,76 @@ async def export_graph(graph_id: int):
     )
 
 
+@router.get("/graphs/{graph_id}/export/stream")
+async def export_graph_stream(graph_id: int):
+    """Export a graph as NDJSON: one settings record, then one line per node and per edge."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if graph is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+
+    filename = f"{graph.name.replace(' ', '_')}_graph.ndjson"
+    # Taken here on the loop: StreamingResponse iterates a sync generator in a worker thread
+    snapshot = graph.snapshot()
+    return StreamingResponse(
+        iter_graph_ndjson(snapshot),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        },
+    )
+
+
 @router.post("/graphs/import")
 async def import_graph(import_model: GraphImportModel):
     """Import a graph from a JSON payload and add it as a new graph."""
     graph_dict = import_model.graph
-
-    # Resolve name collisions by appending " (imported)"
     desired_name = graph_dict.get("name", "Imported Graph")
-    existing_names = {g.name for g in graphs.graphs}
-    if desired_name in existing_names:
-        base = desired_name
-        desired_name = f"{base} (imported)"
-        # Keep incrementing if still colliding
-        counter = 2
-        while desired_name in existing_names:
-            desired_name = f"{base} (imported {counter})"
-            counter += 1
-    graph_dict["name"] = desired_name
-
-    new_graph = graphs.graph_from_dict(graph_dict)
-    graphs.graphs.append(new_graph)
+    if desired_name is not None and not isinstance(desired_name, str):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Graph name must be a string")
+    graph_dict["name"] = _unique_import_name(desired_name)
+    try:
+        new_graph = graphs.graph_from_dict(graph_dict)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    new_id = graphs.add_graph(new_graph)
+    graphs.save_to_json()
+    return {"new_graph_id": new_id, "message": "Graph imported"}
+
+
+@router.post("/graphs/import/stream")
+async def import_graph_stream(request: Request):
+    """Import a graph from an NDJSON body (see export/stream), building it as the upload arrives."""
+    reader = NdjsonGraphReader()
+    try:
+        async for chunk in request.stream():
+            reader.feed(chunk)
+        new_graph = reader.finish()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    new_graph.update_settings(name=_unique_import_name(new_graph.name or "Imported Graph"))
+    new_id = graphs.add_graph(new_graph)
     graphs.save_to_json()
-    new_id = len(graphs.graphs) - 1
     return {"new_graph_id": new_id, "message": "Graph imported"}
 
+
+def _unique_import_name(desired_name: str) -> str:
+    """Resolves name collisions by appending " (imported)", then " (imported 2)" and so on."""
+    existing_names = set(graphs.graph_names())
+    if desired_name not in existing_names:
+        return desired_name
+    base = desired_name
+    desired_name = f"{base} (imported)"
+    # Keep incrementing if still colliding
+    counter = 2
+    while desired_name in existing_names:
+        desired_name = f"{base} (imported {counter})"
+        counter += 1
+    return desired_name
+
 @router.get("/graphs/{graph_id}/blast-radius/{node_name}")
 async def get_blast_radius(graph_id: int, node_name: str):
-    import networkx as nx
     graph = graphs.get_graph_by_id(graph_id)
     if not graph:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
@@ -223,12 +699,24 @@ async def get_blast_radius(graph_id: int, node_name: str):
     if not graph.get_node_by_name(node_name):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node not found")
 
-    G = graph.to_networkx()
     # descendants returns all nodes reachable from the source
-    blast_radius = list(nx.descendants(G, node_name))
+    blast_radius = graph.reachability().descendants(node_name)
     return {"blast_radius": blast_radius, "node": node_name}
 
-@router.delete("/graphs/{graph_id}/edges")
+@router.get("/graphs/{graph_id}/blast-radius/{node_name}/{target_name}")
+async def get_is_affected(graph_id: int, node_name: str, target_name: str):
+    """Checks whether `target_name` lies in the blast radius of `node_name`."""
+    graph = graphs.get_graph_by_id(graph_id)
+    if not graph:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph not found")
+
+    if not graph.get_node_by_name(node_name) or not graph.get_node_by_name(target_name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node not found")
+
+    affected = graph.reachability().is_reachable(node_name, target_name)
+    return {"node": node_name, "target": target_name, "affected": affected}
+
+@router.delete("/graphs/{graph_id}/edges", dependencies=[Depends(graph_write_lock)])
 async def delete_edge(graph_id: int, start_node: str, end_node: str):
     graph = graphs.get_graph_by_id(graph_id)
     if graph and graph.delete_edge(start_node, end_node):
@@ -236,10 +724,12 @@ async def delete_edge(graph_id: int, start_node: str, end_node: str):
         return {"message": "Edge deleted"}
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Edge not found")
 
-@router.patch("/graphs/{graph_id}/edges")
+@router.patch("/graphs/{graph_id}/edges", dependencies=[Depends(graph_write_lock)])
 async def update_edge(graph_id: int, edge_model: EdgeModel):
     graph = graphs.get_graph_by_id(graph_id)
-    if graph and graph.update_edge(edge_model.start_node, edge_model.end_node, edge_model.description, edge_model.style):
+    if graph and graph.update_edge(
+        edge_model.start_node, edge_model.end_node, edge_model.description, edge_model.style
+    ):
         graphs.save_to_json()
         return {"message": "Edge updated"}
     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Edge not found")
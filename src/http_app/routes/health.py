@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving, whether or not graphs are loaded yet."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz(request: Request):
+    """Readiness with graph load progress; 503 until every graph has been loaded or if loading failed."""
+    loader = getattr(request.app.state, "loader", None)
+    if loader is None:
+        return {"ready": True}
+    progress = loader.progress()
+    return JSONResponse(progress, status_code=200 if progress["ready"] else 503)
@@ -311,9 +311,9 @@ document.addEventListener('DOMContentLoaded', function () {
                 elements.push({
                     group: 'edges',
                     data: {
-                        id: `${edge.start.name}->${edge.end.name}_${index}`,
-                        source: edge.start.name,
-                        target: edge.end.name,
+                        id: `${edge.start}->${edge.end}_${index}`,
+                        source: edge.start,
+                        target: edge.end,
                         description: edge.description,
                         style: edge.style
                     }
@@ -774,29 +774,39 @@ document.addEventListener('DOMContentLoaded', function () {
     /**
      * Fetches the list of graphs and populates the graph selector dropdown.
      */
-    async function fetchAndPopulateGraphSelector(targetIndex = 0) {
+    async function fetchAndPopulateGraphSelector(targetGraphId = null) {
         const graphSelector = document.getElementById('graph-selector');
         graphSelector.innerHTML = '';
 
         try {
-            const response = await fetch(`${API_BASE_URL}/graphs/`);
-            if (!response.ok) {
-                throw new Error(`Network response was not ok: ${response.statusText}`);
+            // Ids and names only, page by page, so listing does not load every graph on the server
+            const graphsList = [];
+            while (true) {
+                const params = new URLSearchParams({ offset: graphsList.length, limit: 500, fields: 'id,name' });
+                const response = await fetch(`${API_BASE_URL}/graphs/summary?${params}`);
+                if (!response.ok) {
+                    throw new Error(`Network response was not ok: ${response.statusText}`);
+                }
+                const page = await response.json();
+                graphsList.push(...page.graphs);
+                if (page.graphs.length === 0 || graphsList.length >= page.total) {
+                    break;
+                }
             }
-            const graphsList = await response.json();
 
             if (graphsList.length > 0) {
-                graphsList.forEach((graph, index) => {
+                graphsList.forEach((graph) => {
                     const option = document.createElement('option');
-                    option.value = index;
-                    option.textContent = graph.name || `Graph ${index}`;
+                    option.value = graph.id;
+                    option.textContent = graph.name || `Graph ${graph.id}`;
                     graphSelector.appendChild(option);
                 });
 
-                let targetId = (targetIndex !== undefined && targetIndex !== null && targetIndex < graphsList.length) ? targetIndex : 0;
-                currentGraphId = targetId;
+                // Graph IDs are stable but not contiguous; fall back to the first graph if the target is gone
+                const targetGraph = graphsList.find(graph => graph.id === targetGraphId) || graphsList[0];
+                currentGraphId = targetGraph.id;
                 graphSelector.value = currentGraphId;
-                mainGraphTitle.textContent = graphsList[targetId].name || `Graph ${targetId}`;
+                mainGraphTitle.textContent = targetGraph.name || `Graph ${targetGraph.id}`;
                 initializeGraph(currentGraphId);
                 history.replaceState(null, '', `?graph=${currentGraphId}`);
             } else {
@@ -1348,12 +1358,10 @@ document.addEventListener('DOMContentLoaded', function () {
             });
             if (!response.ok) throw new Error('Failed to create graph');
 
+            const createdGraph = await response.json();
             showToast(`Graph "${graphName}" created!`, 'success');
             event.target.reset();
-            await fetchAndPopulateGraphSelector();
-
-            // Auto-select the new graph (simplification: just re-fetching selects the first one, 
-            // but we could improve this to select the last added)
+            await fetchAndPopulateGraphSelector(createdGraph.id);
         } catch (error) {
             console.error(error);
             showToast('Error creating graph.', 'error');
@@ -1463,10 +1471,10 @@ document.addEventListener('DOMContentLoaded', function () {
     async function main() {
         await fetchUiConfig();
         const urlParams = new URLSearchParams(window.location.search);
-        let initialGraphId = 0;
+        let initialGraphId = null;
         if (urlParams.has('graph')) {
             initialGraphId = parseInt(urlParams.get('graph'), 10);
-            if (isNaN(initialGraphId)) initialGraphId = 0;
+            if (isNaN(initialGraphId)) initialGraphId = null;
         }
         await fetchAndPopulateGraphSelector(initialGraphId);
     }
@@ -1604,7 +1612,8 @@ document.addEventListener('DOMContentLoaded', function () {
             if (isNaN(graphId)) graphId = 0;
         }
         const graphSelector = document.getElementById('graph-selector');
-        if (graphSelector && graphSelector.options && graphSelector.options.length > graphId) {
+        const hasGraph = graphSelector && Array.from(graphSelector.options).some(option => parseInt(option.value, 10) === graphId);
+        if (hasGraph) {
             currentGraphId = graphId;
             graphSelector.value = currentGraphId;
             const selectedOption = graphSelector.options[graphSelector.selectedIndex];
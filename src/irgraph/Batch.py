@@ -0,0 +1,118 @@
+from irgraph.Graph import NODE_FIELDS
+
+
+class BatchValidationError(ValueError):
+    """Raised when a batch is rejected; `errors` holds one message (or None) per operation."""
+
+    def __init__(self, errors: list[str | None]):
+        super().__init__("Batch rejected")
+        self.errors = errors
+
+
+class BatchValidator(object):
+    """Checks an ordered list of change records against a graph without modifying it.
+
+    Instead of copying the graph, it keeps an overlay of the node names and edge counts
+    touched by the batch, so validation costs time proportional to the batch and the
+    degree of the nodes it touches.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        # Node name -> exists, for names created, deleted or renamed by the batch
+        self._exists: dict[str, bool] = {}
+        # Current name -> name in the graph, for renamed nodes that keep their edges
+        self._origin: dict[str, str] = {}
+        # Names whose edges in the graph no longer apply (deleted or renamed away)
+        self._detached: set[str] = set()
+        self._edge_delta: dict[tuple[str, str], int] = {}
+
+    def node_exists(self, name: str) -> bool:
+        if name in self._exists:
+            return self._exists[name]
+        return self.graph.get_node_by_name(name) is not None
+
+    def _graph_name(self, name: str) -> str | None:
+        if name in self._origin:
+            return self._origin[name]
+        return None if name in self._detached else name
+
+    def edge_count(self, start: str, end: str) -> int:
+        if not (self.node_exists(start) and self.node_exists(end)):
+            return 0
+        graph_start, graph_end = self._graph_name(start), self._graph_name(end)
+        count = 0
+        if graph_start is not None and graph_end is not None:
+            count = sum(1 for edge in self.graph.get_outgoing_edges(graph_start) if edge.end.name == graph_end)
+        return count + self._edge_delta.get((start, end), 0)
+
+    def check(self, operation: dict) -> str | None:
+        """Validates one operation and records its effect; returns an error message or None."""
+        op = operation.get("op")
+        if op == "add_node":
+            name = operation["node"]["name"]
+            if self.node_exists(name):
+                return f"Node {name} already exists"
+            self._exists[name] = True
+            self._detached.add(name)
+        elif op == "delete_node":
+            name = operation["name"]
+            if not self.node_exists(name):
+                return f"Node {name} not found"
+            self._exists[name] = False
+            self._detached.add(name)
+            self._origin.pop(name, None)
+            self._edge_delta = {key: count for key, count in self._edge_delta.items() if name not in key}
+        elif op == "update_node":
+            old_name, new_name = operation["old_name"], operation["new_name"]
+            if not self.node_exists(old_name):
+                return f"Node {old_name} not found"
+            if new_name != old_name:
+                if self.node_exists(new_name):
+                    return f"Node {new_name} already exists"
+                self._rename(old_name, new_name)
+        elif op == "update_node_fields":
+            if not self.node_exists(operation["name"]):
+                return f"Node {operation['name']} not found"
+            invalid = [key for key in operation["fields"] if key not in NODE_FIELDS]
+            if invalid:
+                return f"Node fields {', '.join(invalid)} cannot be updated"
+        elif op == "add_edge":
+            start, end = operation["edge"]["start"], operation["edge"]["end"]
+            if not (self.node_exists(start) and self.node_exists(end)):
+                return "Node names incorrect"
+            self._edge_delta[(start, end)] = self._edge_delta.get((start, end), 0) + 1
+        elif op in ("update_edge", "delete_edge"):
+            start, end = operation["start"], operation["end"]
+            if self.edge_count(start, end) < 1:
+                return f"Edge {start} -> {end} not found"
+            if op == "delete_edge":
+                self._edge_delta[(start, end)] = self._edge_delta.get((start, end), 0) - 1
+        else:
+            return f"Unknown operation {op}"
+        return None
+
+    def _rename(self, old_name: str, new_name: str) -> None:
+        graph_name = self._graph_name(old_name)
+        self._exists[old_name] = False
+        self._exists[new_name] = True
+        self._detached.add(old_name)
+        self._origin.pop(old_name, None)
+        if graph_name is not None:
+            self._origin[new_name] = graph_name
+        else:
+            self._detached.add(new_name)
+        renamed = {}
+        for (start, end), count in self._edge_delta.items():
+            renamed[(new_name if start == old_name else start, new_name if end == old_name else end)] = count
+        self._edge_delta = renamed
+
+
+def apply_batch(graph, operations: list[dict]) -> None:
+    """Applies change records all-or-nothing: the whole batch is validated before the first one is applied."""
+    validator = BatchValidator(graph)
+    errors = [validator.check(operation) for operation in operations]
+    if any(errors):
+        raise BatchValidationError(errors)
+    for operation in operations:
+        graph.apply_change(operation)
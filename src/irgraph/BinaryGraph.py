@@ -0,0 +1,227 @@
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+from irgraph.Edge import Edge
+from irgraph.Graph import Graph
+from irgraph.Node import Node
+
+MAGIC = b"IRGB"
+FORMAT_VERSION = 1
+
+# magic, format version, journal_seq, graph version, string count, string bytes, node count, edge count
+HEADER = struct.Struct("<4sHxxQQIIII")
+# name, edge_mode, show_node_borders, show_edge_descriptions
+SETTINGS = struct.Struct("<iiii")
+
+# Integer columns per node: name, category, parent, description (string indexes), flags
+NODE_INTS = 5
+# Integer columns per edge: start, end (node indexes), directed, description, style (string indexes)
+EDGE_INTS = 5
+
+# Node flags: the position was stored as an int, not a float
+X_IS_INT = 1
+Y_IS_INT = 2
+
+# String index of None
+NONE = -1
+
+
+class BinaryGraph(object):
+    """A graph shard in a compact binary form that is memory-mapped and materialized on demand.
+
+    Layout (little-endian): header, graph settings, string offsets (uint32, one past the
+    end), the UTF-8 string table, node positions (float64 pairs, NaN for None), node
+    columns (int32) and edge columns (int32). Strings are stored once and referenced by
+    index; edges reference nodes by their position, so materializing needs no name lookups.
+    Opening a file only reads the header.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, "rb") as binary_file:
+            self._buffer = mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header = HEADER.unpack_from(self._buffer, 0)
+        except struct.error as e:
+            self.close()
+            raise ValueError(f"{file_path} is not a binary graph") from e
+        magic, format_version, self.journal_seq, self.version = header[:4]
+        self._string_count, self._string_bytes, self.node_count, self.edge_count = header[4:]
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{file_path} is not a binary graph of format {FORMAT_VERSION}")
+        if len(self._buffer) != _size(self._string_count, self._string_bytes, self.node_count, self.edge_count):
+            self.close()
+            raise ValueError(f"{file_path} is truncated")
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def materialize(self) -> Graph:
+        """Builds the Graph, trusting the node and edge references written by encode_graph."""
+        offset = HEADER.size
+        name, edge_mode, show_node_borders, show_edge_descriptions = SETTINGS.unpack_from(self._buffer, offset)
+        offset += SETTINGS.size
+        string_offsets = _read_array("I", self._buffer, offset, self._string_count + 1)
+        offset += 4 * (self._string_count + 1)
+        blob = self._buffer[offset:offset + self._string_bytes]
+        strings = [blob[string_offsets[i]:string_offsets[i + 1]].decode() for i in range(self._string_count)]
+        offset = _align(offset + self._string_bytes)
+        positions = _read_array("d", self._buffer, offset, 2 * self.node_count)
+        offset += 8 * 2 * self.node_count
+        node_ints = _read_array("i", self._buffer, offset, NODE_INTS * self.node_count)
+        offset += 4 * NODE_INTS * self.node_count
+        edge_ints = _read_array("i", self._buffer, offset, EDGE_INTS * self.edge_count)
+
+        def string(index: int) -> str | None:
+            return None if index == NONE else strings[index]
+
+        nodes = []
+        for i in range(self.node_count):
+            name_index, category, parent, description, flags = node_ints[NODE_INTS * i:NODE_INTS * (i + 1)]
+            nodes.append(Node(
+                name=strings[name_index],
+                category=string(category),
+                position_x=_position(positions[2 * i], flags & X_IS_INT),
+                position_y=_position(positions[2 * i + 1], flags & Y_IS_INT),
+                parent=string(parent),
+                description=string(description),
+            ))
+        edges = []
+        for i in range(self.edge_count):
+            start, end, directed, description, style = edge_ints[EDGE_INTS * i:EDGE_INTS * (i + 1)]
+            edges.append(Edge(
+                nodes[start], nodes[end], directed=bool(directed), description=string(description), style=string(style),
+            ))
+
+        graph = Graph(
+            name=string(name),
+            edge_mode=string(edge_mode),
+            show_node_borders=bool(show_node_borders),
+            show_edge_descriptions=bool(show_edge_descriptions),
+        )
+        graph.restore(nodes, edges, self.version)
+        return graph
+
+
+def encode_graph(graph_object: dict) -> bytes:
+    """Encodes a shard (Graph.toJSON plus "journal_seq" and "version") as a binary graph.
+
+    Raises ValueError for fields the format cannot hold, e.g. a string position or a
+    numeric description; such a graph can only be stored as JSON.
+    """
+    strings: dict[str, int] = {}
+
+    def index(value: str | None) -> int:
+        if value is None:
+            return NONE
+        if not isinstance(value, str):
+            raise ValueError(f"Cannot store {value!r} as a string")
+        return strings.setdefault(value, len(strings))
+
+    settings = SETTINGS.pack(
+        index(graph_object.get("name")),
+        index(graph_object.get("edge_mode", "bezier")),
+        bool(graph_object.get("show_node_borders", False)),
+        bool(graph_object.get("show_edge_descriptions", True)),
+    )
+
+    node_indexes: dict[str, int] = {}
+    positions = array("d")
+    node_ints = array("i")
+    for node in graph_object.get("nodes", []):
+        # NONE is not a valid name index, so a missing name has to be rejected here
+        if not isinstance(node["name"], str):
+            raise ValueError(f"Cannot store node name {node['name']!r}")
+        if node["name"] in node_indexes:
+            continue
+        node_indexes[node["name"]] = len(node_indexes)
+        x, y = node.get("position_x"), node.get("position_y")
+        positions.extend((_coordinate(x), _coordinate(y)))
+        flags = (X_IS_INT if isinstance(x, int) else 0) | (Y_IS_INT if isinstance(y, int) else 0)
+        node_ints.extend((
+            index(node["name"]),
+            index(node.get("category")),
+            index(node.get("parent")),
+            index(node.get("description")),
+            flags,
+        ))
+
+    edge_ints = array("i")
+    for edge in graph_object.get("edges", []):
+        start, end = node_indexes.get(edge["start"]), node_indexes.get(edge["end"])
+        # Same as add_edge_by_node_names: edges between unknown nodes are dropped
+        if start is None or end is None:
+            continue
+        edge_ints.extend((
+            start,
+            end,
+            bool(edge.get("directed", True)),
+            index(edge.get("description")),
+            index(edge.get("style", "solid")),
+        ))
+
+    encoded = [value.encode() for value in strings]
+    string_offsets = array("I", [0])
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+    blob = b"".join(encoded)
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, graph_object.get("journal_seq", 0), graph_object.get("version", 0),
+        len(encoded), len(blob), len(node_indexes), len(edge_ints) // EDGE_INTS,
+    )
+    unaligned = HEADER.size + SETTINGS.size + len(string_offsets) * 4 + len(blob)
+    padding = b"\0" * (_align(unaligned) - unaligned)
+    return b"".join((
+        header, settings, _little_endian(string_offsets), blob, padding,
+        _little_endian(positions), _little_endian(node_ints), _little_endian(edge_ints),
+    ))
+
+
+def _coordinate(value: int | float | None) -> float:
+    if value is None:
+        return math.nan
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Cannot store {value!r} as a position")
+    return value
+
+
+def _size(string_count: int, string_bytes: int, node_count: int, edge_count: int) -> int:
+    strings_end = HEADER.size + SETTINGS.size + 4 * (string_count + 1) + string_bytes
+    return _align(strings_end) + 8 * 2 * node_count + 4 * NODE_INTS * node_count + 4 * EDGE_INTS * edge_count
+
+
+def _align(offset: int) -> int:
+    """Rounds up to a multiple of 8, so the float64 positions are aligned."""
+    return (offset + 7) & ~7
+
+
+def _read_array(typecode: str, buffer, offset: int, count: int) -> array:
+    values = array(typecode)
+    values.frombytes(buffer[offset:offset + count * values.itemsize])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _position(value: float, is_int: int) -> int | float | None:
+    if math.isnan(value):
+        return None
+    return int(value) if is_int else value
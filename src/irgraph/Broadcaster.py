@@ -0,0 +1,141 @@
+import asyncio
+from typing import AsyncIterator
+
+import orjson
+
+
+def encode_event(event: str, data: dict | None = None, event_id: int | None = None) -> bytes:
+    """A server-sent event frame; `data` is sent as one line of JSON."""
+    frame = b"" if event_id is None else b"id: %d\n" % event_id
+    frame += b"event: " + event.encode() + b"\n"
+    if data is not None:
+        frame += b"data: " + orjson.dumps(data) + b"\n"
+    return frame + b"\n"
+
+
+class Subscription(object):
+    def __init__(self, maxsize: int):
+        # (version, encoded frame) of every change published since subscribing
+        self.queue: asyncio.Queue[tuple[int, bytes]] = asyncio.Queue(maxsize)
+        # Final frame once the subscription is over (the client fell behind or the graph is gone)
+        self.end: bytes | None = None
+
+    def finish(self, frame: bytes) -> None:
+        if self.end is None:
+            self.end = frame
+        try:
+            # Wakes up a stream waiting on an empty queue
+            self.queue.put_nowait((-1, b""))
+        except asyncio.QueueFull:
+            pass
+
+
+class Broadcaster(object):
+    """Pushes the change records of graphs to live subscribers as server-sent events.
+
+    The first subscriber of a graph registers one Graph observer. That observer encodes
+    every change record once, tagged with the version it produced, and hands the same
+    bytes to each subscriber's queue. A subscriber that falls QUEUE_SIZE events behind
+    is sent `resync` and disconnected, as the client has to reload the graph anyway.
+    """
+
+    QUEUE_SIZE = 1000
+    # Idle streams send a comment this often, so proxies keep the connection open
+    KEEPALIVE_SECONDS = 15
+
+    def __init__(self, graphs):
+        self.graphs = graphs
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._observers: dict[int, tuple] = {}
+
+    def subscriber_count(self, graph_id: int) -> int:
+        return len(self._subscriptions.get(graph_id, ()))
+
+    def subscribe(self, graph_id: int) -> Subscription | None:
+        graph = self.graphs.get_graph_by_id(graph_id)
+        if graph is None:
+            return None
+        if graph_id not in self._observers:
+            def observer(change: dict) -> None:
+                self._publish(graph_id, graph.version, change)
+            graph.subscribe(observer)
+            self._observers[graph_id] = (graph, observer)
+        subscription = Subscription(self.QUEUE_SIZE)
+        self._subscriptions.setdefault(graph_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, graph_id: int, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(graph_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[graph_id]
+            graph, observer = self._observers.pop(graph_id)
+            graph.unsubscribe(observer)
+
+    def close(self, graph_id: int) -> None:
+        """Ends all streams of a graph, e.g. after it was deleted."""
+        for subscription in self._subscriptions.get(graph_id, ()):
+            subscription.finish(encode_event("deleted"))
+
+    def resync(self, graph_id: int) -> None:
+        """Ends all streams of a graph whose Graph was replaced, e.g. after another process changed it."""
+        for subscription in self._subscriptions.pop(graph_id, ()):
+            subscription.finish(encode_event("resync"))
+        if graph_id in self._observers:
+            graph, observer = self._observers.pop(graph_id)
+            graph.unsubscribe(observer)
+
+    def _publish(self, graph_id: int, version: int, change: dict) -> None:
+        subscriptions = self._subscriptions.get(graph_id)
+        if not subscriptions:
+            return
+        # Encoded once, whatever the number of subscribers
+        frame = encode_event("change", {"version": version, **change}, event_id=version)
+        for subscription in subscriptions:
+            if subscription.end is not None:
+                continue
+            try:
+                subscription.queue.put_nowait((version, frame))
+            except asyncio.QueueFull:
+                subscription.finish(encode_event("resync"))
+
+    async def stream(self, graph_id: int, since: int | None = None) -> AsyncIterator[bytes]:
+        """Frames of the changes of a graph, starting after version `since` if given.
+
+        Changes since `since` are replayed from the graph's change log; if it no longer
+        covers them the stream starts with `resync`. Without `since` it starts with a
+        `ready` event carrying the current version.
+        """
+        subscription = self.subscribe(graph_id)
+        if subscription is None:
+            yield encode_event("deleted")
+            return
+        try:
+            graph = self._observers[graph_id][0]
+            version = graph.version
+            if since is None:
+                yield encode_event("ready", {"version": version}, event_id=version)
+            else:
+                changes = graph.changes_since(since)
+                if changes is None:
+                    yield encode_event("resync")
+                    return
+                for change in changes:
+                    yield encode_event("change", change, event_id=change["version"])
+
+            while True:
+                try:
+                    change_version, frame = await asyncio.wait_for(subscription.queue.get(), self.KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if subscription.end is not None:
+                    yield subscription.end
+                    return
+                # Changes published before the replay above already went out
+                if change_version > version:
+                    yield frame
+        finally:
+            self.unsubscribe(graph_id, subscription)
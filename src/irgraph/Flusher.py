@@ -0,0 +1,75 @@
+import asyncio
+import logging
+
+
+class Flusher(object):
+    """Writes changes of a Graphs registry behind the event loop.
+
+    save_to_json only flags the registry as dirty; a background task waits for the
+    coalescing window so a burst of edits ends up in a single write, collects the
+    changes on the loop and hands the file IO to a worker thread.
+    """
+
+    def __init__(self, graphs, window: float = 0.5):
+        self.graphs = graphs
+        self.window = window
+        self._pending = False
+        self._compact = False
+        self._stopping = False
+        self._requested: asyncio.Event | None = None
+        self._stopped: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._stopping = False
+        self._requested = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def request(self, compact: bool = False) -> None:
+        """Schedules a save; several requests within one window are written together."""
+        self._pending = True
+        self._compact = self._compact or compact
+        self._requested.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._requested.wait()
+            if not self._stopping:
+                # Let the rest of the burst arrive; stop() cuts the window short
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+            self._requested.clear()
+            if self._pending:
+                try:
+                    await self.flush()
+                except Exception:
+                    # Keeps the task alive; the next save tries again
+                    logging.exception("Error saving graphs")
+            if self._stopping:
+                return
+
+    async def flush(self) -> None:
+        """Collects pending changes now and writes them in a worker thread."""
+        compact, self._compact, self._pending = self._compact, False, False
+        batch = self.graphs.collect_changes(compact=compact)
+        try:
+            await asyncio.to_thread(self.graphs.write_changes, batch)
+        except Exception:
+            logging.exception(f"Error writing graphs to {self.graphs.data_dir}")
+            self.graphs.requeue_changes(batch)
+
+    async def stop(self) -> None:
+        """Writes the requested changes that are still pending and ends the background task."""
+        if not self.is_running():
+            return
+        self._stopping = True
+        self._stopped.set()
+        self._requested.set()
+        await self._task
+        self._task = None
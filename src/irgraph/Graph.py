@@ -1,22 +1,103 @@
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from itertools import islice
+from typing import Callable
+
+import orjson
+
 from irgraph.Node import Node
 from irgraph.Edge import Edge
+from irgraph.Reachability import ReachabilityIndex
+from irgraph.Snapshot import GraphSnapshot
 from pydantic import GetCoreSchemaHandler
 from pydantic_core import core_schema
 
+# Node attributes that can be changed in place without touching the graph structure
+NODE_FIELDS = ("position_x", "position_y", "description")
+
+GRAPH_SETTINGS = ("name", "edge_mode", "show_node_borders", "show_edge_descriptions")
+
+# How level_of_detail groups nodes into clusters
+LOD_GROUPINGS = ("parent", "category", "cell")
+
+
 class Graph(object):
+    # Number of recent change records kept for clients syncing by version
+    CHANGE_LOG_SIZE = 1000
+    # Side of a cell of the spatial index, in canvas coordinates
+    GRID_CELL_SIZE = 500
+
     def __init__(self, name: str = "", nodes:list = None, edges: list = None, edge_mode: str = "bezier", show_node_borders: bool = False, show_edge_descriptions: bool = True):
         self.name = name
         self.edge_mode = edge_mode
         self.show_node_borders = show_node_borders
         self.show_edge_descriptions = show_edge_descriptions
-        self.nodes = []
+        # Nodes are keyed by name and edges kept in an insertion-ordered dict used as a set,
+        # so lookups and deletes are O(1) while `nodes`/`edges` keep their original ordering.
+        self._nodes: dict[str, Node] = {}
+        # Insertion number -> node, the node order; a rename only re-keys _nodes and _node_ids
+        self._ordered_nodes: dict[int, Node] = {}
+        self._node_ids: dict[str, int] = {}
+        self._next_node_id = 0
+        self._edges: dict[Edge, None] = {}
+        # Adjacency maps: node name -> edges leaving / entering that node
+        self._out_edges: dict[str, dict[Edge, None]] = {}
+        self._in_edges: dict[str, dict[Edge, None]] = {}
+        # Secondary indexes for queries; node name lists are kept sorted for prefix scans and cursors
+        self._sorted_names: list[str] = []
+        self._by_category: dict[str, list[str]] = {}
+        self._children: dict[str, list[str]] = {}
+        self._by_style: dict[str, dict[Edge, None]] = {}
+        # Uniform grid over node positions: cell -> names of the positioned nodes in it
+        self._grid: dict[tuple[int, int], dict[str, None]] = {}
+        # Bounds of the occupied cells in _extent_version, see _grid_extent
+        self._extent: tuple[int, int, int, int] | None = None
+        self._extent_version = -1
+        # Edge -> insertion number, the cursor of edge queries
+        self._edge_ids: dict[Edge, int] = {}
+        self._next_edge_id = 0
+        # Callbacks receiving a change record (a JSON-serializable dict) after every mutation
+        self._observers: list[Callable[[dict], None]] = []
+        # Incremented on every mutation; derived structures record the version they reflect
+        self.version = 0
+        # The last CHANGE_LOG_SIZE change records, each tagged with the version it produced
+        self._change_log: deque[dict] = deque(maxlen=self.CHANGE_LOG_SIZE)
+        self._projection = None
+        self._projection_version = -1
+        self._reachability: ReachabilityIndex | None = None
+        self._reachability_version = -1
+        self._snapshot: GraphSnapshot | None = None
+        self._payload: bytes | None = None
+        self._payload_version = -1
+        # (grouping, cell size) -> level-of-detail view of the version in _lod_version
+        self._lod: dict[tuple[str, int], dict] = {}
+        self._lod_version = -1
+        # Node names in insertion order, the addressing of move_nodes updates by index
+        self._node_order: list[str] | None = None
+        self._node_order_version = -1
         if nodes:
             self.add_nodes(nodes)
 
-        self.edges = []
         if edges:
             self.add_edges(edges)
 
+    @property
+    def nodes(self) -> list[Node]:
+        return list(self._ordered_nodes.values())
+
+    @property
+    def edges(self) -> list[Edge]:
+        return list(self._edges)
+
+    @property
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edges)
+
     def __repr__(self):
         return f"Graph(nodes={self.nodes}, edges={self.edges})"
 
@@ -40,13 +121,43 @@ class Graph(object):
     #         raise ValueError("Expected an instance of Graph")
     #     return graph_instance # Return the validated instance
 
+    def subscribe(self, observer: Callable[[dict], None]) -> None:
+        self._observers.append(observer)
+
+    def unsubscribe(self, observer: Callable[[dict], None]) -> None:
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _emit(self, change: dict) -> None:
+        self.version += 1
+        self._change_log.append({"version": self.version, **change})
+        renamed = change["op"] == "update_node" and change["old_name"] != change["new_name"]
+        if change["op"] in ("add_node", "delete_node") or renamed:
+            self._node_order = None
+        if self._projection is not None and self._projection_version == self.version - 1:
+            self._update_projection(change)
+            self._projection_version = self.version
+        if self._reachability is not None and self._reachability_version == self.version - 1:
+            # Deleting one of several parallel edges leaves reachability unchanged
+            if change["op"] != "delete_edge" or self._find_edge(change["start"], change["end"]) is None:
+                self._reachability.apply_change(change)
+            self._reachability_version = self.version
+        for observer in self._observers:
+            observer(change)
+
     def add_node(self, new_node: Node):
         if not isinstance(new_node, Node):
             raise TypeError("Node must be type 'Node'")
-        for node in self.nodes:
-            if node.name == new_node.name:
-                return
-        self.nodes.append(new_node)
+        if new_node.name in self._nodes:
+            return
+        self._nodes[new_node.name] = new_node
+        self._node_ids[new_node.name] = self._next_node_id
+        self._ordered_nodes[self._next_node_id] = new_node
+        self._next_node_id += 1
+        self._out_edges[new_node.name] = {}
+        self._in_edges[new_node.name] = {}
+        self._index_node(new_node)
+        self._emit({"op": "add_node", "node": dict(vars(new_node))})
         
     def add_nodes(self, nodes: [Node]):
         if isinstance(nodes, list):
@@ -60,13 +171,19 @@ class Graph(object):
         if not isinstance(edge, Edge):
             raise TypeError("Node must be type 'Node'")
 
-        if edge.start not in self.nodes:
+        if self._nodes.get(edge.start.name) is not edge.start:
             raise ValueError(f"Start node {edge.start.name} is not in graph")
         
-        if edge.end not in self.nodes:
+        if self._nodes.get(edge.end.name) is not edge.end:
             raise ValueError(f"Start node {edge.end} is not in graph")
 
-        self.edges.append(edge)
+        self._edges[edge] = None
+        self._out_edges[edge.start.name][edge] = None
+        self._in_edges[edge.end.name][edge] = None
+        self._by_style.setdefault(edge.style, {})[edge] = None
+        self._edge_ids[edge] = self._next_edge_id
+        self._next_edge_id += 1
+        self._emit({"op": "add_edge", "edge": edge.toJSON()})
         
     def add_edges(self, edges: [Edge]):
         if isinstance(edges, list):
@@ -77,10 +194,7 @@ class Graph(object):
 
     def get_node_by_name(self, name: str) -> Node | None:
         if isinstance(name, str):
-            for node in self.nodes:
-                if node.name == name:
-                    return node
-            return None
+            return self._nodes.get(name)
         else:
             raise TypeError("Edges to add must be in a list")
 
@@ -97,12 +211,85 @@ class Graph(object):
             self.add_edge(new_edge)
             return new_edge
 
+    def get_outgoing_edges(self, node_name: str) -> list[Edge]:
+        return list(self._out_edges.get(node_name, ()))
+
+    def get_incoming_edges(self, node_name: str) -> list[Edge]:
+        return list(self._in_edges.get(node_name, ()))
+
+    def _find_edge(self, start_node: str, end_node: str) -> Edge | None:
+        for edge in self._out_edges.get(start_node, ()):
+            if edge.end.name == end_node:
+                return edge
+        return None
+
+    def _remove_edge(self, edge: Edge) -> None:
+        del self._edges[edge]
+        del self._out_edges[edge.start.name][edge]
+        del self._in_edges[edge.end.name][edge]
+        self._unindex(self._by_style, edge.style, edge)
+        del self._edge_ids[edge]
+
+    def _index_node(self, node: Node) -> None:
+        insort(self._sorted_names, node.name)
+        insort(self._by_category.setdefault(node.category, []), node.name)
+        if node.parent is not None:
+            insort(self._children.setdefault(node.parent, []), node.name)
+        self._index_position(node)
+
+    def _unindex_node(self, node: Node) -> None:
+        self._remove_sorted(self._sorted_names, node.name)
+        self._remove_sorted(self._by_category[node.category], node.name)
+        if not self._by_category[node.category]:
+            del self._by_category[node.category]
+        if node.parent is not None:
+            self._remove_sorted(self._children[node.parent], node.name)
+            if not self._children[node.parent]:
+                del self._children[node.parent]
+        self._unindex_position(node)
+
+    @staticmethod
+    def _position(node: Node) -> tuple[float, float] | None:
+        """The node's position, or None unless both coordinates are finite numbers."""
+        x, y = node.position_x, node.position_y
+        if not (isinstance(x, (int, float)) and isinstance(y, (int, float)) and math.isfinite(x) and math.isfinite(y)):
+            return None
+        return x, y
+
+    def _grid_cell(self, node: Node, cell_size: int | None = None) -> tuple[int, int] | None:
+        position = self._position(node)
+        if position is None:
+            return None
+        cell_size = cell_size or self.GRID_CELL_SIZE
+        return int(position[0] // cell_size), int(position[1] // cell_size)
+
+    def _index_position(self, node: Node) -> None:
+        cell = self._grid_cell(node)
+        if cell is not None:
+            self._grid.setdefault(cell, {})[node.name] = None
+
+    def _unindex_position(self, node: Node) -> None:
+        cell = self._grid_cell(node)
+        if cell is not None:
+            self._unindex(self._grid, cell, node.name)
+
+    @staticmethod
+    def _remove_sorted(names: list[str], name: str) -> None:
+        del names[bisect_left(names, name)]
+
+    @staticmethod
+    def _unindex(index: dict, key, item) -> None:
+        del index[key][item]
+        if not index[key]:
+            del index[key]
+
     def delete_edge(self, start_node: str, end_node: str) -> bool:
-        for i, edge in enumerate(self.edges):
-            if edge.start.name == start_node and edge.end.name == end_node:
-                del self.edges[i]
-                return True
-        return False
+        edge = self._find_edge(start_node, end_node)
+        if edge is None:
+            return False
+        self._remove_edge(edge)
+        self._emit({"op": "delete_edge", "start": start_node, "end": end_node})
+        return True
 
     def delete_node(self, node_name: str) -> bool:
         """Deletes a node by name and all associated edges."""
@@ -110,29 +297,49 @@ class Graph(object):
         if not node_to_delete:
             return False
         
-        # Remove associated edges
-        self.edges = [e for e in self.edges if e.start.name != node_name and e.end.name != node_name]
+        # Remove associated edges, found through the adjacency maps
+        for edge in list(self._out_edges[node_name]) + list(self._in_edges[node_name]):
+            if edge in self._edges:
+                self._remove_edge(edge)
         
         # Remove node
-        self.nodes = [n for n in self.nodes if n.name != node_name]
+        self._unindex_node(node_to_delete)
+        del self._nodes[node_name]
+        del self._ordered_nodes[self._node_ids.pop(node_name)]
+        del self._out_edges[node_name]
+        del self._in_edges[node_name]
         
         # Clear parent references in remaining nodes
-        for node in self.nodes:
-            if node.parent == node_name:
-                node.parent = None
+        for child_name in self._children.pop(node_name, []):
+            self._nodes[child_name].parent = None
 
+        self._emit({"op": "delete_node", "name": node_name})
         return True
 
+    def delete_nodes(self, node_names: list[str]) -> list[str]:
+        """Deletes several nodes with their edges in one pass; returns the names that existed."""
+        deleted = []
+        for node_name in dict.fromkeys(node_names):
+            if self.delete_node(node_name):
+                deleted.append(node_name)
+        return deleted
+
     def update_node(self, old_name: str, new_name: str, new_category: str = None, new_parent: str = None) -> bool:
         """Updates a node's name and optional category."""
         node = self.get_node_by_name(old_name)
         if not node:
             return False
+        if new_name != old_name and self.get_node_by_name(new_name):
+            return False # New name already exists
 
+        self._unindex_node(node)
         if new_name != old_name:
-            if self.get_node_by_name(new_name):
-                return False # New name already exists
             node.name = new_name
+            # Re-key the indexes; _ordered_nodes keeps the node at its original position
+            self._nodes[new_name] = self._nodes.pop(old_name)
+            self._node_ids[new_name] = self._node_ids.pop(old_name)
+            self._out_edges[new_name] = self._out_edges.pop(old_name)
+            self._in_edges[new_name] = self._in_edges.pop(old_name)
             
         if new_category is not None:
             node.category = new_category
@@ -150,17 +357,397 @@ class Graph(object):
                 node.parent = None
             else:
                 node.parent = new_parent
-            
+        self._index_node(node)
+
+        self._emit({
+            "op": "update_node",
+            "old_name": old_name,
+            "new_name": new_name,
+            "category": new_category,
+            "parent": new_parent,
+        })
+        return True
+
+    def update_node_fields(self, node_name: str, **fields) -> bool:
+        """Sets plain node attributes (positions, description) without structural changes."""
+        node = self.get_node_by_name(node_name)
+        if not node:
+            return False
+        for key in fields:
+            if key not in NODE_FIELDS:
+                raise ValueError(f"Node field {key} cannot be updated")
+        moved = "position_x" in fields or "position_y" in fields
+        if moved:
+            self._unindex_position(node)
+        for key, value in fields.items():
+            setattr(node, key, value)
+        if moved:
+            self._index_position(node)
+        self._emit({"op": "update_node_fields", "name": node_name, "fields": fields})
         return True
 
+    def move_nodes(self, names: list[str], xs: list[float], ys: list[float]) -> int:
+        """Sets the positions of several nodes with a single change record; unknown names are skipped.
+
+        The record holds the positions as parallel arrays, so a bulk move is one journal
+        entry and one event. Returns the number of nodes moved.
+        """
+        moved = {"names": [], "x": [], "y": []}
+        for name, x, y in zip(names, xs, ys):
+            node = self._nodes.get(name)
+            if node is None:
+                continue
+            self._unindex_position(node)
+            node.position_x, node.position_y = x, y
+            self._index_position(node)
+            moved["names"].append(name)
+            moved["x"].append(x)
+            moved["y"].append(y)
+        if moved["names"]:
+            self._emit({"op": "move_nodes", **moved})
+        return len(moved["names"])
+
+    def node_order(self) -> tuple[int, list[str]]:
+        """The version since which the node order holds, and the node names in that order.
+
+        Clients address nodes by their index in this list; the version tells whether the
+        indices they hold are still valid. Only adding, deleting and renaming nodes change it.
+        """
+        if self._node_order is None:
+            self._node_order = [node.name for node in self._ordered_nodes.values()]
+            self._node_order_version = self.version
+        return self._node_order_version, self._node_order
+
     def update_edge(self, start_node: str, end_node: str, description: str, style: str = None) -> bool:
-        for edge in self.edges:
-            if edge.start.name == start_node and edge.end.name == end_node:
-                edge.description = description
-                if style is not None:
-                    edge.style = style
-                return True
-        return False
+        edge = self._find_edge(start_node, end_node)
+        if edge is None:
+            return False
+        edge.description = description
+        if style is not None:
+            self._unindex(self._by_style, edge.style, edge)
+            edge.style = style
+            bucket = self._by_style.setdefault(style, {})
+            newest = next(reversed(bucket), None)
+            bucket[edge] = None
+            # Buckets stay in edge id order, which query_edges pages by; an older edge is sorted in
+            if newest is not None and self._edge_ids[newest] > self._edge_ids[edge]:
+                self._by_style[style] = dict.fromkeys(sorted(bucket, key=self._edge_ids.__getitem__))
+        self._emit({
+            "op": "update_edge", "start": start_node, "end": end_node, "description": description, "style": style,
+        })
+        return True
+
+    def update_settings(self, **settings) -> None:
+        """Updates graph-level settings such as the name or edge mode."""
+        for key in settings:
+            if key not in GRAPH_SETTINGS:
+                raise ValueError(f"Unknown graph setting {key}")
+        for key, value in settings.items():
+            setattr(self, key, value)
+        self._emit({"op": "update_settings", "settings": settings})
+
+    def apply_change(self, change: dict) -> None:
+        """Re-applies a change record produced by this class, e.g. when replaying a journal."""
+        op = change["op"]
+        if op == "add_node":
+            self.add_node(Node(**change["node"]))
+        elif op == "delete_node":
+            self.delete_node(change["name"])
+        elif op == "update_node":
+            self.update_node(change["old_name"], change["new_name"], change["category"], change["parent"])
+        elif op == "update_node_fields":
+            self.update_node_fields(change["name"], **change["fields"])
+        elif op == "move_nodes":
+            self.move_nodes(change["names"], change["x"], change["y"])
+        elif op == "add_edge":
+            edge = change["edge"]
+            self.add_edge_by_node_names(
+                edge["start"], edge["end"],
+                directed=edge["directed"], description=edge["description"], style=edge["style"],
+            )
+        elif op == "delete_edge":
+            self.delete_edge(change["start"], change["end"])
+        elif op == "update_edge":
+            self.update_edge(change["start"], change["end"], change["description"], change["style"])
+        elif op == "update_settings":
+            self.update_settings(**change["settings"])
+        else:
+            raise ValueError(f"Unknown change operation {op}")
+
+    def get_children(self, node_name: str) -> list[Node]:
+        return [self._nodes[name] for name in self._children.get(node_name, ())]
+
+    def subtree(self, node_name: str) -> list[Node]:
+        """The node followed by all its descendants (breadth first), or [] if it does not exist."""
+        if node_name not in self._nodes:
+            return []
+        names = [node_name]
+        seen = {node_name}
+        for name in names:
+            # Parent references are plain strings and may form a cycle
+            for child in self._children.get(name, ()):
+                if child not in seen:
+                    seen.add(child)
+                    names.append(child)
+        return [self._nodes[name] for name in names]
+
+    def move_subtree(self, node_name: str, new_parent: str | None = None, dx: float = 0, dy: float = 0) -> bool:
+        """Re-parents a node (`new_parent` "" ungroups it) and shifts the positions of its whole subtree."""
+        members = self.subtree(node_name)
+        if not members:
+            return False
+        if new_parent:
+            if new_parent not in self._nodes:
+                raise ValueError(f"Node {new_parent} not found")
+            if any(member.name == new_parent for member in members):
+                raise ValueError(f"Node {new_parent} is part of the subtree of {node_name}")
+        if new_parent is not None:
+            self.update_node(node_name, node_name, new_parent=new_parent)
+        if dx or dy:
+            for member in members:
+                if member.position_x is not None and member.position_y is not None:
+                    self.update_node_fields(
+                        member.name, position_x=member.position_x + dx, position_y=member.position_y + dy
+                    )
+        return True
+
+    def delete_subtree(self, node_name: str) -> list[str]:
+        """Deletes a node with all its descendants; returns the deleted names."""
+        names = [member.name for member in self.subtree(node_name)]
+        self.delete_nodes(names[::-1])
+        return names
+
+    def collapse_group(self, node_name: str) -> dict | None:
+        """View of a group collapsed into one node: its members and its edges aggregated per group.
+
+        Endpoints outside the group are replaced by their ancestor at the level of the
+        group, so edges into a sibling group are counted once for that group.
+        """
+        members = self.subtree(node_name)
+        if not members:
+            return None
+        member_names = {member.name for member in members}
+        level = self._nodes[node_name].parent
+
+        aggregated: dict[tuple[str, str], int] = {}
+        for member in members:
+            for edge in self._out_edges[member.name]:
+                if edge.end.name not in member_names:
+                    key = (node_name, self._group_at_level(edge.end.name, level))
+                    aggregated[key] = aggregated.get(key, 0) + 1
+            for edge in self._in_edges[member.name]:
+                if edge.start.name not in member_names:
+                    key = (self._group_at_level(edge.start.name, level), node_name)
+                    aggregated[key] = aggregated.get(key, 0) + 1
+        return {
+            "group": node_name,
+            "members": [member.name for member in members],
+            "edges": [{"start": start, "end": end, "count": count} for (start, end), count in aggregated.items()],
+        }
+
+    def _group_at_level(self, node_name: str, level: str | None) -> str:
+        """The ancestor of `node_name` whose parent is `level`, or its topmost ancestor."""
+        name, seen = node_name, {node_name}
+        while True:
+            parent = self._nodes[name].parent
+            if parent == level or parent not in self._nodes or parent in seen:
+                return name
+            seen.add(parent)
+            name = parent
+
+    def level_of_detail(self, by: str = "parent", cell_size: int | None = None) -> dict:
+        """The graph as clusters with aggregated edges between them, for zoomed-out views.
+
+        Nodes are grouped by their topmost parent group, by category or by spatial grid
+        cell (unpositioned nodes share one cluster). Each cluster has its size, the
+        centre of its positioned members and its category counts; edges inside a cluster
+        are dropped, the others are counted per pair of clusters. Cached per version.
+        """
+        if by not in LOD_GROUPINGS:
+            raise ValueError(f"Unknown grouping {by}")
+        cell_size = cell_size or self.GRID_CELL_SIZE
+        if self._lod_version != self.version:
+            self._lod, self._lod_version = {}, self.version
+        if (by, cell_size) not in self._lod:
+            self._lod[(by, cell_size)] = self._aggregate(by, cell_size)
+        return self._lod[(by, cell_size)]
+
+    def _aggregate(self, by: str, cell_size: int) -> dict:
+        cluster_of: dict[str, str] = {}
+        clusters: dict[str, dict] = {}
+        for node in self._ordered_nodes.values():
+            if by == "parent":
+                key = self._group_at_level(node.name, None)
+            elif by == "category":
+                key = node.category
+            else:
+                cell = self._grid_cell(node, cell_size)
+                key = f"{cell[0]},{cell[1]}" if cell is not None else None
+            cluster_of[node.name] = key
+            cluster = clusters.setdefault(
+                key, {"id": key, "size": 0, "x": 0.0, "y": 0.0, "positioned": 0, "categories": {}}
+            )
+            cluster["size"] += 1
+            cluster["categories"][node.category] = cluster["categories"].get(node.category, 0) + 1
+            position = self._position(node)
+            if position is not None:
+                cluster["x"] += position[0]
+                cluster["y"] += position[1]
+                cluster["positioned"] += 1
+        for cluster in clusters.values():
+            positioned = cluster.pop("positioned")
+            cluster["x"] = cluster["x"] / positioned if positioned else None
+            cluster["y"] = cluster["y"] / positioned if positioned else None
+
+        aggregated: dict[tuple[str, str], int] = {}
+        for edge in self._edges:
+            key = (cluster_of[edge.start.name], cluster_of[edge.end.name])
+            if key[0] != key[1]:
+                aggregated[key] = aggregated.get(key, 0) + 1
+        return {
+            "by": by,
+            "clusters": list(clusters.values()),
+            "edges": [{"start": start, "end": end, "count": count} for (start, end), count in aggregated.items()],
+        }
+
+    def category_counts(self) -> dict[str, int]:
+        return {category: len(names) for category, names in self._by_category.items() if category is not None}
+
+    def recategorize(self, old_category: str, new_category: str) -> int:
+        """Moves all nodes of `old_category` to `new_category`; returns the number of nodes moved."""
+        names = list(self._by_category.get(old_category, []))
+        for name in names:
+            self.update_node(name, name, new_category=new_category)
+        return len(names)
+
+    def query_nodes(
+        self,
+        category: str | None = None,
+        parent: str | None = None,
+        prefix: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[Node], str | None]:
+        """Nodes matching all given filters, ordered by name, plus the cursor of the next page.
+
+        The most selective index (parent, then category, then all names) is scanned from
+        the cursor or the name prefix onwards, so a page costs O(log n + page) when at
+        most one of parent and category is given.
+        """
+        if parent is not None:
+            names = self._children.get(parent, [])
+        elif category is not None:
+            names = self._by_category.get(category, [])
+        else:
+            names = self._sorted_names
+        start = bisect_left(names, prefix) if prefix else 0
+        if cursor is not None:
+            start = max(start, bisect_right(names, cursor))
+
+        page = []
+        for name in islice(names, start, None):
+            if prefix and not name.startswith(prefix):
+                break
+            node = self._nodes[name]
+            if category is not None and node.category != category:
+                continue
+            if limit is not None and len(page) == limit:
+                return page, page[-1].name
+            page.append(node)
+        return page, None
+
+    def query_edges(
+        self,
+        style: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+        node: str | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[Edge], str | None]:
+        """Edges matching all given filters in insertion order, plus the cursor of the next page.
+
+        `node` matches edges incident to that node in either direction. Candidates come
+        from the adjacency maps when an endpoint is given, otherwise from the style index.
+        """
+        if start is not None:
+            candidates = self._out_edges.get(start, {})
+        elif end is not None:
+            candidates = self._in_edges.get(end, {})
+        elif node is not None:
+            candidates = {**self._out_edges.get(node, {}), **self._in_edges.get(node, {})}
+            candidates = dict.fromkeys(sorted(candidates, key=self._edge_ids.__getitem__))
+        elif style is not None:
+            candidates = self._by_style.get(style, {})
+        else:
+            candidates = self._edges
+        after = int(cursor) if cursor is not None else -1
+
+        page = []
+        for edge in candidates:
+            if self._edge_ids[edge] <= after:
+                continue
+            if style is not None and edge.style != style:
+                continue
+            if start is not None and edge.start.name != start:
+                continue
+            if end is not None and edge.end.name != end:
+                continue
+            if node is not None and node not in (edge.start.name, edge.end.name):
+                continue
+            if limit is not None and len(page) == limit:
+                return page, str(self._edge_ids[page[-1]])
+            page.append(edge)
+        return page, None
+
+    def _grid_extent(self) -> tuple[int, int, int, int] | None:
+        """(min column, max column, min row, max row) of the occupied grid cells, cached per version."""
+        if self._extent_version != self.version:
+            if self._grid:
+                columns = [column for column, _ in self._grid]
+                rows = [row for _, row in self._grid]
+                self._extent = (min(columns), max(columns), min(rows), max(rows))
+            else:
+                self._extent = None
+            self._extent_version = self.version
+        return self._extent
+
+    def nodes_in_box(self, x0: float, y0: float, x1: float, y1: float) -> list[Node]:
+        """Positioned nodes with x0 <= x <= x1 and y0 <= y <= y1, found through the spatial grid.
+
+        Only the grid cells overlapping the box are scanned (or the occupied cells, if fewer),
+        so the cost follows the size of the box rather than the graph.
+        """
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        size = self.GRID_CELL_SIZE
+        extent = self._grid_extent()
+        if extent is None:
+            return []
+        # Clamped to the occupied cells, so a huge box costs no more than the whole grid
+        min_column, max_column, min_row, max_row = extent
+        columns = range(max(int(x0 // size), min_column), min(int(x1 // size), max_column) + 1)
+        rows = range(max(int(y0 // size), min_row), min(int(y1 // size), max_row) + 1)
+        if len(columns) * len(rows) <= len(self._grid):
+            cells = [self._grid.get((column, row), ()) for column in columns for row in rows]
+        else:
+            cells = [names for (column, row), names in self._grid.items() if column in columns and row in rows]
+        nodes = []
+        for names in cells:
+            for name in names:
+                node = self._nodes[name]
+                if x0 <= node.position_x <= x1 and y0 <= node.position_y <= y1:
+                    nodes.append(node)
+        return nodes
+
+    def viewport(self, x0: float, y0: float, x1: float, y1: float) -> tuple[list[Node], list[Edge]]:
+        """The nodes inside a box and every edge touching one of them, in insertion order."""
+        nodes = self.nodes_in_box(x0, y0, x1, y1)
+        edges = {}
+        for node in nodes:
+            edges.update(self._out_edges[node.name])
+            edges.update(self._in_edges[node.name])
+        return nodes, sorted(edges, key=self._edge_ids.__getitem__)
 
     def toJSON(self):
         return {
@@ -168,15 +755,115 @@ class Graph(object):
             'edge_mode': self.edge_mode,
             'show_node_borders': self.show_node_borders,
             'show_edge_descriptions': self.show_edge_descriptions,
-            'nodes': [vars(node) for node in self.nodes],
-            'edges': [ edge.toJSON() for edge in self.edges]
+            'nodes': [vars(node) for node in self._ordered_nodes.values()],
+            'edges': [ edge.toJSON() for edge in self._edges]
         }
 
+    def restore_version(self, version: int) -> None:
+        """Sets the version of a graph rebuilt from storage; the records of the rebuild are dropped."""
+        self.version = version
+        self._change_log.clear()
+
+    def restore(self, nodes: list[Node], edges: list[Edge], version: int) -> None:
+        """Fills an empty graph from storage in one pass, without change records or per-edge checks.
+
+        The edges must reference the given node objects, as in a graph written by this class.
+        """
+        self._nodes = {node.name: node for node in nodes}
+        self._ordered_nodes = dict(enumerate(self._nodes.values()))
+        self._node_ids = {node.name: node_id for node_id, node in self._ordered_nodes.items()}
+        self._next_node_id = len(self._ordered_nodes)
+        self._out_edges = {name: {} for name in self._nodes}
+        self._in_edges = {name: {} for name in self._nodes}
+        self._sorted_names = sorted(self._nodes)
+        for name in self._sorted_names:
+            node = self._nodes[name]
+            self._by_category.setdefault(node.category, []).append(name)
+            if node.parent is not None:
+                self._children.setdefault(node.parent, []).append(name)
+            self._index_position(node)
+        self._edges = dict.fromkeys(edges)
+        for edge_id, edge in enumerate(self._edges):
+            self._out_edges[edge.start.name][edge] = None
+            self._in_edges[edge.end.name][edge] = None
+            self._by_style.setdefault(edge.style, {})[edge] = None
+            self._edge_ids[edge] = edge_id
+        self._next_edge_id = len(self._edges)
+        self._node_order = None
+        self._extent_version = -1
+        self.restore_version(version)
+
+    def changes_since(self, version: int) -> list[dict] | None:
+        """Change records applied after `version`, oldest first.
+
+        Returns None if `version` is ahead of the graph or older than the change log,
+        in which case the caller has to fetch the whole graph again.
+        """
+        if version > self.version:
+            return None
+        oldest = self._change_log[0]["version"] if self._change_log else self.version + 1
+        if version < oldest - 1:
+            return None
+        return list(islice(self._change_log, version - oldest + 1, None))
+
+    def snapshot(self) -> GraphSnapshot:
+        """Immutable copy of the current version, shared by all readers until the next mutation."""
+        if self._snapshot is None or self._snapshot.version != self.version:
+            self._snapshot = GraphSnapshot.of(self)
+        return self._snapshot
+
+    def to_json_bytes(self) -> bytes:
+        """toJSON encoded as UTF-8 JSON bytes, cached until the next mutation."""
+        if self._payload is None or self._payload_version != self.version:
+            self._payload = orjson.dumps(self.snapshot().toJSON())
+            self._payload_version = self.version
+        return self._payload
+
+    def analytics_graph(self):
+        """Structure-only networkx DiGraph for analytics, kept in sync with mutations.
+
+        Unlike to_networkx this is built once and then updated incrementally, so callers
+        must treat it as read-only. Node attributes live on the Graph, not the projection.
+        """
+        if self._projection is None or self._projection_version != self.version:
+            import networkx as nx
+            G = nx.DiGraph()
+            G.add_nodes_from(self._nodes)
+            G.add_edges_from((edge.start.name, edge.end.name) for edge in self._edges)
+            self._projection = G
+            self._projection_version = self.version
+        return self._projection
+
+    def reachability(self) -> ReachabilityIndex:
+        """Reachability index used for blast-radius queries, rebuilt only when it went stale."""
+        index = self._reachability
+        if index is None or index.stale or self._reachability_version != self.version:
+            successors = {name: [edge.end.name for edge in edges] for name, edges in self._out_edges.items()}
+            self._reachability = ReachabilityIndex([node.name for node in self._ordered_nodes.values()], successors)
+            self._reachability_version = self.version
+        return self._reachability
+
+    def _update_projection(self, change: dict) -> None:
+        op = change["op"]
+        G = self._projection
+        if op == "add_node":
+            G.add_node(change["node"]["name"])
+        elif op == "delete_node":
+            G.remove_node(change["name"])
+        elif op == "update_node" and change["old_name"] != change["new_name"]:
+            import networkx as nx
+            nx.relabel_nodes(G, {change["old_name"]: change["new_name"]}, copy=False)
+        elif op == "add_edge":
+            G.add_edge(change["edge"]["start"], change["edge"]["end"])
+        elif op == "delete_edge" and self._find_edge(change["start"], change["end"]) is None:
+            # Parallel edges collapse into one projected edge, which stays until the last is gone
+            G.remove_edge(change["start"], change["end"])
+
     def to_networkx(self):
         import networkx as nx
         G = nx.DiGraph()
-        for node in self.nodes:
+        for node in self._ordered_nodes.values():
             G.add_node(node.name, **vars(node))
-        for edge in self.edges:
+        for edge in self._edges:
             G.add_edge(edge.start.name, edge.end.name, description=edge.description, style=edge.style)
         return G
\ No newline at end of file
@@ -1,15 +1,36 @@
 
+import asyncio
 import json
 import logging
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable
 
 from irgraph.Graph import Graph
+from irgraph.Storage import GraphStorage, JsonStorage
 from irgraph.Node import Node
 
 import os
 
+# Per-graph metadata kept in the manifest, so graphs can be listed without loading them
+SUMMARY_FIELDS = ("id", "name", "node_count", "edge_count", "version", "modified", "categories")
+
+
 class Graphs(object):
-    def __init__(self):
-        self.graphs = []
+    """Registry of graphs, persisted through a GraphStorage (JSON shards by default).
+
+    Graphs are addressed by stable integer ids handed out from a persisted counter, so
+    deleting a graph never changes the id of another one. Only the manifest (ids and
+    metadata) is read at startup; a graph is read from storage on first access.
+    """
+
+    # Number of journal entries after which dirty shards are rewritten on the next save
+    COMPACTION_THRESHOLD = 1000
+
+    def __init__(
+        self, json_file_path: str | None = None, data_dir: str | None = None, storage: GraphStorage | None = None
+    ):
         # Resolves to src/data/graphs.json regardless of CWD
         base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         # Logic check:
@@ -26,20 +47,376 @@ class Graphs(object):
         # join(src, 'data', 'graphs.json')
         
         src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) 
-        self.json_file_path = os.path.join(src_dir, 'data', 'graphs.json')
+        self.json_file_path = json_file_path or os.path.join(src_dir, 'data', 'graphs.json')
+
+        # The single-file snapshot above is only read to migrate to the sharded layout
+        self.data_dir = data_dir or os.path.join(os.path.dirname(self.json_file_path), 'graphs')
+        self.storage = storage or JsonStorage(self.data_dir)
+
+        # Journal entries not handed to the storage yet
+        self._pending_entries: list[dict] = []
+        self._journal_seq = 0
+        self._snapshot_seq = 0
+        # Serializes writers; saves may run in a flusher worker thread
+        self._write_lock = threading.Lock()
+        # Set by the web app to write changes behind the event loop, see irgraph.Flusher
+        self.flusher = None
+
+        # Manifest entries (SUMMARY_FIELDS) by graph id, in creation order
+        self._manifest: dict[int, dict] = {}
+        self._next_id = 0
+        # Category -> {graph id: number of nodes}, derived from the manifest entries
+        self._category_index: dict[str, dict[int, int]] = {}
+        self._loaded: dict[int, Graph] = {}
+        # Journal entries replayed at startup for graphs whose shard has not been loaded yet
+        self._deferred: dict[int, list[dict]] = {}
+        self._dirty: set[int] = set()
+        self._deleted_ids: set[int] = set()
+        self._subscriptions: dict[int, Callable[[dict], None]] = {}
+        # Per-graph locks held by async writers; readers use Graph.snapshot and never take them
+        self._locks: dict[int, asyncio.Lock] = {}
+        # For storages shared with other processes, see refresh: the storage data version
+        # seen last, the version of each loaded graph as written by this process, and the
+        # graphs with unwritten changes to compare again after they are written
+        self._data_version: int | None = None
+        self._written_versions: dict[int, int] = {}
+        self._recheck: set[int] = set()
+        # Called with the id of a graph that was dropped because another process changed or deleted it
+        self._reload_observers: list[Callable[[int], None]] = []
+
+    @property
+    def graphs(self) -> dict[int, Graph]:
+        """All graphs by id. Loads every shard, so prefer get_graph_by_id."""
+        self.refresh()
+        return {graph_id: self._load(graph_id) for graph_id in self._manifest}
+
+    def graph_ids(self) -> list[int]:
+        self.refresh()
+        return list(self._manifest)
+
+    def graph_names(self) -> list[str]:
+        self.refresh()
+        return [entry["name"] for entry in self._manifest.values()]
+
+    def summaries(self, offset: int = 0, limit: int | None = None) -> tuple[int, list[dict]]:
+        """Total number of graphs and the manifest entries of one page, in creation order.
+
+        Only graphs with journal entries that were replayed but not applied yet are loaded.
+        """
+        self.refresh()
+        stop = None if limit is None else offset + limit
+        page = list(islice(self._manifest.values(), offset, stop))
+        for entry in page:
+            if entry["id"] in self._deferred:
+                self._load(entry["id"])
+        return len(self._manifest), [dict(entry) for entry in page]
+
+    def lock(self, graph_id: int) -> asyncio.Lock:
+        """Lock serializing the writers of one graph, so multi-step edits are not interleaved."""
+        if graph_id not in self._locks:
+            self._locks[graph_id] = asyncio.Lock()
+        return self._locks[graph_id]
 
     def get_graph_by_id(self, graph_id: int):
-        if 0 <= graph_id < len(self.graphs):
-            return self.graphs[graph_id]
+        self.refresh()
+        if graph_id in self._manifest:
+            return self._load(graph_id)
         return None
 
+    def _load(self, graph_id: int) -> Graph:
+        graph = self._loaded.get(graph_id)
+        if graph is not None:
+            return graph
+        return self.install_graph(graph_id, *self.read_stored_graph(graph_id))
+
+    def read_stored_graph(self, graph_id: int) -> tuple[Graph | None, int]:
+        """Reads a graph and the journal seq it contains from storage, without registering it.
+
+        Only touches the storage, so it can run in a worker thread while the loop keeps serving.
+        """
+        binary = self.storage.read_binary_graph(graph_id)
+        if binary is not None:
+            with binary:
+                return binary.materialize(), binary.journal_seq
+        shard = self.storage.read_graph(graph_id)
+        if shard is not None:
+            return self.graph_from_dict(shard), shard.get("journal_seq", 0)
+        return None, 0
+
+    def install_graph(self, graph_id: int, graph: Graph | None, shard_seq: int) -> Graph | None:
+        """Registers a graph from read_stored_graph; returns the registered graph, or None if it was deleted.
+
+        If the graph was loaded in the meantime the copy read from storage is dropped.
+        """
+        if graph_id in self._loaded:
+            return self._loaded[graph_id]
+        if graph_id not in self._manifest:
+            return None
+
+        # Entries already contained in the shard are skipped
+        deferred = self._deferred.pop(graph_id, [])
+        for entry in deferred:
+            if entry["seq"] <= shard_seq:
+                continue
+            if entry["op"] == "add_graph":
+                graph = self.graph_from_dict(entry["graph"])
+            else:
+                graph.apply_change(entry)
+        if deferred:
+            self._dirty.add(graph_id)
+
+        if graph is None:
+            logging.warning(f"Shard for graph {graph_id} is missing, starting with an empty graph")
+            graph = Graph(name=self._manifest[graph_id]["name"])
+
+        self._loaded[graph_id] = graph
+        if not deferred:
+            self._written_versions[graph_id] = graph.version
+        self._watch(graph, graph_id)
+        self._touch(graph_id)
+        return graph
+
+    def on_reload(self, observer: Callable[[int], None]) -> None:
+        """Registers a callback for graphs refresh drops, e.g. to resync live streams of the old Graph."""
+        self._reload_observers.append(observer)
+
+    def refresh(self) -> None:
+        """Catches up with graphs that other processes sharing the storage created, changed or deleted.
+
+        Costs one data_version call unless another process committed. A loaded graph whose
+        stored version moved on is dropped and read again on its next access. A graph with
+        changes this process has not written yet is kept and compared again once they are.
+        """
+        data_version = self.storage.data_version()
+        if data_version is None or (data_version == self._data_version and not self._recheck):
+            return
+        self._data_version = data_version
+        self._recheck = set()
+        stored_versions = self.storage.read_versions()
+        for graph_id in list(self._manifest):
+            if self._has_unwritten_changes(graph_id):
+                self._recheck.add(graph_id)
+            elif graph_id not in stored_versions:
+                self._forget(graph_id)
+            elif graph_id in self._loaded and stored_versions[graph_id] != self._loaded[graph_id].version:
+                self._unload(graph_id)
+
+        # Manifest entries of new graphs and of changed graphs that are not loaded
+        outdated = {
+            graph_id for graph_id, version in stored_versions.items()
+            if graph_id not in self._deleted_ids and graph_id not in self._loaded
+            and (graph_id not in self._manifest or self._manifest[graph_id]["version"] != version)
+        }
+        if not outdated:
+            return
+        for entry in self.storage.read_manifest()["graphs"]:
+            if entry["id"] not in outdated:
+                continue
+            if entry["id"] in self._manifest:
+                self._manifest[entry["id"]].update({key: entry[key] for key in SUMMARY_FIELDS[1:-1]})
+                self._set_categories(entry["id"], entry["categories"])
+            else:
+                self._add_manifest_entry(entry["id"], entry["name"], **{
+                    key: entry[key] for key in SUMMARY_FIELDS[2:]
+                })
+
+    def _has_unwritten_changes(self, graph_id: int) -> bool:
+        graph = self._loaded.get(graph_id)
+        return graph is not None and self._written_versions.get(graph_id) != graph.version
+
+    def _unload(self, graph_id: int) -> None:
+        graph = self._loaded.pop(graph_id)
+        graph.unsubscribe(self._subscriptions.pop(graph_id))
+        self._written_versions.pop(graph_id, None)
+        for observer in self._reload_observers:
+            observer(graph_id)
+
+    def _forget(self, graph_id: int) -> None:
+        """Drops a graph another process deleted, without journaling the deletion again."""
+        if graph_id in self._loaded:
+            self._unload(graph_id)
+        self._remove_manifest_entry(graph_id)
+        self._deferred.pop(graph_id, None)
+        self._locks.pop(graph_id, None)
+        self._dirty.discard(graph_id)
+
+    def is_loaded(self, graph_id: int) -> bool:
+        return graph_id in self._loaded
+
+    def load_order(self) -> list[int]:
+        """Ids of the graphs not loaded yet, most recently modified first."""
+        unloaded = [entry for graph_id, entry in self._manifest.items() if graph_id not in self._loaded]
+        # ISO timestamps sort chronologically; entries without one go last
+        unloaded.sort(key=lambda entry: entry["modified"] or "", reverse=True)
+        return [entry["id"] for entry in unloaded]
+
+    def reset(self) -> None:
+        """Drops all graphs and pending changes, e.g. when the stored data cannot be loaded."""
+        for graph_id, graph in self._loaded.items():
+            graph.unsubscribe(self._subscriptions[graph_id])
+        self._manifest, self._category_index = {}, {}
+        self._loaded, self._deferred, self._subscriptions = {}, {}, {}
+        self._dirty, self._deleted_ids = set(), set()
+        self._pending_entries = []
+        self._next_id = 0
+        self._data_version, self._written_versions, self._recheck = None, {}, set()
+
     def load_from_json(self) -> None:
-        logging.info("reading graph from file {filepath}")
+        if not self.storage.exists():
+            legacy_storage = JsonStorage(self.data_dir)
+            if not isinstance(self.storage, JsonStorage) and legacy_storage.exists():
+                self._migrate_from(legacy_storage)
+            else:
+                self._migrate_single_file()
+            return
+
+        # Taken first, so commits of other processes during the read are caught by refresh
+        data_version = self.storage.data_version()
+        manifest = self.storage.read_manifest()
+        self.reset()
+        self._data_version = data_version
+        for entry in manifest.get("graphs", []):
+            self._add_manifest_entry(entry["id"], entry["name"], **{
+                key: entry[key] for key in SUMMARY_FIELDS[2:] if key in entry
+            })
+        self._next_id = manifest.get("next_id", self._next_id)
+
+        # Graph-level entries journaled after the manifest are kept until the graph is loaded
+        self._snapshot_seq = manifest.get("journal_seq", 0)
+        self._journal_seq = self._snapshot_seq
+        for entry in self.storage.read_journal(after_seq=self._snapshot_seq):
+            self._replay_entry(entry)
+            self._journal_seq = entry["seq"]
+
+    def _migrate_single_file(self) -> None:
+        """Splits a legacy graphs.json into shards. Raises FileNotFoundError if there is no data at all.
+
+        Graphs keep their list position as id, so ids used before the migration stay valid.
+        """
+        logging.info(f"reading graph from file {self.json_file_path}")
         with open(self.json_file_path) as json_file:
             graphs_json = json.load(json_file).get("graphs")
-            self.graphs = list(map(self.graph_from_dict, graphs_json))
-        
+        self._adopt({graph_id: self.graph_from_dict(graph_dict) for graph_id, graph_dict in enumerate(graphs_json)})
+
+    def _migrate_from(self, source_storage: GraphStorage) -> None:
+        """Copies every graph, with its id, out of another storage (e.g. JSON shards into SQLite)."""
+        source = Graphs(json_file_path=self.json_file_path, storage=source_storage)
+        source.load_from_json()
+        loaded, next_id = source.graphs, source._next_id
+        source.reset()
+        self._adopt(loaded, next_id=next_id)
+
+    def _adopt(self, graphs_by_id: dict[int, Graph], next_id: int = 0) -> None:
+        """Replaces the registry with the given graphs and writes all of them to the storage."""
+        self.reset()
+        self._next_id = next_id
+        for graph_id, graph in graphs_by_id.items():
+            self._add_manifest_entry(graph_id, graph.name)
+            self._loaded[graph_id] = graph
+            self._watch(graph, graph_id)
+            self._touch(graph_id, _now())
+            self._dirty.add(graph_id)
+        logging.info(f"Migrating {len(graphs_by_id)} graphs to {type(self.storage).__name__}")
+        self.compact()
+
+    def _add_manifest_entry(self, graph_id: int, name: str, **summary) -> int:
+        categories = summary.pop("categories", {})
+        self._manifest[graph_id] = {
+            "id": graph_id, "name": name, "node_count": 0, "edge_count": 0, "version": 0, "modified": None,
+            "categories": {}, **summary,
+        }
+        self._set_categories(graph_id, categories)
+        self._next_id = max(self._next_id, graph_id + 1)
+        return graph_id
+
+    def _remove_manifest_entry(self, graph_id: int) -> None:
+        self._set_categories(graph_id, {})
+        del self._manifest[graph_id]
+
+    def _set_categories(self, graph_id: int, categories: dict[str, int]) -> None:
+        entry = self._manifest[graph_id]
+        if entry["categories"] == categories:
+            return
+        for category in entry["categories"]:
+            del self._category_index[category][graph_id]
+            if not self._category_index[category]:
+                del self._category_index[category]
+        for category, count in categories.items():
+            self._category_index.setdefault(category, {})[graph_id] = count
+        entry["categories"] = categories
+
+    def _touch(self, graph_id: int, modified: str | None = None) -> None:
+        """Refreshes the manifest entry of a loaded graph."""
+        graph = self._loaded[graph_id]
+        entry = self._manifest[graph_id]
+        entry.update(node_count=graph.node_count, edge_count=graph.edge_count, version=graph.version)
+        self._set_categories(graph_id, graph.category_counts())
+        if modified is not None:
+            entry["modified"] = modified
+
+    def _replay_entry(self, entry: dict) -> None:
+        graph_id = entry["graph_id"]
+        op = entry["op"]
+        if op == "add_graph":
+            self._add_manifest_entry(
+                graph_id,
+                entry["graph"]["name"],
+                node_count=len(entry["graph"]["nodes"]),
+                edge_count=len(entry["graph"]["edges"]),
+                version=entry["graph"].get("version", 0),
+                categories=_count_categories(entry["graph"]["nodes"]),
+            )
+        elif op == "delete_graph":
+            self._remove_manifest_entry(graph_id)
+            self._deferred.pop(graph_id, None)
+            self._deleted_ids.add(graph_id)
+            return
+        elif op == "update_settings" and "name" in entry["settings"]:
+            self._manifest[graph_id]["name"] = entry["settings"]["name"]
+        # Counts, categories and version are refreshed once the graph is loaded
+        self._manifest[graph_id]["modified"] = entry.get("time", self._manifest[graph_id]["modified"])
+        self._deferred.setdefault(graph_id, []).append(entry)
+
+    def _watch(self, graph: Graph, graph_id: int) -> None:
+        def record(change: dict) -> None:
+            self._record(graph_id, change)
+        self._subscriptions[graph_id] = record
+        graph.subscribe(record)
+
+    def _record(self, graph_id: int, change: dict) -> None:
+        if change["op"] == "update_settings" and "name" in change["settings"]:
+            self._manifest[graph_id]["name"] = change["settings"]["name"]
+        self._dirty.add(graph_id)
+        entry = self._append_entry({"graph_id": graph_id, **change})
+        self._touch(graph_id, entry["time"])
+
+    def _append_entry(self, entry: dict) -> dict:
+        self._journal_seq += 1
+        entry = {"seq": self._journal_seq, "time": _now(), **entry}
+        self._pending_entries.append(entry)
+        return entry
+
+    @staticmethod
+    def _graph_snapshot(graph: Graph) -> dict:
+        """Like Graph.toJSON, but detached from the live node objects."""
+        graph_dict = graph.toJSON()
+        graph_dict["nodes"] = [dict(node) for node in graph_dict["nodes"]]
+        # Restored on load so versions (and ETags) stay valid across restarts
+        graph_dict["version"] = graph.version
+        return graph_dict
+
+    def add_graph(self, graph: Graph) -> int:
+        """Registers a graph under a new id, which is never reused after the graph is deleted."""
+        graph_id = self._add_manifest_entry(self.storage.reserve_graph_id(self._next_id), graph.name)
+        self._loaded[graph_id] = graph
+        self._dirty.add(graph_id)
+        entry = self._append_entry({"graph_id": graph_id, "op": "add_graph", "graph": self._graph_snapshot(graph)})
+        self._watch(graph, graph_id)
+        self._touch(graph_id, entry["time"])
+        return graph_id
+
     def graph_from_dict(self, graph_object: dict):
+        """Builds a Graph from its toJSON shape; raises ValueError for node names that are not strings."""
         graph = Graph(
             name=graph_object.get("name"),
             edge_mode=graph_object.get("edge_mode", "bezier"),
@@ -47,40 +424,80 @@ class Graphs(object):
             show_edge_descriptions=graph_object.get("show_edge_descriptions", True)
         )
         for node in graph_object.get("nodes", []):
+            if not isinstance(node.get("name"), str):
+                raise ValueError(f"Node name {node.get('name')!r} is not a string")
             new_node = Node(
                 name=node.get("name"), 
                 category=node.get("category", None), 
                 position_x=node.get("position_x", None), 
                 position_y=node.get("position_y", None),
-                parent=node.get("parent", None)
+                parent=node.get("parent", None),
+                description=node.get("description", None)
             )
             graph.add_node(new_node)
         for edge in graph_object.get("edges", []):
+            if not isinstance(edge.get("start"), str) or not isinstance(edge.get("end"), str):
+                raise ValueError("Edge start and end must be node names")
             graph.add_edge_by_node_names(from_name=edge.get("start"), to_name=edge.get("end"), directed=edge.get("directed", True), description=edge.get("description"), style=edge.get("style", "solid"))
+        if "version" in graph_object:
+            graph.restore_version(graph_object["version"])
         return graph
 
     def delete_graph(self, graph_id: int) -> bool:
-        if 0 <= graph_id < len(self.graphs):
-            del self.graphs[graph_id]
+        if graph_id in self._manifest:
+            self._remove_manifest_entry(graph_id)
+            graph = self._loaded.pop(graph_id, None)
+            if graph is not None:
+                graph.unsubscribe(self._subscriptions.pop(graph_id))
+            self._deferred.pop(graph_id, None)
+            self._locks.pop(graph_id, None)
+            self._dirty.discard(graph_id)
+            self._written_versions.pop(graph_id, None)
+            self._deleted_ids.add(graph_id)
+            self._append_entry({"graph_id": graph_id, "op": "delete_graph"})
             return True
         return False
     
+    def category_usage(self) -> dict[str, int]:
+        """Number of nodes per category across all graphs."""
+        self._load_deferred()
+        return {category: sum(counts.values()) for category, counts in self._category_index.items()}
+
+    def rename_category(self, old_category: str, new_category: str) -> int:
+        """Moves every node of `old_category`, in any graph, to `new_category`; returns the number of nodes changed.
+
+        Only graphs using the category are loaded and only their matching nodes touched. The
+        changes are journaled like any other edit, so one save_to_json persists all of them.
+        """
+        self._load_deferred()
+        changed = 0
+        for graph_id in list(self._category_index.get(old_category, {})):
+            changed += self._load(graph_id).recategorize(old_category, new_category)
+        return changed
+
+    def _load_deferred(self) -> None:
+        """Loads graphs with replayed journal entries, whose manifest metadata is not current yet."""
+        for graph_id in list(self._deferred):
+            self._load(graph_id)
+
     def update_graph_name(self, graph_id: int, new_name: str) -> bool:
         graph = self.get_graph_by_id(graph_id)
         if graph:
-            graph.name = new_name
+            graph.update_settings(name=new_name)
             return True
         return False
 
     def update_graph_settings(self, graph_id: int, edge_mode: str = None, show_node_borders: bool = None, show_edge_descriptions: bool = None) -> bool:
         graph = self.get_graph_by_id(graph_id)
         if graph:
+            settings = {}
             if edge_mode is not None:
-                graph.edge_mode = edge_mode
+                settings["edge_mode"] = edge_mode
             if show_node_borders is not None:
-                graph.show_node_borders = show_node_borders
+                settings["show_node_borders"] = show_node_borders
             if show_edge_descriptions is not None:
-                graph.show_edge_descriptions = show_edge_descriptions
+                settings["show_edge_descriptions"] = show_edge_descriptions
+            graph.update_settings(**settings)
             return True
         return False
 
@@ -90,17 +507,94 @@ class Graphs(object):
             graph_dict_copy = graph.toJSON()
             graph_dict_copy["name"] = f"{graph.name} copy"
             new_graph = self.graph_from_dict(graph_dict_copy)
-            self.graphs.append(new_graph)
-            return len(self.graphs) - 1
+            return self.add_graph(new_graph)
         return None
 
-    def save_to_json(self) -> None:
-        logging.info("Writing graph to file {filepath}")
-        with open(self.json_file_path, 'w') as json_file:
-            json_file.write(
-                json.dumps(
-                    {'graphs':
-                        [graph.toJSON() for graph in self.graphs]
-                    }, 
-                    indent=4)
-                )
\ No newline at end of file
+    def save_to_json(self, compact: bool = False) -> None:
+        """Persists pending changes by appending them to the journal.
+
+        With a journaled storage, shards are only rewritten when the store is still empty,
+        when `compact` is requested (e.g. on shutdown), or once the journal grows too long. While a flusher is running
+        the save is handed to it and happens later, off the calling thread.
+        """
+        if self.flusher is not None and self.flusher.is_running():
+            self.flusher.request(compact=compact)
+            return
+        self.write_changes(self.collect_changes(compact=compact))
+
+    def compact(self) -> None:
+        """Rewrites the shards of dirty graphs and the manifest, then drops the journal entries they contain."""
+        self.save_to_json(compact=True)
+
+    def collect_changes(self, compact: bool = False) -> dict:
+        """Takes the pending journal entries and, if compaction is due, snapshots of the dirty graphs.
+
+        Runs on the thread that mutates the graphs; the returned batch no longer references
+        live objects, so write_changes can run in a worker thread.
+        """
+        if self.storage.journaled:
+            compact = (
+                compact
+                or not self.storage.exists()
+                or self._journal_seq - self._snapshot_seq >= self.COMPACTION_THRESHOLD
+            )
+        else:
+            # Row-level stores apply every entry in place; a snapshot only seeds an empty store
+            compact = not self.storage.exists()
+        if compact:
+            # Graphs with replayed but unapplied entries must be written before the journal is trimmed
+            self._load_deferred()
+        entries, self._pending_entries = self._pending_entries, []
+        # The versions of the graphs the batch brings the storage to
+        batch = {
+            'entries': entries,
+            'snapshot': None,
+            'versions': {
+                entry['graph_id']: self._loaded[entry['graph_id']].version
+                for entry in entries if entry['graph_id'] in self._loaded
+            },
+        }
+        if not compact:
+            return batch
+
+        seq = self._journal_seq
+        shards = {
+            graph_id: {'journal_seq': seq, **self._graph_snapshot(self._loaded[graph_id])}
+            for graph_id in self._dirty if graph_id in self._loaded
+        }
+        batch['versions'].update((graph_id, shard['version']) for graph_id, shard in shards.items())
+        manifest = {
+            'journal_seq': seq,
+            'next_id': self._next_id,
+            'graphs': [dict(entry) for entry in self._manifest.values()],
+        }
+        batch['snapshot'] = {'manifest': manifest, 'shards': shards, 'deleted_ids': self._deleted_ids}
+        self._dirty, self._deleted_ids = set(), set()
+        return batch
+
+    def write_changes(self, batch: dict) -> None:
+        """Writes a batch from collect_changes: journal entries first, then the snapshot if any."""
+        with self._write_lock:
+            self.storage.write(batch['entries'], batch['snapshot'])
+            self._written_versions.update(batch['versions'])
+            if batch['snapshot'] is not None:
+                self._snapshot_seq = batch['snapshot']['manifest']['journal_seq']
+
+    def requeue_changes(self, batch: dict) -> None:
+        """Puts back a batch whose write failed so the next save retries it."""
+        self._pending_entries[:0] = batch['entries']
+        if batch['snapshot'] is not None:
+            self._dirty.update(batch['snapshot']['shards'])
+            self._deleted_ids.update(batch['snapshot']['deleted_ids'])
+
+
+def _count_categories(nodes: list[dict]) -> dict[str, int]:
+    counts = {}
+    for node in nodes:
+        if node.get("category") is not None:
+            counts[node["category"]] = counts.get(node["category"], 0) + 1
+    return counts
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+import threading
+
+
+class Journal(object):
+    """Append-only log of graph changes stored as one JSON object per line.
+
+    Every entry carries a monotonically increasing ``seq``. A snapshot records the
+    last ``seq`` it contains, so replay only has to apply the entries written after it.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.lock = threading.RLock()
+        self._tail_checked = False
+
+    def append(self, entries: list[dict]) -> None:
+        if not entries:
+            return
+        lines = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with self.lock:
+            if not self._tail_checked:
+                self._drop_torn_tail()
+                self._tail_checked = True
+            with open(self.file_path, "a") as journal_file:
+                journal_file.write(lines)
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+
+    def _drop_torn_tail(self) -> None:
+        """Cuts an incomplete last line, which read skips, so the next entry starts on a line of its own."""
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "rb+") as journal_file:
+            size = journal_file.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            journal_file.seek(size - 1)
+            if journal_file.read(1) == b"\n":
+                return
+            journal_file.seek(0)
+            end = journal_file.read().rfind(b"\n") + 1
+            logging.warning(f"Dropping incomplete last entry in journal {self.file_path}")
+            journal_file.truncate(end)
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def read(self, after_seq: int = 0) -> list[dict]:
+        """Returns all entries with a ``seq`` greater than ``after_seq``, in order."""
+        if not os.path.exists(self.file_path):
+            return []
+        entries = []
+        with self.lock:
+            with open(self.file_path) as journal_file:
+                lines = journal_file.readlines()
+        for line_number, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line means the process died mid-append; nothing after it was committed
+                if line_number == len(lines) - 1:
+                    logging.warning(f"Ignoring incomplete last entry in journal {self.file_path}")
+                    break
+                raise
+            if entry["seq"] > after_seq:
+                entries.append(entry)
+        return entries
+
+    def last_seq(self) -> int:
+        entries = self.read()
+        return entries[-1]["seq"] if entries else 0
+
+    def truncate(self, up_to_seq: int) -> None:
+        """Drops every entry already contained in a snapshot taken at ``up_to_seq``."""
+        with self.lock:
+            remaining = self.read(after_seq=up_to_seq)
+            tmp_path = f"{self.file_path}.tmp"
+            with open(tmp_path, "w") as journal_file:
+                journal_file.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in remaining))
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+            os.replace(tmp_path, self.file_path)
@@ -0,0 +1,353 @@
+from bisect import bisect_right, insort
+from collections import deque
+
+import numpy as np
+
+from irgraph.Snapshot import GraphSnapshot
+
+LAYOUT_MODES = ("force", "layered")
+
+# Distance between neighbouring nodes, in the coordinates the browser stores
+DEFAULT_SPACING = 120
+
+# Rows of the pairwise repulsion computed at once, bounding memory to ROW_CHUNK * node count
+ROW_CHUNK = 256
+# Upper bound of pairwise interactions per force layout; larger graphs get fewer iterations
+FORCE_BUDGET = 150_000_000
+# Below this many affordable iterations, repulsion is only computed between nearby nodes
+MIN_ITERATIONS = 30
+# Nodes further apart than this many `spacing`s do not repel each other in the grid approximation
+REPULSION_RANGE = 1
+# A pair of the grid approximation costs about this many pairs of the exact repulsion
+GRID_PAIR_COST = 8
+# Distant nodes repel through a random sample of this many nodes per iteration, scaled up
+FAR_SAMPLES = 64
+
+
+def compute_layout(
+    snapshot: GraphSnapshot,
+    mode: str = "force",
+    incremental: bool = False,
+    spacing: float = DEFAULT_SPACING,
+    iterations: int = 200,
+    seed: int = 0,
+) -> dict[str, tuple[int, int]]:
+    """Positions for the nodes of a graph snapshot, by node name.
+
+    `force` is a Fruchterman-Reingold simulation where a child is also pulled towards
+    its parent. Its work is bounded by FORCE_BUDGET: graphs too large for exact pairwise
+    repulsion use a grid for nearby nodes and a random sample for distant ones.
+    `layered` puts nodes in rows along the edge direction and keeps the children of a
+    parent next to each other. With `incremental` only nodes without a position are
+    placed (and returned); positioned nodes stay where they are.
+    """
+    if mode not in LAYOUT_MODES:
+        raise ValueError(f"Unknown layout mode {mode}")
+    names = [node["name"] for node in snapshot.nodes]
+    if not names:
+        return {}
+    index = {name: i for i, name in enumerate(names)}
+    edges = np.array(
+        [(index[edge["start"]], index[edge["end"]]) for edge in snapshot.edges], dtype=np.intp
+    ).reshape(-1, 2)
+    parents = np.array(
+        [(index[node["parent"]], i) for i, node in enumerate(snapshot.nodes) if node["parent"] in index],
+        dtype=np.intp,
+    ).reshape(-1, 2)
+
+    known = np.array([
+        (node["position_x"], node["position_y"]) if _is_positioned(node) else (np.nan, np.nan)
+        for node in snapshot.nodes
+    ], dtype=float)
+    positioned = ~np.isnan(known).any(axis=1)
+    free = ~positioned if incremental else np.ones(len(names), dtype=bool)
+    if not free.any():
+        return {}
+
+    if mode == "force":
+        links = np.concatenate((edges, parents))
+        positions = _force_layout(known, free, links, spacing, iterations, seed)
+    elif incremental and positioned.any():
+        positions = _place_layered(known, free, edges, parents, spacing)
+    else:
+        positions = _layered_layout(len(names), edges, parents, spacing)
+    return {names[i]: (round(positions[i, 0]), round(positions[i, 1])) for i in np.flatnonzero(free)}
+
+
+def _is_positioned(node) -> bool:
+    return node["position_x"] is not None and node["position_y"] is not None
+
+
+def _force_layout(
+    known: np.ndarray, free: np.ndarray, links: np.ndarray, k: float, iterations: int, seed: int
+) -> np.ndarray:
+    n = len(known)
+    rng = np.random.default_rng(seed)
+    fixed = ~free
+    positions = np.where(fixed[:, None], known, 0.0)
+
+    # Free nodes start next to their fixed neighbours, or scattered over a square around the fixed ones
+    side = k * np.sqrt(n)
+    center = positions[fixed].mean(axis=0) if fixed.any() else np.zeros(2)
+    anchor_sum = np.zeros((n, 2))
+    anchor_count = np.zeros(n)
+    for a, b in (links.T, links.T[::-1]):
+        mask = fixed[b] & free[a]
+        np.add.at(anchor_sum, a[mask], positions[b[mask]])
+        np.add.at(anchor_count, a[mask], 1)
+    has_anchor = anchor_count > 0
+    scattered = center + rng.uniform(-side / 2, side / 2, size=(n, 2))
+    anchored = anchor_sum / np.maximum(anchor_count, 1)[:, None] + rng.uniform(-k, k, size=(n, 2))
+    positions[free] = np.where(has_anchor[:, None], anchored, scattered)[free]
+
+    rows = np.flatnonzero(free)
+    exact = FORCE_BUDGET // (n * len(rows)) >= MIN_ITERATIONS
+    if exact:
+        iterations = min(iterations, FORCE_BUDGET // (n * len(rows)))
+    temperature = side / 10
+    # Single precision halves the memory traffic of the pairwise terms, the dominant cost
+    xs, ys = positions[:, 0].astype(np.float32), positions[:, 1].astype(np.float32)
+    spent = 0
+    step = 0
+    while step < iterations:
+        displacement = np.zeros((n, 2))
+        if exact:
+            _exact_repulsion(xs, ys, rows, k, displacement)
+        else:
+            # Nearby nodes repel exactly, distant ones through a sample
+            sample = rng.choice(n, size=min(FAR_SAMPLES, n), replace=False)
+            cost = GRID_PAIR_COST * _grid_repulsion(xs, ys, rows, k, displacement)
+            cost += _exact_repulsion(xs, ys, rows, k, displacement, columns=sample, cutoff=REPULSION_RANGE * k)
+            spent += cost
+            # Pairs follow the density of the drawing, so the iterations left are re-planned every step
+            iterations = min(iterations, step + 1 + (FORCE_BUDGET - spent) // cost)
+        # Attraction d²/k along every link
+        if len(links):
+            delta = positions[links[:, 0]] - positions[links[:, 1]]
+            distance = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+            force = delta * (distance / k)[:, None]
+            np.subtract.at(displacement, links[:, 0], force)
+            np.add.at(displacement, links[:, 1], force)
+        displacement[fixed] = 0
+        length = np.sqrt(np.einsum("ij,ij->i", displacement, displacement))
+        step_length = np.minimum(length, temperature * (1 - step / iterations))
+        positions += displacement * (step_length / np.maximum(length, 1e-9))[:, None]
+        xs[:], ys[:] = positions[:, 0], positions[:, 1]
+        step += 1
+    return positions
+
+
+def _exact_repulsion(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    rows: np.ndarray,
+    k: float,
+    displacement: np.ndarray,
+    columns: np.ndarray | None = None,
+    cutoff: float = 0,
+) -> int:
+    """Adds the repulsion k²/d between every node in `rows` and all nodes, a chunk of rows at a time.
+
+    With `columns` only those nodes repel, scaled up to stand in for all nodes, and pairs
+    closer than `cutoff` are left out. Returns the number of pairs computed.
+    """
+    n = len(xs)
+    scale = np.float32(k * k * (1 if columns is None else n / len(columns)))
+    column_xs = xs if columns is None else xs[columns]
+    column_ys = ys if columns is None else ys[columns]
+    for start in range(0, len(rows), ROW_CHUNK):
+        chunk = rows[start:start + ROW_CHUNK]
+        dx = xs[chunk, None] - column_xs[None, :]
+        dy = ys[chunk, None] - column_ys[None, :]
+        weight = dx * dx
+        weight += dy * dy
+        near = weight < cutoff * cutoff
+        np.maximum(weight, 1e-2, out=weight)
+        np.divide(scale, weight, out=weight)
+        if columns is None:
+            weight[np.arange(len(chunk)), chunk] = 0
+        else:
+            weight[near | (chunk[:, None] == columns[None, :])] = 0
+        displacement[chunk, 0] += (dx * weight).sum(axis=1)
+        displacement[chunk, 1] += (dy * weight).sum(axis=1)
+    return len(rows) * len(column_xs)
+
+
+def _grid_repulsion(xs: np.ndarray, ys: np.ndarray, rows: np.ndarray, k: float, displacement: np.ndarray) -> int:
+    """Like _exact_repulsion, but only between nodes less than REPULSION_RANGE * k apart.
+
+    Nodes are bucketed into square cells of that size, so only the 3x3 cells around a
+    node hold its partners, as in Fruchterman and Reingold's grid variant. Returns the
+    number of pairs computed.
+    """
+    cell_size = REPULSION_RANGE * k
+    columns = np.floor(xs / cell_size).astype(np.int64)
+    lines = np.floor(ys / cell_size).astype(np.int64)
+    columns -= columns.min() - 1
+    lines -= lines.min() - 1
+    # Cell keys with a margin of one cell on every side, so neighbour keys never wrap
+    height = lines.max() + 2
+    keys = columns * height + lines
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+
+    n = len(xs)
+    pairs = 0
+    for offset in (-height - 1, -height, -height + 1, -1, 0, 1, height - 1, height, height + 1):
+        targets = keys[rows] + offset
+        starts = np.searchsorted(sorted_keys, targets, side="left")
+        counts = np.searchsorted(sorted_keys, targets, side="right") - starts
+        total = int(counts.sum())
+        if not total:
+            continue
+        pairs += total
+        # Expand every row's [start, start + count) range of partners into flat pair arrays
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        partners = order[np.arange(total) - first + np.repeat(starts, counts)]
+        sources = np.repeat(rows, counts)
+        dx = xs[sources] - xs[partners]
+        dy = ys[sources] - ys[partners]
+        distance = dx * dx + dy * dy
+        weight = np.float32(k * k) / np.maximum(distance, 1e-2)
+        weight[(sources == partners) | (distance >= cell_size * cell_size)] = 0
+        displacement[:, 0] += np.bincount(sources, weights=dx * weight, minlength=n)
+        displacement[:, 1] += np.bincount(sources, weights=dy * weight, minlength=n)
+    return pairs
+
+
+def _ranks(n: int, edges: np.ndarray) -> np.ndarray:
+    """Longest-path layer of every node along the edges; edges closing a cycle are ignored."""
+    successors = [[] for _ in range(n)]
+    for start, end in edges.tolist():
+        if start != end:
+            successors[start].append(end)
+
+    # Iterative DFS; an edge to a node still on the stack is a back edge
+    state = [0] * n  # 0 unvisited, 1 on stack, 2 done
+    forward = [[] for _ in range(n)]
+    for root in range(n):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if state[child] == 1:
+                    continue
+                forward[node].append(child)
+                if state[child] == 0:
+                    state[child] = 1
+                    stack.append((child, iter(successors[child])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+
+    in_degree = [0] * n
+    for node in range(n):
+        for child in forward[node]:
+            in_degree[child] += 1
+    ranks = np.zeros(n, dtype=np.intp)
+    queue = deque(node for node in range(n) if in_degree[node] == 0)
+    while queue:
+        node = queue.popleft()
+        for child in forward[node]:
+            ranks[child] = max(ranks[child], ranks[node] + 1)
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                queue.append(child)
+    return ranks
+
+
+def _layered_layout(n: int, edges: np.ndarray, parents: np.ndarray, spacing: float, sweeps: int = 4) -> np.ndarray:
+    ranks = _ranks(n, edges)
+    # Children share a group key with their siblings, so a parent's children stay together
+    group = np.arange(n)
+    group[parents[:, 1]] = parents[:, 0]
+    layers = [np.flatnonzero(ranks == rank) for rank in range(ranks.max() + 1)]
+
+    x = np.zeros(n)
+    for layer in layers:
+        x[layer] = _spread(layer[np.lexsort((layer, group[layer]))], spacing, x)[layer]
+
+    # Barycenter sweeps, alternating down and up: order a layer by the mean x of its neighbours
+    links = np.concatenate((edges, edges[:, ::-1]))
+    links = links[links[:, 0] != links[:, 1]]
+    for sweep in range(sweeps):
+        order = layers if sweep % 2 == 0 else layers[::-1]
+        for layer in order[1:]:
+            neighbour_sum = np.bincount(links[:, 1], weights=x[links[:, 0]], minlength=n)
+            neighbour_count = np.bincount(links[:, 1], minlength=n)
+            barycenter = np.where(neighbour_count > 0, neighbour_sum / np.maximum(neighbour_count, 1), x)
+            group_sum = np.bincount(group[layer], weights=barycenter[layer], minlength=n)
+            group_count = np.bincount(group[layer], minlength=n)
+            group_barycenter = (group_sum / np.maximum(group_count, 1))[group[layer]]
+            sorted_layer = layer[np.lexsort((barycenter[layer], group[layer], group_barycenter))]
+            x[layer] = _spread(sorted_layer, spacing, x)[layer]
+    return np.column_stack((x, ranks * spacing))
+
+
+def _spread(ordered: np.ndarray, spacing: float, x: np.ndarray) -> np.ndarray:
+    """Places a layer's nodes `spacing` apart in the given order, centred on 0."""
+    spread = x.copy()
+    spread[ordered] = (np.arange(len(ordered)) - (len(ordered) - 1) / 2) * spacing
+    return spread
+
+
+def _place_layered(
+    known: np.ndarray, free: np.ndarray, edges: np.ndarray, parents: np.ndarray, spacing: float
+) -> np.ndarray:
+    """Adds unpositioned nodes to an existing layered drawing without moving the others.
+
+    A new node goes one row below its lowest placed predecessor (or one row above its
+    placed successors), next to its placed parent or neighbours, and is pushed right
+    until it no longer overlaps a node in its row. New nodes are placed in layer order,
+    so a chain of new nodes continues downwards.
+    """
+    n = len(known)
+    positions = known.copy()
+    placed = ~free
+    predecessors = [[] for _ in range(n)]
+    successors = [[] for _ in range(n)]
+    for start, end in edges.tolist():
+        if start != end:
+            successors[start].append(end)
+            predecessors[end].append(start)
+    parent_of = dict(zip(parents[:, 1].tolist(), parents[:, 0].tolist()))
+
+    rows: dict[int, list[float]] = {}
+    for i in np.flatnonzero(placed):
+        rows.setdefault(round(positions[i, 1] / spacing), []).append(positions[i, 0])
+    for row in rows.values():
+        row.sort()
+    bottom = positions[placed, 1].max()
+    right = positions[placed, 0].max()
+
+    order = np.flatnonzero(free)[np.argsort(_ranks(n, edges)[free], kind="stable")]
+    for i in order.tolist():
+        above = [positions[p] for p in predecessors[i] if placed[p]]
+        below = [positions[s] for s in successors[i] if placed[s]]
+        parent = parent_of.get(i)
+        if above:
+            y = max(p[1] for p in above) + spacing
+        elif below:
+            y = min(s[1] for s in below) - spacing
+        elif parent is not None and placed[parent]:
+            y = positions[parent, 1] + spacing
+        else:
+            bottom += spacing
+            y = bottom
+        anchors = above + below + ([positions[parent]] if parent is not None and placed[parent] else [])
+        x = float(np.mean([a[0] for a in anchors])) if anchors else right
+        # Rows are sorted, so pushing right only meets the following nodes of the row
+        row = rows.setdefault(round(y / spacing), [])
+        position = bisect_right(row, x - spacing)
+        while position < len(row) and row[position] < x + spacing:
+            x = row[position] + spacing
+            position += 1
+        insort(row, x)
+        right = max(right, x)
+        positions[i] = (x, y)
+        placed[i] = True
+    return positions
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from json import JSONDecodeError
+
+
+class Loader(object):
+    """Loads a Graphs registry in the background so the app serves requests meanwhile.
+
+    First the manifest and journal are read in a worker thread; requests that need the
+    registry wait for that with wait_registry. Then the graphs are read one by one, most
+    recently modified first, each in a worker thread and registered on the loop. A
+    request for a graph that is not loaded yet still loads it on demand.
+    """
+
+    def __init__(self, graphs, flusher=None):
+        self.graphs = graphs
+        # Started once the registry is read, so saves during the read are written synchronously
+        self.flusher = flusher
+        self._done = False
+        self._failed = False
+        self._registry_loaded: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._done = False
+        self._failed = False
+        self._registry_loaded = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def registry_loaded(self) -> bool:
+        return self._registry_loaded is not None and self._registry_loaded.is_set()
+
+    @property
+    def ready(self) -> bool:
+        return self._done
+
+    @property
+    def failed(self) -> bool:
+        return self._failed
+
+    async def wait_registry(self) -> None:
+        await self._registry_loaded.wait()
+
+    def progress(self) -> dict:
+        graphs_total = len(self.graphs.graph_ids()) if self.registry_loaded else 0
+        return {
+            "ready": self.ready,
+            "failed": self.failed,
+            "registry_loaded": self.registry_loaded,
+            "graphs_loaded": graphs_total - len(self.graphs.load_order()) if self.registry_loaded else 0,
+            "graphs_total": graphs_total,
+        }
+
+    async def _run(self) -> None:
+        try:
+            await self._load()
+        except Exception:
+            # Reported through progress, as the task itself is only awaited on stop
+            logging.exception(f"Error loading graphs from {self.graphs.json_file_path}")
+            self._failed = True
+
+    async def _load(self) -> None:
+        try:
+            await asyncio.to_thread(self.graphs.load_from_json)
+        except (JSONDecodeError, FileNotFoundError):
+            logging.error(f"Error loading graphs from {self.graphs.json_file_path}")
+            self.graphs.reset()
+        finally:
+            if self.flusher is not None:
+                self.flusher.start()
+            self._registry_loaded.set()
+
+        order = self.graphs.load_order()
+        logging.info(f"Loading {len(order)} graphs in the background")
+        for graph_id in order:
+            if self.graphs.is_loaded(graph_id):
+                continue
+            try:
+                stored = await asyncio.to_thread(self.graphs.read_stored_graph, graph_id)
+            except (OSError, ValueError):
+                # Left to be loaded on demand, where the error reaches the request
+                logging.exception(f"Error loading graph {graph_id} in the background")
+                continue
+            self.graphs.install_graph(graph_id, *stored)
+        self._done = True
+
+    async def stop(self) -> None:
+        """Cancels loading graphs that were not needed yet."""
+        if self._task is None:
+            return
+        if not self._task.done():
+            self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,116 @@
+from typing import Iterator
+
+import orjson
+
+from irgraph.Edge import Edge
+from irgraph.Graph import GRAPH_SETTINGS, Graph
+from irgraph.Node import Node
+from irgraph.Snapshot import GraphSnapshot
+
+# Expected types of the optional fields of each record type
+_FIELD_TYPES = {
+    "graph": {"name": str, "edge_mode": str, "show_node_borders": bool, "show_edge_descriptions": bool},
+    "node": {"category": str, "parent": str, "description": str},
+    "edge": {"directed": bool, "description": str, "style": str},
+}
+
+
+def iter_graph_ndjson(snapshot: GraphSnapshot, chunk_size: int = 1000) -> Iterator[bytes]:
+    """Yields a graph snapshot as newline-delimited JSON: a settings record, then nodes, then edges.
+
+    Records are encoded as they are yielded, `chunk_size` lines at a time, so the
+    export never holds more than one chunk of encoded output besides the snapshot.
+    The caller takes the snapshot on the event loop, since the generator may run in
+    a worker thread while the graph is edited.
+    """
+    yield orjson.dumps({"type": "graph", **snapshot.settings}) + b"\n"
+    records = [("node", node) for node in snapshot.nodes]
+    records += [("edge", edge) for edge in snapshot.edges]
+    for start in range(0, len(records), chunk_size):
+        yield b"".join(
+            orjson.dumps({"type": record_type, **record}) + b"\n"
+            for record_type, record in records[start:start + chunk_size]
+        )
+
+
+class NdjsonGraphReader(object):
+    """Builds a Graph from NDJSON chunks as they arrive, in the format of iter_graph_ndjson.
+
+    Only the current incomplete line is buffered. Nodes must precede the edges that
+    reference them; malformed input raises ValueError.
+    """
+
+    def __init__(self):
+        self.graph: Graph | None = None
+        self._buffer = b""
+        self._line_number = 0
+
+    def feed(self, chunk: bytes) -> None:
+        lines = (self._buffer + chunk).split(b"\n")
+        self._buffer = lines.pop()
+        for line in lines:
+            self._read_line(line)
+
+    def finish(self) -> Graph:
+        """Reads the last line and returns the graph."""
+        self._read_line(self._buffer)
+        self._buffer = b""
+        if self.graph is None:
+            raise ValueError("No graph record found")
+        return self.graph
+
+    def _read_line(self, line: bytes) -> None:
+        self._line_number += 1
+        if not line.strip():
+            return
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Line {self._line_number}: invalid JSON") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {self._line_number}: expected an object")
+
+        record_type = record.pop("type", None)
+        for key, expected in _FIELD_TYPES.get(record_type, {}).items():
+            if record.get(key) is not None and not isinstance(record[key], expected):
+                raise ValueError(f"Line {self._line_number}: {record_type} {key} must be a {expected.__name__}")
+        if record_type == "graph":
+            if self.graph is not None:
+                raise ValueError(f"Line {self._line_number}: duplicate graph record")
+            self.graph = Graph(**{key: record[key] for key in GRAPH_SETTINGS if key in record})
+            return
+        if self.graph is None:
+            raise ValueError(f"Line {self._line_number}: graph record must come first")
+        if record_type == "node":
+            self._read_node(record)
+        elif record_type == "edge":
+            self._read_edge(record)
+        else:
+            raise ValueError(f"Line {self._line_number}: unknown record type {record_type}")
+
+    def _read_node(self, record: dict) -> None:
+        if not record.get("name") or not isinstance(record["name"], str):
+            raise ValueError(f"Line {self._line_number}: node without a name")
+        self.graph.add_node(Node(
+            name=record["name"],
+            category=record.get("category", "Default"),
+            position_x=record.get("position_x"),
+            position_y=record.get("position_y"),
+            parent=record.get("parent"),
+            description=record.get("description"),
+        ))
+
+    def _read_edge(self, record: dict) -> None:
+        if not isinstance(record.get("start"), str) or not isinstance(record.get("end"), str):
+            raise ValueError(f"Line {self._line_number}: edge without start and end node names")
+        start = self.graph.get_node_by_name(record.get("start"))
+        end = self.graph.get_node_by_name(record.get("end"))
+        if start is None or end is None:
+            raise ValueError(f"Line {self._line_number}: edge references an unknown node")
+        self.graph.add_edge(Edge(
+            start,
+            end,
+            directed=record.get("directed", True),
+            description=record.get("description"),
+            style=record.get("style", "solid"),
+        ))
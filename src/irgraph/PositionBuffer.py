@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import struct
+
+import numpy as np
+
+# Binary position updates: little-endian u64 node order version and u32 count, then
+# `count` u32 node indices, `count` i32 x and `count` i32 y coordinates
+POSITIONS_MEDIA_TYPE = "application/octet-stream"
+_HEADER = struct.Struct("<QI")
+
+
+def encode_positions(order: int, indices: list[int], xs: list[int], ys: list[int]) -> bytes:
+    return (
+        _HEADER.pack(order, len(indices))
+        + np.asarray(indices, dtype="<u4").tobytes()
+        + np.asarray(xs, dtype="<i4").tobytes()
+        + np.asarray(ys, dtype="<i4").tobytes()
+    )
+
+
+def decode_positions(body: bytes) -> tuple[int, list[int], list[int], list[int]]:
+    """The node order version, indices, x and y of an encode_positions payload."""
+    if len(body) < _HEADER.size:
+        raise ValueError("Position update is shorter than its header")
+    order, count = _HEADER.unpack_from(body)
+    if len(body) != _HEADER.size + 12 * count:
+        raise ValueError(f"Position update of {count} nodes has {len(body)} bytes")
+    indices, xs, ys = np.frombuffer(body, dtype="<i4", offset=_HEADER.size).reshape(3, count)
+    return order, indices.view("<u4").tolist(), xs.tolist(), ys.tolist()
+
+
+class PositionBuffer(object):
+    """Coalesces the position updates of dragged nodes before they reach the graphs.
+
+    Updates are kept per graph and node name, so a node dragged through many positions
+    within one window is moved once, to the last one. After the window each graph gets a
+    single move_nodes change under its write lock, and the registry is asked to save,
+    which the flusher in turn writes later.
+    """
+
+    def __init__(self, graphs, window: float = 0.05):
+        self.graphs = graphs
+        self.window = window
+        # graph id -> node name -> latest (x, y)
+        self._pending: dict[int, dict[str, tuple[int, int]]] = {}
+        self._stopping = False
+        self._requested: asyncio.Event | None = None
+        self._stopped: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._stopping = False
+        self._requested = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def pending_count(self, graph_id: int) -> int:
+        return len(self._pending.get(graph_id, ()))
+
+    def add(self, graph_id: int, names: list[str], xs: list[int], ys: list[int]) -> None:
+        """Queues positions for the next window; without a running buffer they are applied right away."""
+        pending = self._pending.setdefault(graph_id, {})
+        pending.update(zip(names, zip(xs, ys)))
+        if self.is_running():
+            self._requested.set()
+        else:
+            self._apply(self._take())
+
+    async def _run(self) -> None:
+        while True:
+            await self._requested.wait()
+            if not self._stopping:
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=self.window)
+                except asyncio.TimeoutError:
+                    pass
+            self._requested.clear()
+            await self.flush()
+            if self._stopping:
+                return
+
+    def _take(self) -> dict[int, dict[str, tuple[int, int]]]:
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def _apply(self, pending: dict[int, dict[str, tuple[int, int]]]) -> None:
+        for graph_id, positions in pending.items():
+            graph = self.graphs.get_graph_by_id(graph_id)
+            if graph is None or not positions:
+                continue
+            xs, ys = zip(*positions.values())
+            graph.move_nodes(list(positions), list(xs), list(ys))
+        if pending:
+            self.graphs.save_to_json()
+
+    async def flush(self) -> None:
+        """Moves the queued nodes now, each graph under its write lock.
+
+        A graph whose lock is held, e.g. by a batch, keeps its positions for the next window
+        so it does not hold up the other graphs. Only when stopping does it wait for the lock.
+        """
+        pending = self._take()
+        for graph_id, positions in pending.items():
+            lock = self.graphs.lock(graph_id)
+            if lock.locked() and not self._stopping:
+                # Updates queued in the meantime are newer
+                self._pending[graph_id] = {**positions, **self._pending.get(graph_id, {})}
+                self._requested.set()
+                continue
+            async with lock:
+                try:
+                    self._apply({graph_id: positions})
+                except (OSError, ValueError):
+                    logging.exception(f"Error applying positions to graph {graph_id}")
+
+    async def stop(self) -> None:
+        """Applies the queued positions and ends the background task."""
+        if not self.is_running():
+            return
+        self._stopping = True
+        self._stopped.set()
+        self._requested.set()
+        await self._task
+        self._task = None
@@ -0,0 +1,142 @@
+class ReachabilityIndex(object):
+    """Answers "what does X reach" queries without traversing the graph.
+
+    Nodes are grouped into strongly connected components; since every node of a
+    component reaches the same set, each component stores one bitset (a Python int
+    indexed by node position) of all nodes it reaches, including its own members.
+    Node inserts and, while there are at most INCREMENTAL_COMPONENTS components, edge
+    inserts are applied incrementally. Deletions can split components or cut paths, and
+    an edge insert into a larger index touches every component, so both mark the index
+    stale and the owner rebuilds it on demand.
+    """
+
+    # An edge insert scans every component bitset; above this a lazy rebuild is cheaper
+    INCREMENTAL_COMPONENTS = 1000
+
+    def __init__(self, node_names: list[str], successors: dict[str, list[str]]):
+        self.stale = False
+        self._names: list[str] = list(node_names)
+        self._index: dict[str, int] = {name: i for i, name in enumerate(self._names)}
+        self._component: list[int] = [0] * len(self._names)
+        self._reach: list[int] = []
+        self._build(successors)
+
+    def _build(self, successors: dict[str, list[str]]) -> None:
+        # Iterative Tarjan: components come out in reverse topological order, so every
+        # component reachable from the current one already has its bitset.
+        index_of = self._index
+        adjacency = [[index_of[name] for name in successors.get(node, ())] for node in self._names]
+        order = [-1] * len(self._names)
+        low = [0] * len(self._names)
+        on_stack = [False] * len(self._names)
+        stack: list[int] = []
+        counter = 0
+
+        for root in range(len(self._names)):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node, child_position = work[-1]
+                children = adjacency[node]
+                if child_position < len(children):
+                    work[-1] = (node, child_position + 1)
+                    child = children[child_position]
+                    if order[child] == -1:
+                        order[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = True
+                        work.append((child, 0))
+                    elif on_stack[child]:
+                        low[node] = min(low[node], order[child])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    self._close_component(node, stack, on_stack, adjacency)
+
+    def _close_component(self, root: int, stack: list[int], on_stack: list[bool], adjacency: list[list[int]]) -> None:
+        component = len(self._reach)
+        members = []
+        while True:
+            member = stack.pop()
+            on_stack[member] = False
+            self._component[member] = component
+            members.append(member)
+            if member == root:
+                break
+        reach = 0
+        for member in members:
+            reach |= 1 << member
+        for member in members:
+            for child in adjacency[member]:
+                child_component = self._component[child]
+                if child_component != component:
+                    reach |= self._reach[child_component]
+        self._reach.append(reach)
+
+    def _bits_to_names(self, bits: int) -> list[str]:
+        names = []
+        while bits:
+            low_bit = bits & -bits
+            names.append(self._names[low_bit.bit_length() - 1])
+            bits ^= low_bit
+        return names
+
+    def descendants(self, name: str) -> list[str]:
+        """All nodes reachable from `name`, excluding `name` itself, in graph order."""
+        index = self._index[name]
+        return self._bits_to_names(self._reach[self._component[index]] & ~(1 << index))
+
+    def is_reachable(self, source: str, target: str) -> bool:
+        """True if `target` is in the blast radius of `source`."""
+        if source == target or target not in self._index:
+            return False
+        return bool(self._reach[self._component[self._index[source]]] >> self._index[target] & 1)
+
+    def apply_change(self, change: dict) -> None:
+        """Updates the index for a Graph change record, or marks it stale if that is not feasible."""
+        if self.stale:
+            return
+        op = change["op"]
+        if op == "add_node":
+            name = change["node"]["name"]
+            self._index[name] = len(self._names)
+            self._names.append(name)
+            self._component.append(len(self._reach))
+            self._reach.append(1 << self._index[name])
+        elif op == "add_edge":
+            self._add_edge(change["edge"]["start"], change["edge"]["end"])
+        elif op == "update_node" and change["old_name"] != change["new_name"]:
+            index = self._index.pop(change["old_name"])
+            self._index[change["new_name"]] = index
+            self._names[index] = change["new_name"]
+        elif op in ("delete_node", "delete_edge"):
+            self.stale = True
+
+    def _add_edge(self, start: str, end: str) -> None:
+        start_index, end_index = self._index[start], self._index[end]
+        start_component, end_component = self._component[start_index], self._component[end_index]
+        if self._reach[start_component] >> end_index & 1:
+            return
+        if self._reach[end_component] >> start_index & 1:
+            # The edge closes a cycle and merges components
+            self.stale = True
+            return
+        if len(self._reach) > self.INCREMENTAL_COMPONENTS:
+            self.stale = True
+            return
+        # Every component that reaches `start` now also reaches everything `end` reaches
+        added = self._reach[end_component]
+        start_bit = 1 << start_index
+        for component, reach in enumerate(self._reach):
+            if reach & start_bit:
+                self._reach[component] = reach | added
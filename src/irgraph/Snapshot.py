@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+
+@dataclass(frozen=True)
+class GraphSnapshot(object):
+    """Read-only copy of a Graph at one version.
+
+    Writers keep mutating the live Graph; readers take the snapshot of the current
+    version, which is built once and then shared. A later write does not change it,
+    the next reader just gets a new snapshot (copy-on-write by version).
+    """
+
+    version: int
+    settings: Mapping[str, Any]
+    nodes: tuple[Mapping[str, Any], ...]
+    edges: tuple[Mapping[str, Any], ...]
+
+    @classmethod
+    def of(cls, graph) -> "GraphSnapshot":
+        from irgraph.Graph import GRAPH_SETTINGS
+        return cls(
+            version=graph.version,
+            settings=MappingProxyType({key: getattr(graph, key) for key in GRAPH_SETTINGS}),
+            nodes=tuple(MappingProxyType(dict(vars(node))) for node in graph.nodes),
+            edges=tuple(MappingProxyType(edge.toJSON()) for edge in graph.edges),
+        )
+
+    def toJSON(self) -> dict:  # noqa: N802 - named like Graph.toJSON, which it stands in for
+        """Same shape as Graph.toJSON."""
+        return {
+            **self.settings,
+            'nodes': [dict(node) for node in self.nodes],
+            'edges': [dict(edge) for edge in self.edges],
+        }
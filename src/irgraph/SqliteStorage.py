@@ -0,0 +1,335 @@
+import logging
+import os
+import sqlite3
+import threading
+
+from irgraph.Graph import GRAPH_SETTINGS
+from irgraph.Storage import GraphStorage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS graphs (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    edge_mode TEXT,
+    show_node_borders INTEGER,
+    show_edge_descriptions INTEGER,
+    version INTEGER NOT NULL DEFAULT 0,
+    modified TEXT
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    graph_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT,
+    parent TEXT,
+    -- Untyped, so integer positions are not turned into floats
+    position_x,
+    position_y,
+    description TEXT,
+    UNIQUE (graph_id, name)
+);
+CREATE INDEX IF NOT EXISTS nodes_by_category ON nodes (graph_id, category);
+CREATE INDEX IF NOT EXISTS nodes_by_parent ON nodes (graph_id, parent);
+CREATE TABLE IF NOT EXISTS edges (
+    graph_id INTEGER NOT NULL,
+    start_node TEXT NOT NULL,
+    end_node TEXT NOT NULL,
+    directed INTEGER NOT NULL,
+    description TEXT,
+    style TEXT
+);
+CREATE INDEX IF NOT EXISTS edges_by_start ON edges (graph_id, start_node);
+CREATE INDEX IF NOT EXISTS edges_by_end ON edges (graph_id, end_node);
+"""
+
+NODE_COLUMNS = ("name", "category", "parent", "position_x", "position_y", "description")
+
+# Statements are constant; their columns follow the order of GRAPH_SETTINGS and NODE_COLUMNS
+SELECT_GRAPH = "SELECT name, edge_mode, show_node_borders, show_edge_descriptions, version FROM graphs WHERE id = ?"
+SELECT_NODES = (
+    "SELECT name, category, parent, position_x, position_y, description FROM nodes WHERE graph_id = ? ORDER BY rowid"
+)
+INSERT_GRAPH = (
+    "INSERT INTO graphs (id, name, edge_mode, show_node_borders, show_edge_descriptions, version, modified) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_NODE = (
+    "INSERT OR IGNORE INTO nodes (graph_id, name, category, parent, position_x, position_y, description) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_EDGE = (
+    "INSERT INTO edges (graph_id, start_node, end_node, directed, description, style) VALUES (?, ?, ?, ?, ?, ?)"
+)
+# Graph keeps parallel edges in insertion order and always picks the first match
+DELETE_FIRST_EDGE = (
+    "DELETE FROM edges WHERE rowid = "
+    "(SELECT rowid FROM edges WHERE graph_id = ? AND start_node = ? AND end_node = ? ORDER BY rowid LIMIT 1)"
+)
+UPDATE_FIRST_EDGE = (
+    "UPDATE edges SET description = ?, style = COALESCE(?, style) WHERE rowid = "
+    "(SELECT rowid FROM edges WHERE graph_id = ? AND start_node = ? AND end_node = ? ORDER BY rowid LIMIT 1)"
+)
+# One statement per updatable column, so only known column names ever reach the SQL
+NODE_FIELD_UPDATES = {
+    "position_x": "UPDATE nodes SET position_x = ? WHERE graph_id = ? AND name = ?",
+    "position_y": "UPDATE nodes SET position_y = ? WHERE graph_id = ? AND name = ?",
+    "description": "UPDATE nodes SET description = ? WHERE graph_id = ? AND name = ?",
+}
+SETTING_UPDATES = {
+    "name": "UPDATE graphs SET name = ? WHERE id = ?",
+    "edge_mode": "UPDATE graphs SET edge_mode = ? WHERE id = ?",
+    "show_node_borders": "UPDATE graphs SET show_node_borders = ? WHERE id = ?",
+    "show_edge_descriptions": "UPDATE graphs SET show_edge_descriptions = ? WHERE id = ?",
+}
+
+
+class SqliteStorage(GraphStorage):
+    """Graphs, nodes and edges as rows of an SQLite database in WAL mode.
+
+    Every journal entry is applied as row-level inserts, updates and deletes in one
+    transaction per batch, so there is no journal to replay and no shard to rewrite.
+    Row ids keep the insertion order of nodes and edges. WAL mode lets several
+    processes read while one writes; each one catches up with the others' commits
+    through data_version, see Graphs.refresh.
+    """
+
+    journaled = False
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # One connection shared by the event loop and the flusher thread, used under a lock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def exists(self) -> bool:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        return row is not None
+
+    def read_manifest(self) -> dict:
+        logging.info(f"reading graph manifest from database {self.db_path}")
+        with self._lock:
+            db = self._connection
+            next_id = db.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()[0]
+            rows = db.execute("SELECT id, name, version, modified FROM graphs ORDER BY id").fetchall()
+            node_counts = dict(db.execute("SELECT graph_id, COUNT(*) FROM nodes GROUP BY graph_id"))
+            edge_counts = dict(db.execute("SELECT graph_id, COUNT(*) FROM edges GROUP BY graph_id"))
+            categories = {}
+            for graph_id, category, count in db.execute(
+                "SELECT graph_id, category, COUNT(*) FROM nodes WHERE category IS NOT NULL GROUP BY graph_id, category"
+            ):
+                categories.setdefault(graph_id, {})[category] = count
+        return {
+            "journal_seq": 0,
+            "next_id": next_id,
+            "graphs": [
+                {
+                    "id": graph_id,
+                    "name": name,
+                    "node_count": node_counts.get(graph_id, 0),
+                    "edge_count": edge_counts.get(graph_id, 0),
+                    "version": version,
+                    "modified": modified,
+                    "categories": categories.get(graph_id, {}),
+                }
+                for graph_id, name, version, modified in rows
+            ],
+        }
+
+    def read_journal(self, after_seq: int = 0) -> list[dict]:
+        return []
+
+    def data_version(self) -> int | None:
+        # Only moves on commits of other connections, i.e. of other processes
+        with self._lock:
+            return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def read_versions(self) -> dict[int, int]:
+        with self._lock:
+            return dict(self._connection.execute("SELECT id, version FROM graphs"))
+
+    def read_graph(self, graph_id: int) -> dict | None:
+        with self._lock:
+            db = self._connection
+            row = db.execute(SELECT_GRAPH, (graph_id,)).fetchone()
+            if row is None:
+                return None
+            nodes = db.execute(SELECT_NODES, (graph_id,)).fetchall()
+            edges = db.execute(
+                "SELECT start_node, end_node, directed, description, style FROM edges "
+                "WHERE graph_id = ? ORDER BY rowid",
+                (graph_id,),
+            ).fetchall()
+        graph = dict(zip(GRAPH_SETTINGS, row))
+        graph["show_node_borders"] = bool(graph["show_node_borders"])
+        graph["show_edge_descriptions"] = bool(graph["show_edge_descriptions"])
+        return {
+            "journal_seq": 0,
+            **graph,
+            "version": row[-1],
+            "nodes": [dict(zip(NODE_COLUMNS, node)) for node in nodes],
+            "edges": [
+                {"start": start, "end": end, "directed": bool(directed), "description": description, "style": style}
+                for start, end, directed, description, style in edges
+            ],
+        }
+
+    def reserve_graph_id(self, next_id: int) -> int:
+        # Bumped in its own transaction, so processes sharing the database never pick the same id
+        with self._lock:
+            db = self._connection
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+                graph_id = max(next_id, row[0] if row else 0)
+                self._raise_next_id(db, graph_id + 1)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return graph_id
+
+    def write(self, entries: list[dict], snapshot: dict | None) -> None:
+        if not entries and snapshot is None:
+            return
+        with self._lock:
+            db = self._connection
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                for entry in entries:
+                    self._apply(db, entry)
+                if snapshot is not None:
+                    self._write_snapshot(db, **snapshot)
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+
+    def _write_snapshot(
+        self, db: sqlite3.Connection, manifest: dict, shards: dict[int, dict], deleted_ids: set[int]
+    ) -> None:
+        modified = {entry["id"]: entry["modified"] for entry in manifest["graphs"]}
+        for graph_id, shard in shards.items():
+            self._delete_graph(db, graph_id)
+            self._insert_graph(db, graph_id, shard, modified.get(graph_id))
+        for graph_id in deleted_ids:
+            self._delete_graph(db, graph_id)
+        self._raise_next_id(db, manifest["next_id"])
+
+    @staticmethod
+    def _raise_next_id(db: sqlite3.Connection, next_id: int) -> None:
+        db.execute(
+            "INSERT INTO meta (key, value) VALUES ('next_id', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)",
+            (next_id,),
+        )
+
+    def _insert_graph(self, db: sqlite3.Connection, graph_id: int, graph: dict, modified: str | None) -> None:
+        db.execute(
+            INSERT_GRAPH,
+            (graph_id, *(graph.get(key) for key in GRAPH_SETTINGS), graph.get("version", 0), modified),
+        )
+        db.executemany(
+            INSERT_NODE,
+            [(graph_id, *(node.get(key) for key in NODE_COLUMNS)) for node in graph["nodes"]],
+        )
+        db.executemany(
+            INSERT_EDGE,
+            [
+                (
+                    graph_id,
+                    edge["start"],
+                    edge["end"],
+                    edge.get("directed", True),
+                    edge.get("description"),
+                    edge.get("style", "solid"),
+                )
+                for edge in graph["edges"]
+            ],
+        )
+        self._raise_next_id(db, graph_id + 1)
+
+    @staticmethod
+    def _delete_graph(db: sqlite3.Connection, graph_id: int) -> None:
+        db.execute("DELETE FROM graphs WHERE id = ?", (graph_id,))
+        db.execute("DELETE FROM nodes WHERE graph_id = ?", (graph_id,))
+        db.execute("DELETE FROM edges WHERE graph_id = ?", (graph_id,))
+
+    def _apply(self, db: sqlite3.Connection, entry: dict) -> None:
+        """Applies one journal entry with the same semantics as Graph.apply_change."""
+        graph_id, op = entry["graph_id"], entry["op"]
+        if op == "add_graph":
+            self._insert_graph(db, graph_id, entry["graph"], entry.get("time"))
+            return
+        if op == "delete_graph":
+            self._delete_graph(db, graph_id)
+            return
+
+        if op == "add_node":
+            node = entry["node"]
+            db.execute(INSERT_NODE, (graph_id, *(node.get(key) for key in NODE_COLUMNS)))
+        elif op == "delete_node":
+            name = entry["name"]
+            db.execute("DELETE FROM nodes WHERE graph_id = ? AND name = ?", (graph_id, name))
+            db.execute(
+                "DELETE FROM edges WHERE graph_id = ? AND (start_node = ? OR end_node = ?)", (graph_id, name, name)
+            )
+            db.execute("UPDATE nodes SET parent = NULL WHERE graph_id = ? AND parent = ?", (graph_id, name))
+        elif op == "update_node":
+            old_name, new_name = entry["old_name"], entry["new_name"]
+            if new_name != old_name:
+                renamed = (new_name, graph_id, old_name)
+                db.execute("UPDATE nodes SET name = ? WHERE graph_id = ? AND name = ?", renamed)
+                db.execute("UPDATE edges SET start_node = ? WHERE graph_id = ? AND start_node = ?", renamed)
+                db.execute("UPDATE edges SET end_node = ? WHERE graph_id = ? AND end_node = ?", renamed)
+            if entry["category"] is not None:
+                db.execute(
+                    "UPDATE nodes SET category = ? WHERE graph_id = ? AND name = ?",
+                    (entry["category"], graph_id, new_name),
+                )
+            if entry["parent"] is not None:
+                db.execute(
+                    "UPDATE nodes SET parent = ? WHERE graph_id = ? AND name = ?",
+                    (entry["parent"] or None, graph_id, new_name),
+                )
+        elif op == "update_node_fields":
+            for key, value in entry["fields"].items():
+                if key in NODE_FIELD_UPDATES:
+                    db.execute(NODE_FIELD_UPDATES[key], (value, graph_id, entry["name"]))
+        elif op == "move_nodes":
+            db.executemany(
+                "UPDATE nodes SET position_x = ?, position_y = ? WHERE graph_id = ? AND name = ?",
+                ((x, y, graph_id, name) for name, x, y in zip(entry["names"], entry["x"], entry["y"])),
+            )
+        elif op == "add_edge":
+            edge = entry["edge"]
+            db.execute(
+                INSERT_EDGE,
+                (graph_id, edge["start"], edge["end"], edge["directed"], edge["description"], edge["style"]),
+            )
+        elif op == "delete_edge":
+            db.execute(DELETE_FIRST_EDGE, (graph_id, entry["start"], entry["end"]))
+        elif op == "update_edge":
+            db.execute(
+                UPDATE_FIRST_EDGE,
+                (entry["description"], entry["style"], graph_id, entry["start"], entry["end"]),
+            )
+        elif op == "update_settings":
+            for key, value in entry["settings"].items():
+                if key in SETTING_UPDATES:
+                    db.execute(SETTING_UPDATES[key], (value, graph_id))
+        else:
+            raise ValueError(f"Unknown change operation {op}")
+
+        # Every change record bumps the graph version by one, as Graph._emit does
+        db.execute("UPDATE graphs SET version = version + 1, modified = ? WHERE id = ?", (entry.get("time"), graph_id))
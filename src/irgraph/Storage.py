@@ -0,0 +1,154 @@
+import abc
+import json
+import logging
+import os
+
+from irgraph.BinaryGraph import BinaryGraph, encode_graph
+from irgraph.Journal import Journal
+
+
+class GraphStorage(abc.ABC):
+    """Persistence backend of Graphs.
+
+    Graphs hands over batches of journal entries (the change records of Graph plus
+    add_graph/delete_graph) and, when a snapshot is due, full copies of dirty graphs
+    with the manifest. Journaled stores keep entries in a log and fold them into
+    snapshots; row-level stores apply every entry in place and only need a snapshot
+    to seed an empty store.
+    """
+
+    # Whether read_journal can return entries that are not contained in read_graph yet
+    journaled = True
+
+    @abc.abstractmethod
+    def exists(self) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_manifest(self) -> dict:
+        """{"journal_seq", "next_id", "graphs": [manifest entries]}"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_journal(self, after_seq: int = 0) -> list[dict]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def read_graph(self, graph_id: int) -> dict | None:
+        """A graph in the toJSON shape plus "journal_seq" and "version", or None if it is not stored."""
+        raise NotImplementedError
+
+    def data_version(self) -> int | None:
+        """Changes whenever another process commits to the store; None for stores used by one process only."""
+        return None
+
+    def read_versions(self) -> dict[int, int]:
+        """The stored version of every graph by id."""
+        return {entry["id"]: entry["version"] for entry in self.read_manifest()["graphs"]}
+
+    def reserve_graph_id(self, next_id: int) -> int:
+        """The id of a new graph, at least `next_id`. Stores shared by several processes hand out every id once."""
+        return next_id
+
+    def read_binary_graph(self, graph_id: int) -> BinaryGraph | None:
+        """A memory-mapped binary copy of read_graph, if the storage keeps one."""
+        return None
+
+    @abc.abstractmethod
+    def write(self, entries: list[dict], snapshot: dict | None) -> None:
+        """Persists journal entries, then the snapshot ({"manifest", "shards", "deleted_ids"}) if any."""
+        raise NotImplementedError
+
+
+class JsonStorage(GraphStorage):
+    """One JSON shard per graph, a manifest and an append-only journal in `data_dir`.
+
+    Every shard whose fields fit the format is also written as a binary graph, which is
+    loaded instead of the JSON when present. The binary file is written first, so it is
+    never older than the JSON.
+    """
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+        self.manifest_path = os.path.join(self.data_dir, 'manifest.json')
+        # Mutations are appended to a journal next to the shards instead of rewriting them
+        self.journal = Journal(os.path.join(self.data_dir, 'journal'))
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def read_manifest(self) -> dict:
+        logging.info(f"reading graph manifest from file {self.manifest_path}")
+        with open(self.manifest_path) as json_file:
+            return json.load(json_file)
+
+    def read_journal(self, after_seq: int = 0) -> list[dict]:
+        return self.journal.read(after_seq=after_seq)
+
+    def shard_path(self, graph_id: int) -> str:
+        return os.path.join(self.data_dir, f'{graph_id}.json')
+
+    def read_graph(self, graph_id: int) -> dict | None:
+        if not os.path.exists(self.shard_path(graph_id)):
+            return None
+        with open(self.shard_path(graph_id)) as json_file:
+            return json.load(json_file)
+
+    def binary_path(self, graph_id: int) -> str:
+        return os.path.join(self.data_dir, f'{graph_id}.bin')
+
+    def read_binary_graph(self, graph_id: int) -> BinaryGraph | None:
+        if not os.path.exists(self.binary_path(graph_id)):
+            return None
+        try:
+            return BinaryGraph(self.binary_path(graph_id))
+        except ValueError as e:
+            logging.warning(f"Ignoring binary shard of graph {graph_id}: {e}")
+            return None
+
+    def write(self, entries: list[dict], snapshot: dict | None) -> None:
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.journal.append(entries)
+        if snapshot is not None:
+            self._write_snapshot(**snapshot)
+
+    def _write_snapshot(self, manifest: dict, shards: dict[int, dict], deleted_ids: set[int]) -> None:
+        logging.info(f"Writing {len(shards)} graph shards to {self.data_dir}")
+        for graph_id, shard in shards.items():
+            try:
+                write_file(self.binary_path(graph_id), encode_graph(shard))
+            except ValueError as e:
+                # Keep only the JSON shard; an older binary one would be loaded instead of it
+                logging.warning(f"Writing graph {graph_id} as JSON only: {e}")
+                if os.path.exists(self.binary_path(graph_id)):
+                    os.remove(self.binary_path(graph_id))
+            write_file(self.shard_path(graph_id), json.dumps(shard, indent=4))
+        write_file(self.manifest_path, json.dumps(manifest, indent=4))
+        for graph_id in deleted_ids:
+            for path in (self.binary_path(graph_id), self.shard_path(graph_id)):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.journal.truncate(manifest['journal_seq'])
+
+
+def write_file(file_path: str, content: str | bytes) -> None:
+    """Atomically replaces a file: write a temp file, fsync it, rename it over the target."""
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb' if isinstance(content, bytes) else 'w') as output_file:
+        output_file.write(content)
+        output_file.flush()
+        os.fsync(output_file.fileno())
+    os.replace(tmp_path, file_path)
+    fsync_directory(os.path.dirname(file_path))
+
+
+def fsync_directory(dir_path: str) -> None:
+    """Makes a rename in `dir_path` durable; a no-op where directories cannot be opened (Windows)."""
+    try:
+        dir_fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
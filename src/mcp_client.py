@@ -15,11 +15,20 @@ class IRGraphClient:
         except httpx.ConnectError:
             raise RuntimeError("IR Graph API unreachable")
 
-    async def list_graphs(self) -> list[Dict[str, Any]]:
+    async def list_graphs(self, page_size: int = 100) -> list[Dict[str, Any]]:
+        """Ids and names of all graphs, fetched page by page from the summary endpoint."""
+        graphs = []
         try:
-            response = await self.client.get("/api/graphs/")
-            response.raise_for_status()
-            return response.json()
+            while True:
+                response = await self.client.get(
+                    "/api/graphs/summary",
+                    params={"offset": len(graphs), "limit": page_size, "fields": "id,name"},
+                )
+                response.raise_for_status()
+                page = response.json()
+                graphs.extend(page["graphs"])
+                if not page["graphs"] or len(graphs) >= page["total"]:
+                    return graphs
         except httpx.ConnectError:
             raise RuntimeError("IR Graph API unreachable")
 
@@ -80,6 +89,14 @@ class IRGraphClient:
         except httpx.ConnectError:
             raise RuntimeError("IR Graph API unreachable")
 
+    async def is_affected(self, graph_id: int, node_name: str, target_name: str) -> Dict[str, Any]:
+        try:
+            response = await self.client.get(f"/api/graphs/{graph_id}/blast-radius/{node_name}/{target_name}")
+            response.raise_for_status()
+            return response.json()
+        except httpx.ConnectError:
+            raise RuntimeError("IR Graph API unreachable")
+
     async def is_agent_owned(self, graph_id: int) -> bool:
         graph = await self.get_graph(graph_id)
         if graph and "(agent)" in graph.get("name", ""):
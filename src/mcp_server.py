@@ -62,8 +62,8 @@ async def list_graphs() -> str:
         
         # Format list with ID and name
         output = "Available Graphs:\n"
-        for i, g in enumerate(graphs):
-            output += f"- ID {i}: {g.get('name', 'Unnamed')}\n"
+        for g in graphs:
+            output += f"- ID {g['id']}: {g.get('name', 'Unnamed')}\n"
         return output
     except Exception as e:
         logger.error(f"Error listing graphs: {str(e)}")
@@ -211,6 +211,20 @@ async def get_blast_radius(graph_id: int, node_name: str) -> str:
         logger.error(f"Error getting blast radius for node {node_name} in graph {graph_id}: {str(e)}")
         return f"Error: {str(e)}"
 
+@mcp.tool()
+async def is_affected(graph_id: int, node_name: str, target_name: str) -> str:
+    """Checks whether a target node is in the blast radius of a starting node."""
+    logger.info(f"Checking whether '{target_name}' is affected by '{node_name}' in graph {graph_id}")
+    c = get_client()
+    try:
+        data = await c.is_affected(graph_id, node_name, target_name)
+        if data.get("affected"):
+            return f"Node '{target_name}' is in the blast radius of '{node_name}'."
+        return f"Node '{target_name}' is not affected by '{node_name}'."
+    except Exception as e:
+        logger.error(f"Error checking blast radius of {node_name} in graph {graph_id}: {e}")
+        return f"Error: {e}"
+
 async def main():
     parser = argparse.ArgumentParser(description="IR-Graph MCP Server")
     parser.add_argument("--api-url", default=None, help="Base URL for the IR Graph API")
@@ -0,0 +1,55 @@
+from http_app import graphs
+
+
+def test_batch_applies_all_operations(client):
+    client.post("/api/graphs/", json={"name": "BatchGraph"})
+    payload = {"operations": [
+        {"op": "add_node", "node": {"name": "A", "category": "Server"}},
+        {"op": "add_node", "node": {"name": "B"}},
+        {"op": "add_edge", "edge": {"start": "A", "end": "B", "description": "calls"}},
+        {"op": "update_node_fields", "name": "A", "fields": {"position_x": 10, "position_y": 20}},
+    ]}
+
+    response = client.post("/api/graphs/0/batch", json=payload)
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["applied"] * 4
+
+    graph = client.get("/api/graphs/0").json()
+    assert [n["name"] for n in graph["nodes"]] == ["A", "B"]
+    assert graph["nodes"][0]["position_x"] == 10
+    assert graph["edges"][0]["description"] == "calls"
+    # One persistence write for the whole batch (plus the one from creating the graph)
+    assert graphs.save_to_json.call_count == 2
+
+
+def test_batch_is_rejected_atomically(client):
+    client.post("/api/graphs/", json={"name": "BatchGraph"})
+    payload = {"operations": [
+        {"op": "add_node", "node": {"name": "A"}},
+        {"op": "delete_edge", "start": "A", "end": "B"},
+    ]}
+
+    response = client.post("/api/graphs/0/batch", json=payload)
+    assert response.status_code == 400
+    results = response.json()["detail"]["results"]
+    assert results[0]["status"] == "valid"
+    assert results[1] == {"index": 1, "op": "delete_edge", "status": "rejected", "error": "Edge A -> B not found"}
+    assert client.get("/api/graphs/0").json()["nodes"] == []
+
+
+def test_batch_unknown_graph(client):
+    response = client.post("/api/graphs/42/batch", json={"operations": []})
+    assert response.status_code == 404
+
+
+def test_batch_rejects_mistyped_node_fields(client):
+    client.post("/api/graphs/", json={"name": "BatchGraph"})
+    client.post("/api/graphs/0/nodes", json={"name": "A", "description": "kept"})
+    for fields in ({"position_x": "abc"}, {"description": {"nested": True}}, {"parent": "B"}):
+        operation = {"op": "update_node_fields", "name": "A", "fields": fields}
+        assert client.post("/api/graphs/0/batch", json={"operations": [operation]}).status_code == 422
+
+    operation = {"op": "update_node_fields", "name": "A", "fields": {"position_x": 3}}
+    assert client.post("/api/graphs/0/batch", json={"operations": [operation]}).status_code == 200
+    node = client.get("/api/graphs/0").json()["nodes"][0]
+    assert (node["position_x"], node["description"]) == (3, "kept")
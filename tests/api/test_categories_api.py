@@ -108,6 +108,22 @@ def test_delete_category(client, seed_categories):
     assert "Workstation" not in names
 
 
+def test_rename_and_delete_cascade_to_nodes(client, seed_categories):
+    for graph_id in range(2):
+        client.post("/api/graphs/", json={"name": f"G{graph_id}"})
+        client.post(f"/api/graphs/{graph_id}/nodes", json={"name": "ws", "category": "Workstation"})
+    client.post("/api/graphs/1/nodes", json={"name": "db", "category": "Database"})
+    assert client.get("/api/categories/usage").json()["Workstation"] == 2
+
+    client.patch("/api/categories/Workstation", json={"name": "Laptop"})
+    usage = client.get("/api/categories/usage").json()
+    assert usage["Laptop"] == 2 and "Workstation" not in usage
+    assert client.get("/api/graphs/0/nodes").json()[0]["category"] == "Laptop"
+
+    client.delete("/api/categories/Database")
+    assert client.get("/api/graphs/1/nodes?prefix=db").json()[0]["category"] == "Default"
+
+
 def test_delete_default_returns_400(client, seed_categories):
     response = client.delete("/api/categories/Default")
     assert response.status_code == 400
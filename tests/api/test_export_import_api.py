@@ -131,6 +131,18 @@ def test_import_graph_creates_new_graph(client):
     assert "NewImport" in names
 
 
+@pytest.mark.parametrize("graph", [
+    {"name": "Mixed", "nodes": [{"name": 5}, {"name": "a"}], "edges": []},
+    {"name": "Mixed", "nodes": [{"name": "a"}], "edges": [{"start": ["a"], "end": "a"}]},
+    {"name": ["Mixed"], "nodes": [], "edges": []},
+])
+def test_import_graph_rejects_non_string_names(client, graph):
+    """Names that are not strings cannot be indexed and are a bad request."""
+    response = client.post("/api/graphs/import", json={"graph": graph})
+    assert response.status_code == 400
+    assert client.get("/api/graphs/").json() == []
+
+
 def test_import_graph_bad_payload_missing_graph_key(client):
     """Importing JSON without the top-level 'graph' key returns 422."""
     response = client.post("/api/graphs/import", json={"not_graph": {}})
@@ -180,3 +192,57 @@ def test_import_graph_preserves_nodes_and_edges(client):
     edges_resp = client.get(f"/api/graphs/{new_id}/edges")
     assert edges_resp.status_code == 200
     assert len(edges_resp.json()) == 1
+
+
+# ─── Streaming Tests ──────────────────────────────────────────────────────────
+
+def test_stream_export_yields_nodes_then_edges(client):
+    """The NDJSON export starts with the graph settings, followed by nodes and edges."""
+    graph_id = _create_graph_with_nodes_and_edge(client, "Streamed")
+
+    response = client.get(f"/api/graphs/{graph_id}/export/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["type"] for r in records] == ["graph", "node", "node", "edge"]
+    assert records[0]["name"] == "Streamed"
+    assert (records[3]["start"], records[3]["end"]) == ("NodeA", "NodeB")
+
+
+def test_stream_export_import_roundtrip(client):
+    """A streamed export can be streamed back in as a new graph."""
+    graph_id = _create_graph_with_nodes_and_edge(client, "RoundTrip")
+    exported = client.get(f"/api/graphs/{graph_id}/export/stream").content
+
+    response = client.post("/api/graphs/import/stream", content=exported)
+    assert response.status_code == 200
+    new_id = response.json()["new_graph_id"]
+
+    graph = client.get(f"/api/graphs/{new_id}").json()
+    assert graph["name"] == "RoundTrip (imported)"
+    assert [n["name"] for n in graph["nodes"]] == ["NodeA", "NodeB"]
+    assert len(graph["edges"]) == 1
+
+
+def test_stream_import_rejects_edge_before_nodes(client):
+    """Edges referencing nodes that have not been sent yet are rejected."""
+    body = b'{"type": "graph", "name": "Bad"}\n{"type": "edge", "start": "A", "end": "B"}\n'
+    response = client.post("/api/graphs/import/stream", content=body)
+    assert response.status_code == 400
+    assert client.get("/api/graphs/").json() == []
+
+
+@pytest.mark.parametrize("records", [
+    [{"type": "graph", "name": ["Bad"]}],
+    [{"type": "graph", "name": "Bad"}, {"type": "node", "name": 5}],
+    [{"type": "graph", "name": "Bad"}, {"type": "node", "name": "A", "parent": {"x": 1}}],
+    [{"type": "graph", "name": "Bad"}, {"type": "node", "name": "A"}, {"type": "edge", "end": "A"}],
+    [{"type": "graph", "name": "Bad"}, {"type": "node", "name": "A"}, {"type": "edge", "start": ["A"], "end": "A"}],
+])
+def test_stream_import_rejects_wrongly_typed_fields(client, records):
+    """Names and settings of the wrong type are a bad request, not a server error."""
+    body = "".join(json.dumps(record) + "\n" for record in records).encode()
+    response = client.post("/api/graphs/import/stream", content=body)
+    assert response.status_code == 400
+    assert client.get("/api/graphs/").json() == []
@@ -1,6 +1,8 @@
 import pytest
 import logging
+import time
 from http_app import graphs
+from irgraph.PositionBuffer import encode_positions
 
 # We can rely on the client fixture to have reset graphs.graphs due to our conftest change
 
@@ -99,3 +101,246 @@ def test_create_edge_invalid_nodes(client):
     response = client.post("/api/graphs/0/edges", json={"start_node": "X", "end_node": "Y"})
     assert response.status_code == 400
     assert response.json() == {"detail": "Node names incorrect"}
+
+def test_graph_ids_are_stable_across_deletes(client):
+    client.post("/api/graphs/", json={"name": "G0"})
+    response = client.post("/api/graphs/", json={"name": "G1"})
+    assert response.json()["id"] == 1
+
+    client.delete("/api/graphs/0")
+
+    listing = client.get("/api/graphs/").json()
+    assert [(g["id"], g["name"]) for g in listing] == [(1, "G1")]
+    assert client.get("/api/graphs/1").json()["name"] == "G1"
+    assert client.get("/api/graphs/0").json() is None
+
+def test_blast_radius_and_is_affected(client):
+    client.post("/api/graphs/", json={"name": "Radius"})
+    for name in ["A", "B", "C"]:
+        client.post("/api/graphs/0/nodes", json={"name": name})
+    client.post("/api/graphs/0/edges", json={"start_node": "A", "end_node": "B"})
+    client.post("/api/graphs/0/edges", json={"start_node": "B", "end_node": "C"})
+
+    response = client.get("/api/graphs/0/blast-radius/A")
+    assert response.json() == {"blast_radius": ["B", "C"], "node": "A"}
+
+    assert client.get("/api/graphs/0/blast-radius/A/C").json()["affected"] is True
+    assert client.get("/api/graphs/0/blast-radius/C/A").json()["affected"] is False
+    assert client.get("/api/graphs/0/blast-radius/A/X").status_code == 404
+
+def test_graph_read_uses_to_json_shape(client):
+    client.post("/api/graphs/", json={"name": "Shape"})
+    client.post("/api/graphs/0/nodes", json={"name": "A"})
+    client.post("/api/graphs/0/nodes", json={"name": "B"})
+    client.post("/api/graphs/0/edges", json={"start_node": "A", "end_node": "B"})
+
+    graph = client.get("/api/graphs/0").json()
+    assert graph["id"] == 0
+    assert graph["edges"][0]["start"] == "A"
+    assert graph["edges"][0]["end"] == "B"
+    assert client.get("/api/graphs/").json() == [graph]
+
+def test_graph_etag_and_changes(client):
+    client.post("/api/graphs/", json={"name": "Versioned"})
+    response = client.get("/api/graphs/0")
+    etag = response.headers["etag"]
+    version = response.json()["version"]
+
+    assert client.get("/api/graphs/0", headers={"If-None-Match": etag}).status_code == 304
+    not_modified = client.get("/api/graphs/0", headers={"If-None-Match": f'"other", {etag}'})
+    assert (not_modified.status_code, not_modified.headers["etag"]) == (304, etag)
+    assert client.get("/api/graphs/0", headers={"If-None-Match": f'"other",W/{etag}'}).status_code == 304
+    assert client.get("/api/graphs/0", headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get("/api/graphs/0", headers={"If-None-Match": f'"x{etag[1:]}'}).status_code == 200
+    assert client.get("/api/graphs/9", headers={"If-None-Match": "*"}).status_code != 304
+
+    client.post("/api/graphs/0/nodes", json={"name": "A"})
+    assert client.get("/api/graphs/0", headers={"If-None-Match": etag}).status_code == 200
+
+    delta = client.get(f"/api/graphs/0/changes?since={version}").json()
+    assert delta["version"] == version + 1
+    assert [(c["op"], c["node"]["name"]) for c in delta["changes"]] == [("add_node", "A")]
+    assert client.get("/api/graphs/0/changes?since=99").status_code == 410
+    assert client.get("/api/graphs/5/changes?since=0").status_code == 404
+
+def test_graph_summary_pagination_and_fields(client):
+    for name in ["S0", "S1", "S2"]:
+        client.post("/api/graphs/", json={"name": name})
+    client.post("/api/graphs/1/nodes", json={"name": "A"})
+
+    page = client.get("/api/graphs/summary?offset=1&limit=1").json()
+    assert page["total"] == 3
+    summary = page["graphs"][0]
+    assert (summary["id"], summary["name"], summary["node_count"], summary["edge_count"]) == (1, "S1", 1, 0)
+    assert summary["version"] == client.get("/api/graphs/1").json()["version"]
+
+    projected = client.get("/api/graphs/summary?fields=id,edge_mode").json()["graphs"]
+    assert projected[0] == {"id": 0, "edge_mode": "bezier"}
+    assert client.get("/api/graphs/summary?fields=nodes").status_code == 400
+
+def test_filtered_node_and_edge_queries(client):
+    client.post("/api/graphs/", json={"name": "Filtered"})
+    for name, category in [("db-a", "Database"), ("web", "Host"), ("db-b", "Database")]:
+        client.post("/api/graphs/0/nodes", json={"name": name, "category": category})
+    client.post("/api/graphs/0/edges", json={"start_node": "web", "end_node": "db-a"})
+    client.post("/api/graphs/0/edges", json={"start_node": "web", "end_node": "db-b"})
+
+    response = client.get("/api/graphs/0/nodes?category=Database&limit=1")
+    assert [n["name"] for n in response.json()] == ["db-a"]
+    cursor = response.headers["x-next-cursor"]
+    response = client.get(f"/api/graphs/0/nodes?category=Database&limit=1&cursor={cursor}")
+    assert [n["name"] for n in response.json()] == ["db-b"]
+    assert "x-next-cursor" not in response.headers
+
+    edges = client.get("/api/graphs/0/edges?end_node=db-b").json()
+    assert [(e["start"]["name"], e["end"]["name"]) for e in edges] == [("web", "db-b")]
+    assert client.get("/api/graphs/0/edges?cursor=abc").status_code == 422
+
+def test_subtree_endpoints(client):
+    client.post("/api/graphs/", json={"name": "Tree"})
+    client.post("/api/graphs/0/nodes", json={"name": "grp", "position_x": 0, "position_y": 0})
+    client.post("/api/graphs/0/nodes", json={"name": "a", "parent": "grp", "position_x": 1, "position_y": 1})
+    client.post("/api/graphs/0/nodes", json={"name": "b"})
+    client.post("/api/graphs/0/edges", json={"start_node": "a", "end_node": "b"})
+
+    assert [n["name"] for n in client.get("/api/graphs/0/nodes/grp/subtree").json()] == ["grp", "a"]
+    assert client.get("/api/graphs/0/nodes/grp/collapsed").json()["edges"] == [{"start": "grp", "end": "b", "count": 1}]
+
+    assert client.post("/api/graphs/0/nodes/grp/move", json={"dx": 10, "dy": 20}).status_code == 200
+    nodes = {n["name"]: n for n in client.get("/api/graphs/0/nodes").json()}
+    assert (nodes["a"]["position_x"], nodes["a"]["position_y"]) == (11, 21)
+    assert client.post("/api/graphs/0/nodes/grp/move", json={"parent": "a"}).status_code == 400
+
+    assert client.delete("/api/graphs/0/nodes/grp/subtree").json()["deleted"] == ["grp", "a"]
+    assert [n["name"] for n in client.get("/api/graphs/0/nodes").json()] == ["b"]
+    assert client.get("/api/graphs/0/nodes/grp/subtree").status_code == 404
+
+def test_bulk_delete_nodes(client):
+    client.post("/api/graphs/", json={"name": "Bulk"})
+    for name in ["A", "B", "C"]:
+        client.post("/api/graphs/0/nodes", json={"name": name})
+    client.post("/api/graphs/0/edges", json={"start_node": "A", "end_node": "B"})
+
+    response = client.post("/api/graphs/0/nodes/delete", json={"names": ["A", "B", "X"]})
+    assert response.json() == {"deleted": ["A", "B"]}
+    assert [n["name"] for n in client.get("/api/graphs/0/nodes").json()] == ["C"]
+    assert client.get("/api/graphs/0/edges").json() == []
+    assert client.post("/api/graphs/9/nodes/delete", json={"names": ["A"]}).status_code == 404
+
+def test_failed_node_rename_changes_nothing(client):
+    client.post("/api/graphs/", json={"name": "Atomic"})
+    client.post("/api/graphs/0/nodes", json={"name": "A", "description": "old"})
+    client.post("/api/graphs/0/nodes", json={"name": "B"})
+
+    response = client.patch("/api/graphs/0/nodes/A", json={"name": "B", "description": "new"})
+    assert response.status_code == 404
+    assert client.get("/api/graphs/0/nodes?prefix=A").json()[0]["description"] == "old"
+
+def test_layout_endpoint(client):
+    client.post("/api/graphs/", json={"name": "Layout"})
+    client.post("/api/graphs/0/nodes", json={"name": "a", "position_x": 0, "position_y": 0})
+    client.post("/api/graphs/0/nodes", json={"name": "b"})
+    client.post("/api/graphs/0/edges", json={"start_node": "a", "end_node": "b"})
+
+    response = client.post("/api/graphs/0/layout", json={"mode": "layered", "incremental": True, "spacing": 100})
+    assert response.status_code == 200
+    assert response.json()["nodes"] == [{"name": "b", "position_x": 0, "position_y": 100}]
+    nodes = {n["name"]: n for n in client.get("/api/graphs/0/nodes").json()}
+    assert (nodes["b"]["position_x"], nodes["b"]["position_y"]) == (0, 100)
+
+    version = graphs.get_graph_by_id(0).version
+    assert len(client.post("/api/graphs/0/layout", json={}).json()["nodes"]) == 2
+    # The whole layout is stored as one change
+    assert graphs.get_graph_by_id(0).changes_since(version)[0]["op"] == "move_nodes"
+    assert graphs.get_graph_by_id(0).version == version + 1
+    assert client.post("/api/graphs/0/layout", json={"mode": "circle"}).status_code == 422
+    assert client.post("/api/graphs/9/layout", json={}).status_code == 404
+
+def test_layout_conflicts_with_concurrent_write(client, monkeypatch):
+    client.post("/api/graphs/", json={"name": "Layout"})
+    client.post("/api/graphs/0/nodes", json={"name": "a"})
+
+    def layout_while_renamed(snapshot, **options):
+        graphs.get_graph_by_id(0).update_settings(name="Renamed")
+        return {"a": (1, 1)}
+    monkeypatch.setattr("http_app.routes.api.graphs.compute_layout", layout_while_renamed)
+
+    assert client.post("/api/graphs/0/layout", json={}).status_code == 409
+    assert client.get("/api/graphs/0").json()["nodes"][0]["position_x"] is None
+
+def test_viewport_endpoint(client):
+    client.post("/api/graphs/", json={"name": "Canvas"})
+    client.post("/api/graphs/0/nodes", json={"name": "in", "position_x": 10, "position_y": 10})
+    client.post("/api/graphs/0/nodes", json={"name": "out", "position_x": 900, "position_y": 900})
+    client.post("/api/graphs/0/edges", json={"start_node": "in", "end_node": "out"})
+
+    viewport = client.get("/api/graphs/0/viewport", params={"x0": 0, "y0": 0, "x1": 100, "y1": 100}).json()
+    assert [n["name"] for n in viewport["nodes"]] == ["in"]
+    assert viewport["edges"] == [{"start": "in", "end": "out", "directed": True, "description": None, "style": "solid"}]
+
+    # Positions saved through the bulk update path move nodes in and out of the viewport
+    client.patch("/api/graphs/0/nodes", json={"nodes": [{"name": "out", "position_x": 50, "position_y": 50}]})
+    viewport = client.get("/api/graphs/0/viewport", params={"x0": 0, "y0": 0, "x1": 100, "y1": 100}).json()
+    assert sorted(n["name"] for n in viewport["nodes"]) == ["in", "out"]
+    assert client.get("/api/graphs/9/viewport", params={"x0": 0, "y0": 0, "x1": 1, "y1": 1}).status_code == 404
+    for bound in ("inf", "-inf", "nan"):
+        params = {"x0": 0, "y0": 0, "x1": bound, "y1": 1}
+        assert client.get("/api/graphs/0/viewport", params=params).status_code == 400
+
+def test_positions_endpoint(client):
+    client.post("/api/graphs/", json={"name": "Drag"})
+    client.post("/api/graphs/0/nodes", json={"name": "a"})
+    client.post("/api/graphs/0/nodes", json={"name": "b"})
+    positions = client.get("/api/graphs/0/positions").json()
+    assert (positions["names"], positions["x"], positions["y"]) == (["a", "b"], [None, None], [None, None])
+    order = positions["order"]
+
+    # Repeated updates of a node collapse into its last position
+    for x in range(3):
+        response = client.post("/api/graphs/0/positions", json={"order": order, "index": [1], "x": [x], "y": [5]})
+        assert response.status_code == 202
+    client.post(
+        "/api/graphs/0/positions",
+        content=encode_positions(order, [0, 1], [-7, 30], [8, 40]),
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    for _ in range(100):
+        positions = client.get("/api/graphs/0/positions").json()
+        if positions["x"] == [-7, 30]:
+            break
+        time.sleep(0.01)
+    assert (positions["x"], positions["y"]) == ([-7, 30], [8, 40])
+    assert positions["order"] == order
+
+    assert client.post("/api/graphs/0/positions", json={"order": order, "index": [2], "x": [0], "y": [0]}).status_code == 400
+    assert client.post("/api/graphs/0/positions", json={"order": order, "index": [0], "x": [0], "y": []}).status_code == 400
+    assert client.post("/api/graphs/0/positions", json={"order": order, "index": [], "x": [], "y": []}).status_code == 400
+    assert client.post(
+        "/api/graphs/0/positions", content=b"\x00", headers={"Content-Type": "application/octet-stream"}
+    ).status_code == 400
+    client.post("/api/graphs/0/nodes", json={"name": "c"})
+    assert client.post("/api/graphs/0/positions", json={"order": order, "index": [0], "x": [0], "y": [0]}).status_code == 409
+    assert client.get("/api/graphs/9/positions").status_code == 404
+
+def test_level_of_detail_endpoint(client):
+    client.post("/api/graphs/", json={"name": "Zoom"})
+    client.post("/api/graphs/0/nodes", json={"name": "g"})
+    client.post("/api/graphs/0/nodes", json={"name": "a", "parent": "g", "category": "Server"})
+    client.post("/api/graphs/0/nodes", json={"name": "b", "category": "Server"})
+    client.post("/api/graphs/0/edges", json={"start_node": "a", "end_node": "b"})
+
+    response = client.get("/api/graphs/0/lod")
+    assert response.status_code == 200
+    lod = response.json()
+    assert lod["by"] == "parent"
+    assert {c["id"]: c["size"] for c in lod["clusters"]} == {"g": 2, "b": 1}
+    assert lod["edges"] == [{"start": "g", "end": "b", "count": 1}]
+
+    etag = response.headers["ETag"]
+    assert client.get("/api/graphs/0/lod", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/graphs/0/lod", params={"by": "category"}).json()["edges"] == []
+    assert client.get("/api/graphs/0/lod", params={"by": "shape"}).status_code == 422
+    assert client.get("/api/graphs/9/lod").status_code == 404
+
+def test_events_endpoint_unknown_graph(client):
+    assert client.get("/api/graphs/9/events").status_code == 404
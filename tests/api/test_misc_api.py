@@ -1,5 +1,6 @@
 import pytest
 from http_app import graphs
+from irgraph.Graph import Graph
 
 def test_get_config(client):
     # The config logic depends on AppConfig and files.
@@ -15,3 +16,14 @@ def test_save_utils(client):
     # Verify our mock was called
     graphs.save_to_json.assert_called_once()
     assert response.json() == "success"
+
+
+def test_health_and_readiness(client):
+    assert client.get("/healthz").json() == {"status": "ok"}
+    # API routes wait until the registry is read
+    assert client.get("/api/graphs/summary").status_code == 200
+    graphs.add_graph(Graph(name="G1"))
+
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json() == {"ready": True, "failed": False, "registry_loaded": True, "graphs_loaded": 1, "graphs_total": 1}
@@ -16,8 +16,8 @@ def client():
     
     graphs.load_from_json = MagicMock()
     graphs.save_to_json = MagicMock()
-    # Reset graphs list for each test
-    graphs.graphs = []
+    # Reset the graph registry (including the id counter) for each test
+    graphs.reset()
     
     app = create_app()
     with TestClient(app) as c:
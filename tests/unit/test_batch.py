@@ -0,0 +1,62 @@
+import pytest
+
+from irgraph.Batch import BatchValidationError, apply_batch
+from irgraph.Graph import Graph
+from irgraph.Node import Node
+
+
+def _node(name):
+    return {"op": "add_node", "node": {"name": name}}
+
+
+def _edge(start, end, description=None):
+    return {"op": "add_edge", "edge": {"start": start, "end": end, "directed": True, "description": description, "style": "solid"}}
+
+
+def test_apply_batch_in_order():
+    graph = Graph()
+    apply_batch(graph, [
+        _node("A"),
+        _node("B"),
+        _edge("A", "B"),
+        {"op": "update_edge", "start": "A", "end": "B", "description": "link", "style": None},
+        {"op": "update_node_fields", "name": "B", "fields": {"position_x": 5}},
+    ])
+
+    assert [n.name for n in graph.nodes] == ["A", "B"]
+    assert graph.edges[0].description == "link"
+    assert graph.get_node_by_name("B").position_x == 5
+
+
+def test_invalid_batch_changes_nothing():
+    graph = Graph()
+    graph.add_node(Node("A"))
+
+    with pytest.raises(BatchValidationError) as excinfo:
+        apply_batch(graph, [_node("B"), _edge("B", "C"), _node("A")])
+
+    assert excinfo.value.errors == [None, "Node names incorrect", "Node A already exists"]
+    assert [n.name for n in graph.nodes] == ["A"]
+    assert graph.version == 1
+
+
+def test_validation_follows_renames_and_deletes():
+    graph = Graph()
+    graph.add_nodes([Node("A"), Node("B")])
+    graph.add_edge_by_node_names("A", "B")
+
+    apply_batch(graph, [
+        {"op": "update_node", "old_name": "A", "new_name": "A2", "category": None, "parent": None},
+        {"op": "delete_edge", "start": "A2", "end": "B"},
+        _edge("A2", "B"),
+        {"op": "update_edge", "start": "A2", "end": "B", "description": "again", "style": None},
+    ])
+    assert [(e.start.name, e.end.name, e.description) for e in graph.edges] == [("A2", "B", "again")]
+
+    with pytest.raises(BatchValidationError) as excinfo:
+        apply_batch(graph, [
+            {"op": "delete_node", "name": "B"},
+            _node("B"),
+            {"op": "delete_edge", "start": "A2", "end": "B"},
+        ])
+    assert excinfo.value.errors == [None, None, "Edge A2 -> B not found"]
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+from irgraph.BinaryGraph import BinaryGraph, encode_graph
+from irgraph.Graph import Graph
+from irgraph.Graphs import Graphs
+from irgraph.Node import Node
+
+
+def _new_store(tmp_path):
+    return Graphs(json_file_path=str(tmp_path / "graphs.json"))
+
+
+def _sample_graph():
+    graph = Graph(name="Näme", edge_mode="straight", show_node_borders=True, show_edge_descriptions=False)
+    graph.add_nodes([
+        Node("A", category="Server", position_x=10, position_y=2.5, description="front"),
+        Node("B", parent="A"),
+        Node("C", category="Server"),
+    ])
+    graph.add_edge_by_node_names("A", "B", description="link")
+    graph.add_edge_by_node_names("A", "B", directed=False, style="dashed")
+    graph.add_edge_by_node_names("C", "A")
+    return graph
+
+
+def test_binary_graph_round_trip(tmp_path):
+    graph = _sample_graph()
+    path = tmp_path / "0.bin"
+    path.write_bytes(encode_graph({"journal_seq": 7, "version": graph.version, **graph.toJSON()}))
+
+    with BinaryGraph(str(path)) as binary:
+        assert (binary.journal_seq, binary.node_count, binary.edge_count) == (7, 3, 3)
+        restored = binary.materialize()
+
+    assert restored.toJSON() == graph.toJSON()
+    assert restored.version == graph.version
+    assert [n.name for n in restored.get_children("A")] == ["B"]
+    assert [n.name for n in restored.query_nodes(category="Server")[0]] == ["A", "C"]
+    assert len(restored.query_edges(style="dashed")[0]) == 1
+    restored.delete_edge("A", "B")
+    assert [e.style for e in restored.edges[:1]] == ["dashed"]
+
+
+def test_compaction_writes_binary_next_to_json(tmp_path):
+    graphs = _new_store(tmp_path)
+    graphs.add_graph(_sample_graph())
+    graphs.save_to_json(compact=True)
+    assert (tmp_path / "graphs" / "0.json").exists()
+    assert (tmp_path / "graphs" / "0.bin").exists()
+
+    graphs.get_graph_by_id(0).add_node(Node("D"))
+    graphs.save_to_json()
+    # Drop the JSON shard to show the binary one is loaded, with the journal replayed on top
+    (tmp_path / "graphs" / "0.json").unlink()
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert [n.name for n in reloaded.get_graph_by_id(0).nodes] == ["A", "B", "C", "D"]
+
+
+def test_encode_rejects_fields_of_other_types():
+    for node in ({"name": None}, {"name": 5}, {"name": "A", "position_x": "10"}, {"name": "A", "category": ["x"]}):
+        with pytest.raises(ValueError):
+            encode_graph({"name": "G", "nodes": [node], "edges": []})
+
+
+def test_mixed_type_fields_are_stored_as_json_only(tmp_path):
+    graph = Graph(name="G1")
+    graph.add_nodes([Node("A", position_x="10", position_y=True), Node("B", description=5)])
+    graphs = _new_store(tmp_path)
+    graphs.add_graph(graph)
+    graphs.save_to_json(compact=True)
+    assert not (tmp_path / "graphs" / "0.bin").exists()
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert reloaded.get_graph_by_id(0).toJSON() == graph.toJSON()
+
+    # A binary shard from before the graph got such fields must not outlive it
+    graph.update_node_fields("A", position_x=1, position_y=2)
+    graph.update_node_fields("B", description="five")
+    graphs.save_to_json(compact=True)
+    assert (tmp_path / "graphs" / "0.bin").exists()
+    graph.update_node_fields("B", position_x="left")
+    graphs.save_to_json(compact=True)
+    assert not (tmp_path / "graphs" / "0.bin").exists()
+
+
+def test_corrupt_binary_falls_back_to_json(tmp_path):
+    graphs = _new_store(tmp_path)
+    graphs.add_graph(_sample_graph())
+    graphs.save_to_json(compact=True)
+    (tmp_path / "graphs" / "0.bin").write_bytes(b"IRGB")
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert reloaded.get_graph_by_id(0).edge_count == 3
+
+
+def test_deleted_graph_removes_binary(tmp_path):
+    graphs = _new_store(tmp_path)
+    graphs.add_graph(_sample_graph())
+    graphs.save_to_json(compact=True)
+    graphs.delete_graph(0)
+    graphs.save_to_json(compact=True)
+    assert not (tmp_path / "graphs" / "0.bin").exists()
+
+
+def test_startup_scales_with_touched_graphs(tmp_path, monkeypatch):
+    graphs = _new_store(tmp_path)
+    for i in range(20):
+        graph = Graph(name=f"G{i}")
+        graph.add_nodes([Node(f"N{j}") for j in range(500)])
+        for j in range(499):
+            graph.add_edge_by_node_names(f"N{j}", f"N{j + 1}")
+        graphs.add_graph(graph)
+    graphs.save_to_json(compact=True)
+
+    materialized = []
+    materialize = BinaryGraph.materialize
+    monkeypatch.setattr(
+        BinaryGraph, "materialize", lambda self: materialized.append(self.file_path) or materialize(self)
+    )
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    # Startup and listing only read the manifest
+    assert reloaded.summaries(limit=20)[0] == 20
+    assert materialized == []
+
+    reloaded.get_graph_by_id(3)
+    reloaded.get_graph_by_id(3)
+    assert [os.path.basename(path) for path in materialized] == ["3.bin"]
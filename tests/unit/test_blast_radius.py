@@ -46,3 +46,42 @@ def test_blast_radius_cyclic():
     # In a cycle A <-> B, A should have B as descendant and B should have A as descendant
     assert nx.descendants(G, "A") == {"B"}
     assert nx.descendants(G, "B") == {"A"}
+
+def test_analytics_graph_is_reused_between_calls():
+    g = Graph("Reuse")
+    g.add_nodes([Node("A"), Node("B")])
+    g.add_edge_by_node_names("A", "B")
+
+    assert g.analytics_graph() is g.analytics_graph()
+
+def test_analytics_graph_follows_mutations():
+    g = Graph("Incremental")
+    g.add_nodes([Node("A"), Node("B"), Node("C")])
+    g.add_edge_by_node_names("A", "B")
+    G = g.analytics_graph()
+
+    g.add_edge_by_node_names("B", "C")
+    assert nx.descendants(G, "A") == {"B", "C"}
+
+    g.update_node("B", "B2")
+    assert nx.descendants(G, "A") == {"B2", "C"}
+
+    g.delete_edge("B2", "C")
+    assert nx.descendants(G, "A") == {"B2"}
+
+    g.delete_node("B2")
+    assert nx.descendants(G, "A") == set()
+    assert set(G.nodes) == {"A", "C"}
+    assert g.analytics_graph() is G
+
+def test_analytics_graph_keeps_parallel_edges_until_last_removed():
+    g = Graph("Parallel")
+    g.add_nodes([Node("A"), Node("B")])
+    g.add_edge_by_node_names("A", "B", description="first")
+    g.add_edge_by_node_names("A", "B", description="second")
+    G = g.analytics_graph()
+
+    g.delete_edge("A", "B")
+    assert G.has_edge("A", "B")
+    g.delete_edge("A", "B")
+    assert not G.has_edge("A", "B")
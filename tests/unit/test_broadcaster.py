@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+from irgraph.Broadcaster import Broadcaster
+from irgraph.Graph import Graph
+from irgraph.Graphs import Graphs
+from irgraph.Node import Node
+
+
+def _store():
+    graphs = Graphs(json_file_path="/nonexistent/graphs.json")
+    graphs.add_graph(Graph(name="G1"))
+    return graphs
+
+
+def _parse(frame: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+@pytest.mark.asyncio
+async def test_change_is_encoded_once_for_all_subscribers():
+    graphs = _store()
+    broadcaster = Broadcaster(graphs)
+    streams = [broadcaster.stream(0), broadcaster.stream(0)]
+    for stream in streams:
+        assert _parse(await stream.__anext__())["event"] == "ready"
+
+    graphs.get_graph_by_id(0).add_node(Node("A"))
+    first, second = [await stream.__anext__() for stream in streams]
+
+    assert first is second
+    event = _parse(first)
+    assert (event["event"], event["id"]) == ("change", "1")
+    assert event["data"] == {"version": 1, "op": "add_node", "node": {
+        "name": "A", "position_x": None, "position_y": None, "category": "Default", "parent": None, "description": None,
+    }}
+    for stream in streams:
+        await stream.aclose()
+    assert broadcaster.subscriber_count(0) == 0
+    assert graphs.get_graph_by_id(0)._observers == [graphs._subscriptions[0]]
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_changes_since_version():
+    graphs = _store()
+    graph = graphs.get_graph_by_id(0)
+    graph.add_nodes([Node("A"), Node("B")])
+    broadcaster = Broadcaster(graphs)
+
+    stream = broadcaster.stream(0, since=1)
+    replayed = _parse(await stream.__anext__())
+    assert (replayed["id"], replayed["data"]["node"]["name"]) == ("2", "B")
+    graph.delete_node("A")
+    assert _parse(await stream.__anext__())["data"] == {"version": 3, "op": "delete_node", "name": "A"}
+    await stream.aclose()
+
+    assert _parse(await broadcaster.stream(0, since=99).__anext__())["event"] == "resync"
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_told_to_resync(monkeypatch):
+    graphs = _store()
+    broadcaster = Broadcaster(graphs)
+    monkeypatch.setattr(Broadcaster, "QUEUE_SIZE", 2)
+    stream = broadcaster.stream(0)
+    await stream.__anext__()
+
+    graphs.get_graph_by_id(0).add_nodes([Node("A"), Node("B"), Node("C")])
+    assert _parse(await stream.__anext__())["event"] == "resync"
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_close_ends_streams_of_deleted_graph():
+    graphs = _store()
+    broadcaster = Broadcaster(graphs)
+    stream = broadcaster.stream(0)
+    await stream.__anext__()
+
+    graphs.delete_graph(0)
+    broadcaster.close(0)
+    assert _parse(await asyncio.wait_for(stream.__anext__(), 1))["event"] == "deleted"
+    assert _parse(await broadcaster.stream(0).__anext__())["event"] == "deleted"
+
+
+@pytest.mark.asyncio
+async def test_resync_ends_streams_of_replaced_graph():
+    graphs = _store()
+    broadcaster = Broadcaster(graphs)
+    stream = broadcaster.stream(0)
+    await stream.__anext__()
+    graph = graphs.get_graph_by_id(0)
+
+    broadcaster.resync(0)
+    assert _parse(await asyncio.wait_for(stream.__anext__(), 1))["event"] == "resync"
+    await stream.aclose()
+    assert broadcaster.subscriber_count(0) == 0
+    assert graph._observers == [graphs._subscriptions[0]]
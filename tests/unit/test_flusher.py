@@ -0,0 +1,92 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from irgraph.Flusher import Flusher
+from irgraph.Graph import Graph
+from irgraph.Graphs import Graphs
+from irgraph.Node import Node
+
+
+def _store(tmp_path):
+    graphs = Graphs(json_file_path=str(tmp_path / "graphs.json"))
+    graphs.add_graph(Graph(name="G1"))
+    graphs.save_to_json()
+    return graphs
+
+
+@pytest.mark.asyncio
+async def test_burst_of_saves_is_written_once(tmp_path):
+    graphs = _store(tmp_path)
+    flusher = Flusher(graphs, window=0.05)
+    graphs.flusher = flusher
+    flusher.start()
+    graphs.write_changes = MagicMock(wraps=graphs.write_changes)
+
+    graph = graphs.get_graph_by_id(0)
+    for name in ["A", "B", "C"]:
+        graph.add_node(Node(name))
+        graphs.save_to_json()
+    graphs.write_changes.assert_not_called()
+
+    await asyncio.sleep(0.2)
+    graphs.write_changes.assert_called_once()
+    assert len(graphs.storage.journal.read()) == 3
+    await flusher.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_writes_pending_changes(tmp_path):
+    graphs = _store(tmp_path)
+    flusher = Flusher(graphs, window=10)
+    graphs.flusher = flusher
+    flusher.start()
+
+    graphs.get_graph_by_id(0).add_node(Node("A"))
+    graphs.save_to_json()
+    await flusher.stop()
+
+    reloaded = Graphs(json_file_path=str(tmp_path / "graphs.json"))
+    reloaded.load_from_json()
+    assert [node.name for node in reloaded.get_graph_by_id(0).nodes] == ["A"]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried(tmp_path):
+    graphs = _store(tmp_path)
+    flusher = Flusher(graphs, window=0)
+    graphs.flusher = flusher
+    flusher.start()
+    write_changes = graphs.write_changes
+    graphs.write_changes = MagicMock(side_effect=OSError("disk full"))
+
+    graphs.get_graph_by_id(0).add_node(Node("A"))
+    graphs.save_to_json()
+    await asyncio.sleep(0.05)
+    assert len(graphs._pending_entries) == 1
+
+    graphs.write_changes = write_changes
+    graphs.save_to_json()
+    await flusher.stop()
+    assert len(graphs.storage.journal.read()) == 1
+
+
+@pytest.mark.asyncio
+async def test_flusher_survives_unexpected_errors(tmp_path):
+    graphs = _store(tmp_path)
+    flusher = Flusher(graphs, window=0)
+    graphs.flusher = flusher
+    flusher.start()
+    write_changes = graphs.write_changes
+    graphs.write_changes = MagicMock(side_effect=TypeError("not serializable"))
+
+    graphs.get_graph_by_id(0).add_node(Node("A"))
+    graphs.save_to_json()
+    await asyncio.sleep(0.05)
+    assert flusher.is_running()
+
+    graphs.write_changes = write_changes
+    graphs.save_to_json()
+    await flusher.stop()
+    assert len(graphs.storage.journal.read()) == 1
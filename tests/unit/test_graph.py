@@ -1,3 +1,4 @@
+import json
 import pytest
 from irgraph.Graph import Graph
 from irgraph.Node import Node
@@ -77,3 +78,224 @@ def test_to_json():
     data = graph.toJSON()
     assert data["name"] == "JSONGraph"
     assert len(data["nodes"]) == 1
+
+def test_delete_edge_keeps_adjacency_in_sync():
+    graph = Graph()
+    n1, n2, n3 = Node("N1"), Node("N2"), Node("N3")
+    graph.add_nodes([n1, n2, n3])
+    graph.add_edge_by_node_names("N1", "N2")
+    graph.add_edge_by_node_names("N1", "N3")
+
+    assert graph.delete_edge("N1", "N2") is True
+    assert [e.end.name for e in graph.get_outgoing_edges("N1")] == ["N3"]
+    assert graph.get_incoming_edges("N2") == []
+    assert [(e.start.name, e.end.name) for e in graph.edges] == [("N1", "N3")]
+
+def test_rename_node_rekeys_indexes_and_keeps_order():
+    graph = Graph()
+    graph.add_nodes([Node("A"), Node("B"), Node("C")])
+    graph.add_edge_by_node_names("B", "C")
+
+    assert graph.update_node("B", "X") is True
+    assert [n.name for n in graph.nodes] == ["A", "X", "C"]
+    assert graph.get_node_by_name("X") is not None
+    assert [e.end.name for e in graph.get_outgoing_edges("X")] == ["C"]
+    assert graph.delete_edge("X", "C") is True
+
+def test_to_json_preserves_insertion_order():
+    graph = Graph(name="Ordered")
+    graph.add_nodes([Node("B"), Node("A")])
+    graph.add_edge_by_node_names("B", "A")
+    graph.add_edge_by_node_names("A", "B")
+
+    data = graph.toJSON()
+    assert [n["name"] for n in data["nodes"]] == ["B", "A"]
+    assert [(e["start"], e["end"]) for e in data["edges"]] == [("B", "A"), ("A", "B")]
+
+def test_json_bytes_are_cached_per_version():
+    graph = Graph(name="Cached")
+    graph.add_nodes([Node("A"), Node("B")])
+
+    payload = graph.to_json_bytes()
+    assert json.loads(payload) == graph.toJSON()
+    assert graph.to_json_bytes() is payload
+
+    graph.add_edge_by_node_names("A", "B")
+    assert graph.to_json_bytes() is not payload
+    assert json.loads(graph.to_json_bytes())["edges"][0]["start"] == "A"
+
+def test_changes_since_version():
+    graph = Graph(name="Log")
+    graph.add_node(Node("A"))
+    version = graph.version
+    graph.add_node(Node("B"))
+    graph.add_edge_by_node_names("A", "B")
+
+    changes = graph.changes_since(version)
+    assert [(c["version"], c["op"]) for c in changes] == [(version + 1, "add_node"), (version + 2, "add_edge")]
+    assert graph.changes_since(graph.version) == []
+    assert graph.changes_since(graph.version + 1) is None
+
+def test_changes_since_is_bounded(monkeypatch):
+    monkeypatch.setattr(Graph, "CHANGE_LOG_SIZE", 2)
+    graph = Graph(name="Bounded")
+    for name in ["A", "B", "C"]:
+        graph.add_node(Node(name))
+
+    assert graph.changes_since(0) is None
+    assert [c["node"]["name"] for c in graph.changes_since(1)] == ["B", "C"]
+
+def _query_graph():
+    graph = Graph(name="Query")
+    graph.add_nodes([
+        Node("web-1", category="Host"),
+        Node("db-2", category="Database", parent="web-1"),
+        Node("db-1", category="Database", parent="web-1"),
+        Node("web-2", category="Host"),
+    ])
+    graph.add_edge_by_node_names("web-1", "db-1", style="dashed")
+    graph.add_edge_by_node_names("web-2", "db-2")
+    graph.add_edge_by_node_names("db-1", "web-1", style="dashed")
+    return graph
+
+def test_query_nodes_uses_indexes_and_cursor():
+    graph = _query_graph()
+
+    page, cursor = graph.query_nodes(category="Database", limit=1)
+    assert [n.name for n in page] == ["db-1"] and cursor == "db-1"
+    page, cursor = graph.query_nodes(category="Database", cursor=cursor, limit=1)
+    assert [n.name for n in page] == ["db-2"] and cursor is None
+
+    assert [n.name for n in graph.query_nodes(prefix="web")[0]] == ["web-1", "web-2"]
+    assert [n.name for n in graph.query_nodes(parent="web-1", prefix="db-2")[0]] == ["db-2"]
+
+def test_query_indexes_follow_mutations():
+    graph = _query_graph()
+    graph.update_node("db-1", "cache-1", new_category="Cache", new_parent="")
+    graph.delete_node("web-1")
+
+    assert [n.name for n in graph.query_nodes(category="Database")[0]] == ["db-2"]
+    assert [n.name for n in graph.query_nodes(category="Cache")[0]] == ["cache-1"]
+    assert graph.get_node_by_name("db-2").parent is None
+    assert graph.query_nodes(parent="web-1")[0] == []
+
+def test_query_edges_by_style_and_endpoint():
+    graph = _query_graph()
+
+    page, cursor = graph.query_edges(style="dashed", limit=1)
+    assert [(e.start.name, e.end.name) for e in page] == [("web-1", "db-1")]
+    page, cursor = graph.query_edges(style="dashed", cursor=cursor, limit=1)
+    assert [(e.start.name, e.end.name) for e in page] == [("db-1", "web-1")] and cursor is None
+
+    assert [e.end.name for e in graph.query_edges(node="db-1")[0]] == ["db-1", "web-1"]
+    graph.update_edge("web-2", "db-2", description=None, style="dashed")
+    assert len(graph.query_edges(style="dashed")[0]) == 3
+    assert graph.query_edges(style="solid")[0] == []
+
+    # A restyled edge keeps its place in the pages
+    paged, cursor = [], None
+    while True:
+        page, cursor = graph.query_edges(style="dashed", cursor=cursor, limit=1)
+        paged += page
+        if cursor is None:
+            break
+    assert paged == graph.query_edges(style="dashed")[0] == [e for e in graph.edges if e.style == "dashed"]
+
+def test_delete_nodes_only_touches_incident_edges():
+    graph = Graph(name="Bulk")
+    graph.add_nodes([Node(f"N{i}") for i in range(5)])
+    for i in range(4):
+        graph.add_edge_by_node_names(f"N{i}", f"N{i + 1}")
+
+    assert graph.delete_nodes(["N1", "N3", "N3", "missing"]) == ["N1", "N3"]
+    assert [n.name for n in graph.nodes] == ["N0", "N2", "N4"]
+    assert graph.edges == []
+    assert graph.get_outgoing_edges("N0") == [] and graph.get_incoming_edges("N4") == []
+
+def test_snapshot_is_shared_per_version_and_immutable():
+    graph = Graph(name="Snap")
+    graph.add_node(Node("A", position_x=1, position_y=1))
+    snapshot = graph.snapshot()
+    assert graph.snapshot() is snapshot
+    with pytest.raises(TypeError):
+        snapshot.nodes[0]["name"] = "B"
+
+    graph.update_node_fields("A", position_x=5)
+    assert snapshot.nodes[0]["position_x"] == 1
+    assert graph.snapshot().nodes[0]["position_x"] == 5
+    assert graph.snapshot().toJSON() == graph.toJSON()
+
+def _spatial_graph():
+    graph = Graph(name="Spatial")
+    graph.add_nodes([
+        Node("a", position_x=10, position_y=10),
+        Node("b", position_x=480, position_y=520),
+        Node("c", position_x=-700, position_y=30),
+        Node("d", position_x=5000, position_y=5000),
+        Node("unplaced"),
+    ])
+    graph.add_edge_by_node_names("a", "d")
+    graph.add_edge_by_node_names("c", "d")
+    graph.add_edge_by_node_names("d", "b")
+    return graph
+
+def test_viewport_returns_nodes_in_box_and_touching_edges():
+    graph = _spatial_graph()
+    nodes, edges = graph.viewport(0, 0, 600, 600)
+    assert sorted(n.name for n in nodes) == ["a", "b"]
+    assert [(e.start.name, e.end.name) for e in edges] == [("a", "d"), ("d", "b")]
+    # Corners may be given in any order; the bounds are inclusive
+    assert [n.name for n in graph.nodes_in_box(-700, 30, -800, 0)] == ["c"]
+    assert sorted(n.name for n in graph.nodes_in_box(-1e9, -1e9, 1e9, 1e9)) == ["a", "b", "c", "d"]
+    assert sorted(n.name for n in graph.nodes_in_box(-1e300, -1e300, 1e300, 1e300)) == ["a", "b", "c", "d"]
+    assert Graph().nodes_in_box(0, 0, 1e300, 1e300) == []
+
+def test_spatial_index_follows_mutations():
+    graph = _spatial_graph()
+    graph.update_node_fields("a", position_x=5100, position_y=5100)
+    graph.update_node_fields("unplaced", position_x=20, position_y=20)
+    graph.update_node("d", "d2")
+    graph.move_subtree("c", dx=700)
+    graph.delete_node("b")
+
+    assert sorted(n.name for n in graph.nodes_in_box(0, 0, 600, 600)) == ["c", "unplaced"]
+    assert sorted(n.name for n in graph.nodes_in_box(4900, 4900, 5200, 5200)) == ["a", "d2"]
+
+def test_level_of_detail_clusters_and_counts_edges():
+    graph = Graph(name="LOD")
+    graph.add_nodes([
+        Node("web", category="Server", position_x=0, position_y=0),
+        Node("w1", category="Server", parent="web", position_x=100, position_y=0),
+        Node("w2", category="App", parent="w1", position_x=200, position_y=600),
+        Node("db", category="Database", position_x=1000, position_y=1000),
+        Node("loose", category="App"),
+    ])
+    graph.add_edge_by_node_names("w1", "db")
+    graph.add_edge_by_node_names("w2", "db")
+    graph.add_edge_by_node_names("w1", "w2")
+    graph.add_edge_by_node_names("loose", "w2")
+
+    by_parent = graph.level_of_detail("parent")
+    assert {c["id"]: c["size"] for c in by_parent["clusters"]} == {"web": 3, "db": 1, "loose": 1}
+    web = next(c for c in by_parent["clusters"] if c["id"] == "web")
+    assert (web["x"], web["y"], web["categories"]) == (100, 200, {"Server": 2, "App": 1})
+    assert by_parent["edges"] == [{"start": "web", "end": "db", "count": 2}, {"start": "loose", "end": "web", "count": 1}]
+
+    by_category = graph.level_of_detail("category")
+    assert {c["id"] for c in by_category["clusters"]} == {"Server", "App", "Database"}
+
+    by_cell = graph.level_of_detail("cell", cell_size=500)
+    assert {c["id"]: c["size"] for c in by_cell["clusters"]} == {"0,0": 2, "0,1": 1, "2,2": 1, None: 1}
+    unpositioned = next(c for c in by_cell["clusters"] if c["id"] is None)
+    assert unpositioned["x"] is None
+
+def test_level_of_detail_is_cached_per_version():
+    graph = Graph(name="LOD")
+    graph.add_nodes([Node("a"), Node("b")])
+    first = graph.level_of_detail()
+    assert graph.level_of_detail() is first
+    graph.add_edge_by_node_names("a", "b")
+    assert graph.level_of_detail() is not first
+    assert graph.level_of_detail()["edges"] == [{"start": "a", "end": "b", "count": 1}]
+    with pytest.raises(ValueError):
+        graph.level_of_detail("shape")
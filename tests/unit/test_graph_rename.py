@@ -38,3 +38,16 @@ def test_rename_node_not_found_fails():
     g = Graph(name="Test Graph")
     success = g.update_node("X", "Y")
     assert success is False
+
+def test_rename_keeps_node_order():
+    g = Graph(name="Order")
+    g.add_nodes([Node("A"), Node("B"), Node("C")])
+
+    g.update_node("B", "Z")
+    g.delete_node("A")
+    g.add_node(Node("A"))
+    g.update_node("A", "Y")
+
+    assert [n.name for n in g.nodes] == ["Z", "C", "Y"]
+    assert [n["name"] for n in g.toJSON()["nodes"]] == ["Z", "C", "Y"]
+    assert g.node_order()[1] == ["Z", "C", "Y"]
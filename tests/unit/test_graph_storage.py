@@ -0,0 +1,186 @@
+import json
+
+import pytest
+
+from irgraph.Graph import Graph
+from irgraph.Graphs import Graphs
+from irgraph.Node import Node
+from irgraph.Storage import GraphStorage
+
+
+def _new_store(tmp_path):
+    return Graphs(json_file_path=str(tmp_path / "graphs.json"))
+
+
+def _saved_store(tmp_path, names):
+    graphs = _new_store(tmp_path)
+    for name in names:
+        graph = Graph(name=name)
+        graph.add_node(Node(f"{name}-node"))
+        graphs.add_graph(graph)
+    graphs.save_to_json(compact=True)
+    return graphs
+
+
+def test_one_shard_per_graph(tmp_path):
+    _saved_store(tmp_path, ["G1", "G2"])
+
+    manifest = json.loads((tmp_path / "graphs" / "manifest.json").read_text())
+    assert [(entry["id"], entry["name"]) for entry in manifest["graphs"]] == [(0, "G1"), (1, "G2")]
+    assert json.loads((tmp_path / "graphs" / "1.json").read_text())["nodes"][0]["name"] == "G2-node"
+
+
+def test_graphs_are_loaded_on_first_access(tmp_path):
+    _saved_store(tmp_path, ["G1", "G2", "G3"])
+
+    graphs = _new_store(tmp_path)
+    graphs.load_from_json()
+    assert graphs.graph_names() == ["G1", "G2", "G3"]
+    assert graphs._loaded == {}
+
+    assert graphs.get_graph_by_id(1).nodes[0].name == "G2-node"
+    assert list(graphs._loaded) == [1]
+
+
+def test_only_dirty_graphs_are_rewritten(tmp_path):
+    _saved_store(tmp_path, ["G1", "G2"])
+    untouched_mtime = (tmp_path / "graphs" / "0.json").stat().st_mtime_ns
+
+    graphs = _new_store(tmp_path)
+    graphs.load_from_json()
+    graphs.get_graph_by_id(1).add_node(Node("extra"))
+    graphs.save_to_json(compact=True)
+
+    assert (tmp_path / "graphs" / "0.json").stat().st_mtime_ns == untouched_mtime
+    assert len(json.loads((tmp_path / "graphs" / "1.json").read_text())["nodes"]) == 2
+    assert graphs._loaded.keys() == {1}
+
+
+def test_journal_entries_apply_when_graph_is_loaded(tmp_path):
+    graphs = _saved_store(tmp_path, ["G1", "G2"])
+    graphs.get_graph_by_id(1).add_node(Node("late"))
+    graphs.update_graph_name(1, "G2 renamed")
+    graphs.save_to_json()
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert reloaded.graph_names() == ["G1", "G2 renamed"]
+    assert [n.name for n in reloaded.get_graph_by_id(1).nodes] == ["G2-node", "late"]
+
+
+def test_deleted_graph_shard_is_removed(tmp_path):
+    graphs = _saved_store(tmp_path, ["G1", "G2"])
+    graphs.delete_graph(0)
+    graphs.save_to_json(compact=True)
+
+    assert not (tmp_path / "graphs" / "0.json").exists()
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert reloaded.graph_names() == ["G2"]
+    assert reloaded.get_graph_by_id(0) is None
+    assert reloaded.get_graph_by_id(1).nodes[0].name == "G2-node"
+    assert reloaded.add_graph(Graph(name="G3")) == 2
+
+
+def test_migrates_single_file_snapshot(tmp_path):
+    legacy = {"graphs": [
+        {"name": "Old", "nodes": [{"name": "A"}, {"name": "B"}], "edges": [{"start": "A", "end": "B"}]}
+    ]}
+    (tmp_path / "graphs.json").write_text(json.dumps(legacy))
+
+    graphs = _new_store(tmp_path)
+    graphs.load_from_json()
+
+    assert (tmp_path / "graphs" / "manifest.json").exists()
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert len(reloaded.get_graph_by_id(0).edges) == 1
+
+
+def test_load_without_any_data_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        _new_store(tmp_path).load_from_json()
+
+
+def test_summaries_come_from_the_manifest(tmp_path):
+    _saved_store(tmp_path, ["G1", "G2", "G3"])
+
+    graphs = _new_store(tmp_path)
+    graphs.load_from_json()
+    total, page = graphs.summaries(offset=1, limit=1)
+
+    assert total == 3
+    assert [(s["id"], s["name"], s["node_count"], s["edge_count"]) for s in page] == [(1, "G2", 1, 0)]
+    assert page[0]["modified"] is not None
+    assert graphs._loaded == {}
+
+
+def test_summaries_include_journaled_changes(tmp_path):
+    graphs = _saved_store(tmp_path, ["G1"])
+    graph = graphs.get_graph_by_id(0)
+    graph.add_node(Node("extra"))
+    graph.add_edge_by_node_names("G1-node", "extra")
+    graphs.save_to_json()
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    _, page = reloaded.summaries()
+    assert (page[0]["node_count"], page[0]["edge_count"], page[0]["version"]) == (2, 1, graph.version)
+
+
+def test_category_rename_spans_graphs_and_persists(tmp_path):
+    graphs = _new_store(tmp_path)
+    for name in ["G1", "G2", "G3"]:
+        graph = Graph(name=name)
+        graph.add_node(Node(f"{name}-host", category="Host" if name != "G3" else "Database"))
+        graphs.add_graph(graph)
+    graphs.save_to_json(compact=True)
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert reloaded.category_usage() == {"Host": 2, "Database": 1}
+
+    assert reloaded.rename_category("Host", "Server") == 2
+    assert 2 not in reloaded._loaded
+    reloaded.save_to_json()
+
+    again = _new_store(tmp_path)
+    again.load_from_json()
+    assert again.category_usage() == {"Server": 2, "Database": 1}
+    assert again.get_graph_by_id(0).nodes[0].category == "Server"
+
+
+@pytest.mark.asyncio
+async def test_graph_lock_serializes_writers(tmp_path):
+    import asyncio
+
+    graphs = _saved_store(tmp_path, ["G1"])
+    order = []
+
+    async def writer(label):
+        async with graphs.lock(0):
+            order.append(f"{label}-start")
+            await asyncio.sleep(0.01)
+            order.append(f"{label}-end")
+
+    await asyncio.gather(writer("a"), writer("b"))
+    assert order == ["a-start", "a-end", "b-start", "b-end"]
+    assert graphs.lock(0) is not graphs.lock(1)
+
+
+def test_incomplete_storage_cannot_be_created():
+    class ReadOnlyStorage(GraphStorage):
+        def exists(self):
+            return False
+
+        def read_manifest(self):
+            return {"journal_seq": 0, "next_id": 0, "graphs": []}
+
+        def read_journal(self, after_seq=0):
+            return []
+
+        def read_graph(self, graph_id):
+            return None
+
+    with pytest.raises(TypeError, match="write"):
+        ReadOnlyStorage()
@@ -0,0 +1,127 @@
+import json
+
+from irgraph.Graph import Graph
+from irgraph.Graphs import Graphs
+from irgraph.Node import Node
+
+
+def _new_store(tmp_path):
+    return Graphs(json_file_path=str(tmp_path / "graphs.json"))
+
+
+def _populated_store(tmp_path):
+    graphs = _new_store(tmp_path)
+    graph_id = graphs.add_graph(Graph(name="G1"))
+    graphs.save_to_json()
+    graph = graphs.get_graph_by_id(graph_id)
+    graph.add_nodes([Node("A"), Node("B")])
+    graph.add_edge_by_node_names("A", "B", description="link")
+    return graphs
+
+
+def test_first_save_writes_snapshot(tmp_path):
+    graphs = _new_store(tmp_path)
+    graphs.add_graph(Graph(name="G1"))
+    graphs.save_to_json()
+
+    manifest = json.loads((tmp_path / "graphs" / "manifest.json").read_text())
+    assert [g["name"] for g in manifest["graphs"]] == ["G1"]
+    assert graphs.storage.journal.read() == []
+
+
+def test_mutations_are_appended_to_journal(tmp_path):
+    graphs = _populated_store(tmp_path)
+    shard_before = (tmp_path / "graphs" / "0.json").read_text()
+
+    graphs.save_to_json()
+
+    assert (tmp_path / "graphs" / "0.json").read_text() == shard_before
+    ops = [entry["op"] for entry in graphs.storage.journal.read()]
+    assert ops == ["add_node", "add_node", "add_edge"]
+
+
+def test_load_replays_journal(tmp_path):
+    graphs = _populated_store(tmp_path)
+    graphs.get_graph_by_id(0).update_node("A", "A2")
+    graphs.get_graph_by_id(0).update_node_fields("B", position_x=10, position_y=20)
+    graphs.update_graph_name(0, "Renamed")
+    graphs.save_to_json()
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+
+    graph = reloaded.get_graph_by_id(0)
+    assert graph.name == "Renamed"
+    assert [n.name for n in graph.nodes] == ["A2", "B"]
+    assert graph.get_node_by_name("B").position_x == 10
+    assert graph.edges[0].start.name == "A2"
+    assert graph.edges[0].description == "link"
+
+
+def test_load_replays_graph_creation_and_deletion(tmp_path):
+    graphs = _populated_store(tmp_path)
+    graphs.add_graph(Graph(name="G2"))
+    graphs.delete_graph(0)
+    graphs.get_graph_by_id(1).add_node(Node("C"))
+    graphs.save_to_json()
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+
+    assert reloaded.graph_names() == ["G2"]
+    assert [n.name for n in reloaded.get_graph_by_id(1).nodes] == ["C"]
+
+
+def test_compaction_truncates_journal(tmp_path):
+    graphs = _populated_store(tmp_path)
+    graphs.save_to_json(compact=True)
+
+    assert graphs.storage.journal.read() == []
+    shard = json.loads((tmp_path / "graphs" / "0.json").read_text())
+    assert len(shard["nodes"]) == 2
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert len(reloaded.get_graph_by_id(0).edges) == 1
+
+
+def test_compaction_after_threshold(tmp_path):
+    graphs = _populated_store(tmp_path)
+    graphs.COMPACTION_THRESHOLD = 2
+    graphs.save_to_json()
+
+    assert graphs.storage.journal.read() == []
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert len(reloaded.get_graph_by_id(0).nodes) == 2
+
+
+def test_torn_last_journal_line_is_ignored(tmp_path):
+    graphs = _populated_store(tmp_path)
+    graphs.save_to_json()
+    with open(graphs.storage.journal.file_path, "a") as journal_file:
+        journal_file.write('{"seq": 99, "graph_id": 0, "op": "add_no')
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert len(reloaded.get_graph_by_id(0).nodes) == 2
+
+    # Appending after the torn line must not glue new entries onto it
+    reloaded.get_graph_by_id(0).add_node(Node("C"))
+    reloaded.save_to_json()
+    reloaded.get_graph_by_id(0).add_node(Node("D"))
+    reloaded.save_to_json()
+
+    again = _new_store(tmp_path)
+    again.load_from_json()
+    assert [node.name for node in again.get_graph_by_id(0).nodes] == ["A", "B", "C", "D"]
+
+
+def test_graph_version_survives_reload(tmp_path):
+    graphs = _populated_store(tmp_path)
+    version = graphs.get_graph_by_id(0).version
+    graphs.save_to_json(compact=True)
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert reloaded.get_graph_by_id(0).version == version
@@ -0,0 +1,92 @@
+import math
+
+import pytest
+
+from irgraph import Layout
+from irgraph.Graph import Graph
+from irgraph.Layout import compute_layout
+from irgraph.Node import Node
+
+
+def _chain_graph(count=6, positioned=0):
+    graph = Graph(name="G")
+    for i in range(count):
+        position = (i * 100, 0) if i < positioned else (None, None)
+        graph.add_node(Node(f"N{i}", position_x=position[0], position_y=position[1]))
+    for i in range(count - 1):
+        graph.add_edge_by_node_names(f"N{i}", f"N{i + 1}")
+    return graph
+
+
+def _min_distance(positions):
+    points = list(positions.values())
+    return min(math.dist(a, b) for i, a in enumerate(points) for b in points[i + 1:])
+
+
+def test_force_layout_places_every_node_apart():
+    graph = _chain_graph()
+    positions = compute_layout(graph.snapshot(), mode="force")
+
+    assert set(positions) == {node.name for node in graph.nodes}
+    assert all(isinstance(value, int) for position in positions.values() for value in position)
+    assert _min_distance(positions) > 20
+    # Deterministic for the same seed
+    assert compute_layout(graph.snapshot(), mode="force") == positions
+
+
+def test_force_layout_approximates_within_budget(monkeypatch):
+    # A budget too small for exact repulsion switches to the grid and sampled approximation
+    monkeypatch.setattr(Layout, "FORCE_BUDGET", 20_000)
+    calls = []
+    exact_repulsion = Layout._exact_repulsion
+    monkeypatch.setattr(
+        Layout, "_exact_repulsion", lambda *args, **kwargs: calls.append(kwargs) or exact_repulsion(*args, **kwargs)
+    )
+    graph = _chain_graph(count=100)
+    positions = compute_layout(graph.snapshot(), mode="force")
+
+    assert set(positions) == {node.name for node in graph.nodes}
+    # Every repulsion pass was against a sample of the nodes
+    assert calls and all("columns" in kwargs for kwargs in calls)
+    assert _min_distance(positions) > 5
+
+
+def test_force_layout_pulls_children_to_their_parent():
+    graph = Graph(name="G")
+    graph.add_nodes([Node(f"N{i}") for i in range(20)])
+    graph.add_nodes([Node("child", parent="N0")])
+    positions = compute_layout(graph.snapshot(), mode="force")
+
+    distances = sorted(math.dist(positions["N0"], positions[name]) for name in positions if name != "N0")
+    assert math.dist(positions["N0"], positions["child"]) == distances[0]
+
+
+def test_layered_layout_follows_edges_and_groups_siblings():
+    graph = Graph(name="G")
+    graph.add_nodes([Node("root"), Node("x", parent="g1"), Node("y", parent="g2"), Node("z", parent="g1")])
+    graph.add_nodes([Node("g1"), Node("g2")])
+    for name in ["x", "y", "z"]:
+        graph.add_edge_by_node_names("root", name)
+    graph.add_edge_by_node_names("x", "root")  # cycle, ignored for layering
+    positions = compute_layout(graph.snapshot(), mode="layered", spacing=100)
+
+    assert positions["root"][1] == 0
+    assert {positions[name][1] for name in ["x", "y", "z"]} == {100}
+    row = sorted(["x", "y", "z"], key=lambda name: positions[name][0])
+    assert abs(row.index("x") - row.index("z")) == 1
+
+
+@pytest.mark.parametrize("mode", ["force", "layered"])
+def test_incremental_layout_only_places_unpositioned_nodes(mode):
+    graph = _chain_graph(count=6, positioned=3)
+    positions = compute_layout(graph.snapshot(), mode=mode, incremental=True, spacing=100)
+
+    assert set(positions) == {"N3", "N4", "N5"}
+    fixed = {f"N{i}": (i * 100, 0) for i in range(3)}
+    assert _min_distance({**fixed, **positions}) > 20
+
+
+def test_incremental_layout_without_unpositioned_nodes_is_empty():
+    graph = _chain_graph(count=3, positioned=3)
+    assert compute_layout(graph.snapshot(), incremental=True) == {}
+    assert compute_layout(Graph().snapshot()) == {}
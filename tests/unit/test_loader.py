@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from irgraph.Flusher import Flusher
+from irgraph.Graph import Graph
+from irgraph.Graphs import Graphs
+from irgraph.Loader import Loader
+from irgraph.Node import Node
+
+
+def _new_store(tmp_path):
+    return Graphs(json_file_path=str(tmp_path / "graphs.json"))
+
+
+def _saved_store(tmp_path, count=3):
+    graphs = _new_store(tmp_path)
+    for i in range(count):
+        graphs.add_graph(Graph(name=f"G{i}"))
+    graphs.save_to_json(compact=True)
+    # Graph 1 was edited last
+    graphs.get_graph_by_id(1).add_node(Node("A"))
+    graphs.save_to_json(compact=True)
+    return graphs
+
+
+def test_load_order_is_most_recently_modified_first(tmp_path):
+    _saved_store(tmp_path)
+    graphs = _new_store(tmp_path)
+    graphs.load_from_json()
+
+    assert graphs.load_order()[0] == 1
+    graphs.get_graph_by_id(1)
+    assert 1 not in graphs.load_order()
+
+
+def test_install_keeps_graph_loaded_meanwhile(tmp_path):
+    _saved_store(tmp_path)
+    graphs = _new_store(tmp_path)
+    graphs.load_from_json()
+
+    stored = graphs.read_stored_graph(1)
+    live = graphs.get_graph_by_id(1)
+    assert graphs.install_graph(1, *stored) is live
+    graphs.delete_graph(2)
+    assert graphs.install_graph(2, *graphs.read_stored_graph(2)) is None
+
+
+@pytest.mark.asyncio
+async def test_loader_loads_all_graphs_in_background(tmp_path):
+    _saved_store(tmp_path)
+    graphs = _new_store(tmp_path)
+    flusher = Flusher(graphs, window=0.05)
+    graphs.flusher = flusher
+    loader = Loader(graphs, flusher=flusher)
+    assert loader.progress()["registry_loaded"] is False
+
+    loader.start()
+    await loader.wait_registry()
+    assert flusher.is_running()
+    while not loader.ready:
+        await asyncio.sleep(0.01)
+
+    assert loader.progress() == {
+        "ready": True, "failed": False, "registry_loaded": True, "graphs_loaded": 3, "graphs_total": 3
+    }
+    assert [n.name for n in graphs.get_graph_by_id(1).nodes] == ["A"]
+    await loader.stop()
+    await flusher.stop()
+
+
+@pytest.mark.asyncio
+async def test_loader_starts_empty_without_data(tmp_path):
+    graphs = _new_store(tmp_path)
+    loader = Loader(graphs)
+    loader.start()
+    await loader.wait_registry()
+    await loader.stop()
+
+    assert graphs.graph_ids() == []
+
+
+@pytest.mark.asyncio
+async def test_loader_reports_unexpected_errors(tmp_path, monkeypatch, caplog):
+    _saved_store(tmp_path)
+    graphs = _new_store(tmp_path)
+
+    def broken_load():
+        raise KeyError("nodes")
+
+    monkeypatch.setattr(graphs, "load_from_json", broken_load)
+    loader = Loader(graphs)
+    loader.start()
+    await loader.wait_registry()
+    await loader.stop()
+
+    assert loader.failed
+    assert loader.progress()["ready"] is False
+    assert "Error loading graphs" in caplog.text
@@ -112,3 +112,23 @@ async def test_unreachable_api_raises_runtime_error(mcp_client):
     
     with pytest.raises(RuntimeError, match="IR Graph API unreachable"):
         await mcp_client.get_graph(1)
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_is_affected(mcp_client):
+    payload = {"node": "A", "target": "B", "affected": True}
+    respx.get(f"{BASE_URL}/api/graphs/1/blast-radius/A/B").mock(return_value=httpx.Response(200, json=payload))
+
+    assert await mcp_client.is_affected(1, "A", "B") == payload
+
+@respx.mock
+@pytest.mark.asyncio
+async def test_list_graphs_pages_through_summaries(mcp_client):
+    route = respx.get(f"{BASE_URL}/api/graphs/summary").mock(side_effect=[
+        httpx.Response(200, json={"total": 3, "offset": 0, "limit": 2, "graphs": [{"id": 0, "name": "A"}, {"id": 2, "name": "B"}]}),
+        httpx.Response(200, json={"total": 3, "offset": 2, "limit": 2, "graphs": [{"id": 5, "name": "C"}]}),
+    ])
+
+    result = await mcp_client.list_graphs(page_size=2)
+    assert [g["id"] for g in result] == [0, 2, 5]
+    assert route.calls.last.request.url.params["offset"] == "2"
@@ -32,17 +32,28 @@ def test_graphs_collection_delete():
     graphs = Graphs()
     g1 = Graph(name="G1")
     g2 = Graph(name="G2")
-    graphs.graphs = [g1, g2]
+    graphs.add_graph(g1)
+    graphs.add_graph(g2)
     
     assert graphs.delete_graph(0) is True
     assert len(graphs.graphs) == 1
-    assert graphs.graphs[0].name == "G2"
+    # IDs are stable: deleting graph 0 does not shift graph 1
+    assert graphs.get_graph_by_id(0) is None
+    assert graphs.graphs[1].name == "G2"
     assert graphs.delete_graph(10) is False
 
+def test_graphs_collection_ids_are_not_reused():
+    graphs = Graphs()
+    graphs.add_graph(Graph(name="G1"))
+    graphs.delete_graph(0)
+
+    assert graphs.add_graph(Graph(name="G2")) == 1
+    assert graphs.graph_ids() == [1]
+
 def test_graphs_collection_update():
     graphs = Graphs()
     g1 = Graph(name="G1")
-    graphs.graphs = [g1]
+    graphs.add_graph(g1)
     
     assert graphs.update_graph_name(0, "G1_Updated") is True
     assert graphs.graphs[0].name == "G1_Updated"
@@ -0,0 +1,39 @@
+from irgraph.Graph import Graph
+from irgraph.Ndjson import NdjsonGraphReader, iter_graph_ndjson
+from irgraph.Node import Node
+
+
+def test_reader_handles_records_split_across_chunks():
+    graph = Graph(name="Split", edge_mode="straight")
+    graph.add_nodes([Node("A", description="first"), Node("B", parent="A")])
+    graph.add_edge_by_node_names("A", "B", description="link")
+    payload = b"".join(iter_graph_ndjson(graph.snapshot(), chunk_size=1))
+
+    reader = NdjsonGraphReader()
+    for start in range(0, len(payload), 7):
+        reader.feed(payload[start:start + 7])
+    result = reader.finish()
+
+    assert result.toJSON() == graph.toJSON()
+
+
+def test_export_is_chunked():
+    graph = Graph(name="Chunks")
+    graph.add_nodes([Node(f"N{i}") for i in range(5)])
+
+    chunks = list(iter_graph_ndjson(graph.snapshot(), chunk_size=2))
+    assert len(chunks) == 4
+    assert sum(chunk.count(b"\n") for chunk in chunks) == 6
+
+
+def test_export_is_unaffected_by_later_edits():
+    graph = Graph(name="Edited")
+    graph.add_nodes([Node("A"), Node("B")])
+    chunks = iter_graph_ndjson(graph.snapshot())
+
+    graph.add_node(Node("C"))
+    graph.delete_node("A")
+    payload = b"".join(chunks)
+
+    assert b'"A"' in payload
+    assert b'"C"' not in payload
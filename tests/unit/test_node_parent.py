@@ -50,3 +50,48 @@ def test_delete_parent_clears_children():
     
     assert graph.get_node_by_name("Group") is None
     assert graph.get_node_by_name("Child").parent is None
+
+def _grouped_graph():
+    graph = Graph(name="Groups")
+    graph.add_nodes([
+        Node("dc"),
+        Node("rack", parent="dc", position_x=0, position_y=0),
+        Node("srv1", parent="rack", position_x=10, position_y=10),
+        Node("srv2", parent="rack"),
+        Node("office"),
+        Node("pc", parent="office"),
+    ])
+    graph.add_edge_by_node_names("srv1", "pc")
+    graph.add_edge_by_node_names("srv2", "pc")
+    graph.add_edge_by_node_names("pc", "srv1")
+    graph.add_edge_by_node_names("srv1", "srv2")
+    return graph
+
+def test_subtree_and_children():
+    graph = _grouped_graph()
+    assert [n.name for n in graph.subtree("dc")] == ["dc", "rack", "srv1", "srv2"]
+    assert [n.name for n in graph.get_children("rack")] == ["srv1", "srv2"]
+    assert graph.subtree("missing") == []
+
+def test_move_subtree_shifts_positions_and_rejects_cycles():
+    graph = _grouped_graph()
+    graph.move_subtree("rack", new_parent="office", dx=5, dy=-5)
+
+    assert graph.get_node_by_name("rack").parent == "office"
+    assert (graph.get_node_by_name("srv1").position_x, graph.get_node_by_name("srv1").position_y) == (15, 5)
+    assert graph.get_node_by_name("srv2").position_x is None
+    with pytest.raises(ValueError):
+        graph.move_subtree("office", new_parent="srv1")
+
+def test_collapse_group_aggregates_edges():
+    graph = _grouped_graph()
+    collapsed = graph.collapse_group("dc")
+
+    assert collapsed["members"] == ["dc", "rack", "srv1", "srv2"]
+    assert sorted((e["start"], e["end"], e["count"]) for e in collapsed["edges"]) == [("dc", "office", 2), ("office", "dc", 1)]
+
+def test_delete_subtree():
+    graph = _grouped_graph()
+    assert sorted(graph.delete_subtree("rack")) == ["rack", "srv1", "srv2"]
+    assert [n.name for n in graph.nodes] == ["dc", "office", "pc"]
+    assert graph.edges == []
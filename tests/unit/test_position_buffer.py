@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from irgraph.Graph import Graph
+from irgraph.Graphs import Graphs
+from irgraph.Node import Node
+from irgraph.PositionBuffer import PositionBuffer, decode_positions, encode_positions
+
+
+def _store():
+    graphs = Graphs(json_file_path="/nonexistent/graphs.json")
+    graphs.save_to_json = lambda compact=False: None
+    graphs.add_graph(Graph(name="G1", nodes=[Node("A"), Node("B", position_x=0, position_y=0), Node("C")]))
+    return graphs
+
+
+def test_positions_round_trip_binary():
+    body = encode_positions(7, [2, 0], [-10, 600], [5, 1200])
+    assert len(body) == 12 + 2 * 12
+    assert decode_positions(body) == (7, [2, 0], [-10, 600], [5, 1200])
+    with pytest.raises(ValueError):
+        decode_positions(body[:-1])
+
+
+def test_move_nodes_is_one_change_and_reindexes():
+    graph = Graph(nodes=[Node("A", position_x=0, position_y=0), Node("B")])
+    version = graph.version
+
+    assert graph.move_nodes(["A", "B", "missing"], [1000, 10], [1000, 20]) == 2
+    assert graph.changes_since(version) == [
+        {"version": version + 1, "op": "move_nodes", "names": ["A", "B"], "x": [1000, 10], "y": [1000, 20]}
+    ]
+    assert [n.name for n in graph.nodes_in_box(900, 900, 1100, 1100)] == ["A"]
+    assert [n.name for n in graph.nodes_in_box(-100, -100, 100, 100)] == ["B"]
+
+    replica = Graph(nodes=[Node("A"), Node("B")])
+    replica.apply_change(graph.changes_since(version)[0])
+    assert replica.toJSON() == graph.toJSON()
+
+
+def test_node_order_changes_only_with_node_set():
+    graph = Graph(nodes=[Node("A"), Node("B")])
+    order, names = graph.node_order()
+    assert names == ["A", "B"]
+
+    graph.move_nodes(["A"], [1], [1])
+    graph.update_node("A", "A", new_category="Server")
+    assert graph.node_order()[0] == order
+
+    graph.update_node("A", "Z")
+    assert graph.node_order() == (graph.version, ["Z", "B"])
+    graph.delete_node("B")
+    assert graph.node_order() == (graph.version, ["Z"])
+
+
+@pytest.mark.asyncio
+async def test_buffer_coalesces_updates_per_node():
+    graphs = _store()
+    buffer = PositionBuffer(graphs, window=0.01)
+    buffer.start()
+    graph = graphs.get_graph_by_id(0)
+    version = graph.version
+
+    for step in range(5):
+        buffer.add(0, ["A", "B"], [step, 100], [step, 100])
+    buffer.add(0, ["C"], [7], [8])
+    assert buffer.pending_count(0) == 3
+    await buffer.stop()
+
+    changes = graph.changes_since(version)
+    assert [change["op"] for change in changes] == ["move_nodes"]
+    assert changes[0]["names"] == ["A", "B", "C"]
+    assert [(n.position_x, n.position_y) for n in graph.nodes] == [(4, 4), (100, 100), (7, 8)]
+    assert buffer.pending_count(0) == 0
+
+
+def test_empty_update_is_ignored():
+    graphs = _store()
+    version = graphs.get_graph_by_id(0).version
+    PositionBuffer(graphs).add(0, [], [], [])
+    assert graphs.get_graph_by_id(0).version == version
+
+
+@pytest.mark.asyncio
+async def test_buffer_skips_deleted_graph():
+    graphs = _store()
+    buffer = PositionBuffer(graphs, window=10)
+    buffer.start()
+    buffer.add(0, ["A"], [1], [1])
+    graphs.delete_graph(0)
+    # stop() cuts the window short and applies what is queued
+    await asyncio.wait_for(buffer.stop(), 1)
+
+
+@pytest.mark.asyncio
+async def test_locked_graph_does_not_hold_up_others():
+    graphs = _store()
+    graphs.add_graph(Graph(name="G2", nodes=[Node("A")]))
+    buffer = PositionBuffer(graphs, window=0.01)
+    buffer.start()
+
+    async with graphs.lock(0):
+        buffer.add(0, ["A"], [1], [1])
+        buffer.add(1, ["A"], [2], [2])
+        await asyncio.sleep(0.05)
+        assert graphs.get_graph_by_id(1).get_node_by_name("A").position_x == 2
+        assert graphs.get_graph_by_id(0).get_node_by_name("A").position_x is None
+        buffer.add(0, ["A"], [3], [3])
+
+    await asyncio.sleep(0.05)
+    assert graphs.get_graph_by_id(0).get_node_by_name("A").position_x == 3
+    await buffer.stop()
@@ -0,0 +1,90 @@
+import random
+
+import networkx as nx
+
+from irgraph.Graph import Graph
+from irgraph.Node import Node
+from irgraph.Reachability import ReachabilityIndex
+
+
+def _chain_graph():
+    g = Graph("Chain")
+    g.add_nodes([Node("A"), Node("B"), Node("C"), Node("D")])
+    g.add_edge_by_node_names("A", "B")
+    g.add_edge_by_node_names("B", "C")
+    return g
+
+
+def test_descendants_and_is_reachable():
+    index = _chain_graph().reachability()
+
+    assert index.descendants("A") == ["B", "C"]
+    assert index.descendants("D") == []
+    assert index.is_reachable("A", "C") is True
+    assert index.is_reachable("C", "A") is False
+    assert index.is_reachable("A", "A") is False
+
+
+def test_cycles_share_one_component():
+    index = ReachabilityIndex(["A", "B", "C"], {"A": ["B"], "B": ["A", "C"]})
+
+    assert index.descendants("A") == ["B", "C"]
+    assert index.descendants("B") == ["A", "C"]
+    assert index.descendants("C") == []
+
+
+def test_edge_insert_is_applied_incrementally():
+    g = _chain_graph()
+    index = g.reachability()
+
+    g.add_edge_by_node_names("D", "A")
+    assert g.reachability() is index
+    assert index.descendants("D") == ["A", "B", "C"]
+
+    g.add_node(Node("E"))
+    g.add_edge_by_node_names("C", "E")
+    assert g.reachability() is index
+    assert index.descendants("D") == ["A", "B", "C", "E"]
+
+
+def test_edge_insert_into_large_index_defers_to_rebuild(monkeypatch):
+    monkeypatch.setattr(ReachabilityIndex, "INCREMENTAL_COMPONENTS", 3)
+    g = _chain_graph()
+    index = g.reachability()
+
+    g.add_node(Node("E"))
+    g.add_edge_by_node_names("D", "E")
+    assert index.stale
+    rebuilt = g.reachability()
+    assert rebuilt is not index
+    assert rebuilt.descendants("D") == ["E"]
+
+
+def test_deletes_and_cycles_trigger_rebuild():
+    g = _chain_graph()
+    index = g.reachability()
+
+    g.add_edge_by_node_names("C", "A")
+    rebuilt = g.reachability()
+    assert rebuilt is not index
+    assert rebuilt.descendants("C") == ["A", "B"]
+
+    g.delete_edge("B", "C")
+    assert g.reachability().descendants("A") == ["B"]
+
+
+def test_matches_networkx_under_random_mutations():
+    rng = random.Random(7)
+    g = Graph("Random")
+    names = [f"N{i}" for i in range(30)]
+    g.add_nodes([Node(name) for name in names])
+    for _ in range(200):
+        start, end = rng.choice(names), rng.choice(names)
+        if rng.random() < 0.7:
+            g.add_edge_by_node_names(start, end)
+        else:
+            g.delete_edge(start, end)
+        index = g.reachability()
+        G = g.to_networkx()
+        for name in rng.sample(names, 5):
+            assert set(index.descendants(name)) == nx.descendants(G, name)
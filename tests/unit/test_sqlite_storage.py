@@ -0,0 +1,171 @@
+import sqlite3
+
+from irgraph.Graph import Graph
+from irgraph.Graphs import Graphs
+from irgraph.Node import Node
+from irgraph.SqliteStorage import SqliteStorage
+
+
+def _new_store(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "graphs.sqlite3"))
+    return Graphs(json_file_path=str(tmp_path / "graphs.json"), storage=storage)
+
+
+def _populated_store(tmp_path):
+    graphs = _new_store(tmp_path)
+    graph_id = graphs.add_graph(Graph(name="G1"))
+    graph = graphs.get_graph_by_id(graph_id)
+    graph.add_nodes([Node("A", category="Server"), Node("B"), Node("C", parent="A")])
+    graph.add_edge_by_node_names("A", "B", description="link")
+    graph.add_edge_by_node_names("B", "C", style="dashed")
+    graphs.save_to_json()
+    return graphs
+
+
+def test_mutations_are_stored_as_rows(tmp_path):
+    _populated_store(tmp_path)
+
+    db = sqlite3.connect(tmp_path / "graphs.sqlite3")
+    assert db.execute("SELECT name, category, parent FROM nodes ORDER BY rowid").fetchall() == [
+        ("A", "Server", None), ("B", "Default", None), ("C", "Default", "A")
+    ]
+    assert db.execute("SELECT start_node, end_node, style FROM edges ORDER BY rowid").fetchall() == [
+        ("A", "B", "solid"), ("B", "C", "dashed")
+    ]
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert not (tmp_path / "graphs").exists()
+
+
+def test_load_restores_graph_after_row_updates(tmp_path):
+    graphs = _populated_store(tmp_path)
+    graph = graphs.get_graph_by_id(0)
+    graph.update_node("A", "A2")
+    graph.update_node_fields("B", position_x=10, position_y=20, description="backend")
+    graph.move_nodes(["A2"], [5], [6])
+    graph.update_edge("B", "C", "flow", None)
+    graph.delete_node("C")
+    graphs.update_graph_name(0, "Renamed")
+    graphs.save_to_json()
+    version = graph.version
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+
+    restored = reloaded.get_graph_by_id(0)
+    assert restored.name == "Renamed"
+    assert restored.version == version
+    assert [n.name for n in restored.nodes] == ["A2", "B"]
+    assert restored.get_node_by_name("B").position_x == 10
+    assert restored.get_node_by_name("B").description == "backend"
+    assert (restored.get_node_by_name("A2").position_x, restored.get_node_by_name("A2").position_y) == (5, 6)
+    assert [(e.start.name, e.end.name, e.description) for e in restored.edges] == [("A2", "B", "link")]
+
+
+def test_summaries_come_from_rows(tmp_path):
+    graphs = _populated_store(tmp_path)
+    graphs.add_graph(Graph(name="G2"))
+    graphs.delete_graph(1)
+    graphs.save_to_json()
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+
+    total, summaries = reloaded.summaries()
+    assert total == 1
+    assert summaries[0]["node_count"] == 3
+    assert summaries[0]["edge_count"] == 2
+    assert summaries[0]["categories"] == {"Server": 1, "Default": 2}
+    assert reloaded.add_graph(Graph(name="G3")) == 2
+
+
+def test_existing_json_shards_are_migrated(tmp_path):
+    json_store = Graphs(json_file_path=str(tmp_path / "graphs.json"))
+    json_store.add_graph(Graph(name="Old"))
+    json_store.get_graph_by_id(0).add_nodes([Node("X"), Node("Y")])
+    json_store.save_to_json(compact=True)
+
+    graphs = _new_store(tmp_path)
+    graphs.load_from_json()
+
+    assert [n.name for n in graphs.get_graph_by_id(0).nodes] == ["X", "Y"]
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    assert reloaded.get_graph_by_id(0).name == "Old"
+
+
+def test_two_stores_share_one_database(tmp_path):
+    writer = _populated_store(tmp_path)
+    reader = _new_store(tmp_path)
+    reader.load_from_json()
+    cached = reader.get_graph_by_id(0)
+
+    writer.get_graph_by_id(0).add_node(Node("D"))
+    writer.add_graph(Graph(name="G2"))
+    writer.save_to_json()
+
+    # The cached graph is read again once the other store committed
+    graph = reader.get_graph_by_id(0)
+    assert graph is not cached
+    assert "D" in [n.name for n in graph.nodes]
+    assert graph.version == writer.get_graph_by_id(0).version
+    assert reader.get_graph_by_id(1).name == "G2"
+    assert reader.graph_names() == ["G1", "G2"]
+
+    writer.delete_graph(1)
+    writer.save_to_json()
+    assert reader.get_graph_by_id(1) is None
+    assert reader.summaries()[0] == 1
+
+
+def test_stores_sharing_a_database_converge_on_one_version(tmp_path):
+    first = _populated_store(tmp_path)
+    second = _new_store(tmp_path)
+    second.load_from_json()
+    reloaded = []
+    second.on_reload(reloaded.append)
+
+    # Both edit the same version of graph 0
+    first.get_graph_by_id(0).add_node(Node("D"))
+    second.get_graph_by_id(0).add_node(Node("E"))
+    first.save_to_json()
+    # Unwritten changes survive a refresh
+    assert "E" in [n.name for n in second.get_graph_by_id(0).nodes]
+    second.save_to_json()
+
+    graph = second.get_graph_by_id(0)
+    assert [n.name for n in graph.nodes][-2:] == ["D", "E"]
+    assert reloaded == [0]
+    assert first.get_graph_by_id(0).version == graph.version
+    assert [n.name for n in first.get_graph_by_id(0).nodes] == [n.name for n in graph.nodes]
+
+
+def test_stores_sharing_a_database_never_reuse_graph_ids(tmp_path):
+    first = _new_store(tmp_path)
+    first.add_graph(Graph(name="First"))
+    first.save_to_json()
+    second = _new_store(tmp_path)
+    second.load_from_json()
+    third = _new_store(tmp_path)
+    third.load_from_json()
+
+    # Both stores only know graph 0 but create their graph in one database
+    assert second.add_graph(Graph(name="Second")) == 1
+    assert third.add_graph(Graph(name="Third")) == 2
+    second.save_to_json()
+    third.save_to_json()
+
+    fresh = _new_store(tmp_path)
+    fresh.load_from_json()
+    assert [summary["name"] for summary in fresh.summaries()[1]] == ["First", "Second", "Third"]
+
+
+def test_positions_keep_their_type(tmp_path):
+    graphs = _new_store(tmp_path)
+    graphs.add_graph(Graph(name="G1", nodes=[Node("A", position_x=10, position_y=2.5)]))
+    graphs.save_to_json()
+
+    reloaded = _new_store(tmp_path)
+    reloaded.load_from_json()
+    node = reloaded.get_graph_by_id(0).get_node_by_name("A")
+    assert (node.position_x, node.position_y) == (10, 2.5)
+    assert isinstance(node.position_x, int)